@@ -0,0 +1,303 @@
+# benchmarks/bench_alert_engine.py
+#
+# Alert-engine benchmark: builds a synthetic alert book, replays a price tick stream
+# through the same evaluate -> persist -> notify pass hourly_check runs, and reports
+# throughput, per-tick latency, peak RSS and SQLite write time.
+#
+# Run from the repo root:
+#   python -m benchmarks.bench_alert_engine --alerts 10000,100000,1000000 --ticks 50 --json
+#   python -m benchmarks.bench_alert_engine --ticks-file recorded.jsonl --output results.json
+#
+# A recorded tick file has one JSON object per line mapping coin_id to either a price
+# or {"price", "change_24h", "volume_change_24h"}. Each book size runs in its own
+# process so peak RSS is per size. 10M alerts need several GB of memory.
+
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from services.alert_engine import alert_message, evaluate_alerts, mark_triggered
+
+DEFAULT_MIX = "price=0.5,range=0.3,change=0.1,volume=0.1"
+INSERT_CHUNK = 50_000
+
+
+# -- Workload ----------------------------------------------------------------
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        kind, _, weight = part.partition("=")
+        if kind not in ("price", "range", "change", "volume"):
+            raise ValueError(f"Unknown alert type in mix: {kind}")
+        mix[kind] = float(weight)
+    total = sum(mix.values())
+    return {kind: weight / total for kind, weight in mix.items()}
+
+
+def make_coins(n, rng):
+    """Synthetic coins with log-uniform prices between $0.001 and $100k."""
+    return {f"coin-{i:04d}": 10 ** rng.uniform(-3, 5) for i in range(n)}
+
+
+def make_book(n, coins, mix, skew, rng, alerts_per_user=5):
+    """{user_id: [alert]} with coins drawn from a Zipf-like distribution (skew=0 is uniform)."""
+    coin_ids = list(coins)
+    coin_weights = [1 / (rank + 1) ** skew for rank in range(len(coin_ids))]
+    kinds, kind_weights = zip(*mix.items())
+    drawn_coins = rng.choices(coin_ids, weights=coin_weights, k=n)
+    drawn_kinds = rng.choices(kinds, weights=kind_weights, k=n)
+
+    book = {}
+    for alert_id, (coin_id, kind) in enumerate(zip(drawn_coins, drawn_kinds), start=1):
+        base = coins[coin_id]
+        alert = {"id": alert_id, "coin_id": coin_id, "triggered": False}
+        if kind == "price":
+            alert["price"] = base * (1 + rng.uniform(0.0, 0.3))
+        elif kind == "range":
+            low = base * (1 + rng.uniform(-0.2, 0.1))
+            alert["low"], alert["high"] = low, low * (1 + rng.uniform(0.01, 0.1))
+        elif kind == "change":
+            alert["change"] = rng.uniform(1, 20)
+        else:
+            alert["volume"] = rng.uniform(5, 100)
+        book.setdefault(str(alert_id // alerts_per_user), []).append(alert)
+    return book
+
+
+def generate_ticks(coins, n_ticks, rng, volatility=0.02, window=24):
+    """Random-walk quotes per tick; 24h change is measured over `window` ticks."""
+    prices = dict(coins)
+    history = {coin_id: [price] for coin_id, price in prices.items()}
+    volume_change = {coin_id: 0.0 for coin_id in prices}
+    ticks = []
+    for _ in range(n_ticks):
+        tick = {}
+        for coin_id in prices:
+            prices[coin_id] *= math.exp(rng.gauss(0, volatility))
+            past = history[coin_id]
+            past.append(prices[coin_id])
+            if len(past) > window + 1:
+                past.pop(0)
+            volume_change[coin_id] = max(-90.0, volume_change[coin_id] + rng.gauss(0, 10))
+            tick[coin_id] = {
+                "price": prices[coin_id],
+                "change_24h": (prices[coin_id] / past[0] - 1) * 100,
+                "volume_change_24h": volume_change[coin_id],
+            }
+        ticks.append(tick)
+    return ticks
+
+
+def load_ticks(path):
+    ticks = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                raw = json.loads(line)
+                ticks.append({coin_id: q if isinstance(q, dict) else {"price": q} for coin_id, q in raw.items()})
+    return ticks
+
+
+# -- Fakes -------------------------------------------------------------------
+
+class StubPriceProvider:
+    """Serves one recorded/generated tick at a time, counting lookups like upstream calls."""
+
+    def __init__(self, ticks):
+        self.ticks = ticks
+        self.calls = 0
+
+    def quotes(self, tick_index, coin_ids):
+        tick = self.ticks[tick_index]
+        self.calls += len(coin_ids)
+        return {coin_id: tick[coin_id] for coin_id in coin_ids if coin_id in tick}
+
+
+class FakeBot:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.sent = 0
+
+    async def send_message(self, chat_id, text):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.sent += 1
+
+
+# -- Runner ------------------------------------------------------------------
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, round(q * (len(sorted_values) - 1)))]
+
+
+def load_book_into_sqlite(book, path):
+    from database.database import connect, init_db
+    init_db(path)
+    rows = []
+    for user_id, alerts in book.items():
+        for alert in alerts:
+            kind = next(k for k in ("price", "low", "change", "volume") if k in alert)
+            if kind == "low":
+                rows.append((alert["id"], user_id, alert["coin_id"], "range", None, alert["low"], alert["high"]))
+            else:
+                rows.append((alert["id"], user_id, alert["coin_id"], kind, alert[kind], None, None))
+    conn = connect(path)
+    start = time.perf_counter()
+    for i in range(0, len(rows), INSERT_CHUNK):
+        conn.executemany("INSERT INTO alerts (id, user_id, coin_id, alert_type, target_price, low, high) "
+                         "VALUES (?, ?, ?, ?, ?, ?, ?)", rows[i:i + INSERT_CHUNK])
+        conn.commit()
+    return conn, time.perf_counter() - start
+
+
+async def replay(book, provider, bot, conn, n_ticks):
+    coin_ids = sorted({alert["coin_id"] for alerts in book.values() for alert in alerts})
+    tick_seconds, eval_seconds, write_seconds, send_seconds = [], 0.0, 0.0, 0.0
+    scanned_total = triggered_total = 0
+
+    for tick_index in range(n_ticks):
+        tick_start = time.perf_counter()
+        quotes = provider.quotes(tick_index, coin_ids)
+
+        start = time.perf_counter()
+        triggered, scanned = evaluate_alerts(book, quotes)
+        eval_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        if triggered:
+            triggered = mark_triggered(conn, triggered)
+        write_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        for user_id, alert in triggered:
+            await bot.send_message(chat_id=user_id, text=alert_message(alert))
+        send_seconds += time.perf_counter() - start
+
+        tick_seconds.append(time.perf_counter() - tick_start)
+        scanned_total += scanned
+        triggered_total += len(triggered)
+
+    return tick_seconds, eval_seconds, write_seconds, send_seconds, scanned_total, triggered_total
+
+
+def run_size(n_alerts, args):
+    rng = random.Random(args.seed)
+    mix = parse_mix(args.mix)
+    if args.ticks_file:
+        ticks = load_ticks(args.ticks_file)
+        coins = {coin_id: quote["price"] for coin_id, quote in ticks[0].items()}
+    else:
+        coins = make_coins(args.coins, rng)
+        ticks = generate_ticks(coins, args.ticks, rng, args.volatility)
+
+    start = time.perf_counter()
+    book = make_book(n_alerts, coins, mix, args.skew, rng)
+    build_seconds = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn, load_seconds = load_book_into_sqlite(book, os.path.join(tmp, "bench.db"))
+        bot = FakeBot(args.send_latency_ms / 1000)
+        provider = StubPriceProvider(ticks)
+        tick_seconds, eval_s, write_s, send_s, scanned, triggered = asyncio.run(
+            replay(book, provider, bot, conn, len(ticks)))
+        conn.close()
+
+    ordered = sorted(tick_seconds)
+    return {
+        "alerts": n_alerts,
+        "ticks": len(ticks),
+        "coins": len(coins),
+        "book_build_seconds": build_seconds,
+        "sqlite_load_seconds": load_seconds,
+        "evaluations": scanned,
+        "evaluations_per_second": scanned / eval_s if eval_s else 0.0,
+        "tick_latency_ms": {
+            "p50": percentile(ordered, 0.50) * 1000,
+            "p95": percentile(ordered, 0.95) * 1000,
+            "p99": percentile(ordered, 0.99) * 1000,
+            "max": ordered[-1] * 1000 if ordered else 0.0,
+        },
+        "triggered": triggered,
+        "messages_sent": bot.sent,
+        "price_lookups": provider.calls,
+        "sqlite_write_seconds": write_s,
+        "send_seconds": send_s,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _run_in_child(n_alerts, args, pipe):
+    pipe.send(run_size(n_alerts, args))
+    pipe.close()
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Alert engine benchmark over synthetic alert books")
+    parser.add_argument("--alerts", default="10000,100000", help="Comma-separated book sizes")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Alert type weights, e.g. price=0.5,range=0.5")
+    parser.add_argument("--coins", type=int, default=200)
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent for coin popularity")
+    parser.add_argument("--ticks", type=int, default=50)
+    parser.add_argument("--ticks-file", help="Replay recorded ticks (JSON lines) instead of generating them")
+    parser.add_argument("--volatility", type=float, default=0.02, help="Per-tick log-return stddev")
+    parser.add_argument("--send-latency-ms", type=float, default=0.0, help="Simulated Bot API latency")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="Emit machine-readable results")
+    parser.add_argument("--output", help="Also write the JSON results to this file")
+    args = parser.parse_args()
+
+    results = []
+    for n_alerts in sorted(int(size) for size in args.alerts.split(",")):
+        parent, child = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(target=_run_in_child, args=(n_alerts, args, child))
+        process.start()
+        result = parent.recv()
+        process.join()
+        results.append(result)
+        if not args.json:
+            latency = result["tick_latency_ms"]
+            print(f"{n_alerts:>10,} alerts  {result['evaluations_per_second']:>12,.0f} evals/s  "
+                  f"tick p50 {latency['p50']:8.1f} ms  p99 {latency['p99']:8.1f} ms  "
+                  f"sqlite writes {result['sqlite_write_seconds']:6.2f} s  peak RSS {result['peak_rss_mb']:7.0f} MB")
+
+    report = {
+        "benchmark": "alert_engine",
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "params": {k: v for k, v in vars(args).items() if k not in ("json", "output")},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# benchmarks/bench_render.py
+#
+# Micro-benchmark for the MarkdownV2 rendering path.
+# Run from the repo root:  python -m benchmarks.bench_render [--repeat 2000]
+
+import argparse
+import json
+import random
+import time
+
+from utils.render import COIN_TABLE, escape_md, link_list_message, table_message
+
+
+# -- Previous implementation, kept verbatim for comparison ------------------
+
+def legacy_escape_markdown(text):
+    if not isinstance(text, str):
+        text = str(text)
+    reserved_chars = '_*[]()~`>#+-=|{}.!'
+    return ''.join(f'\\{char}' if char in reserved_chars else char for char in text)
+
+
+def legacy_table(limit, cells):
+    markdown_msg = f"📈 *Top {limit} Cryptocurrencies*\n\n"
+    markdown_msg += "| Symbol | Price \\(USD\\) | 24h Change   | 7D Range          |\n"
+    markdown_msg += "|--------|---------------|--------------|-------------------|\n"
+    plain_msg = f"📈 Top {limit} Cryptocurrencies\n\n"
+    plain_msg += "| Symbol | Price (USD)   | 24h Change   | 7D Range          |\n"
+    plain_msg += "|--------|---------------|--------------|-------------------|\n"
+    for symbol, price, change_str, range_str in cells:
+        markdown_row = (f" | {legacy_escape_markdown(symbol)} | ${legacy_escape_markdown(price)} | "
+                        f"{legacy_escape_markdown(change_str)} | {legacy_escape_markdown(range_str)} |")
+        plain_row = f" | {symbol:<6} | ${price:>11} | {change_str:<12} | {range_str:<20} |"
+        markdown_msg += markdown_row + "\n"
+        plain_msg += plain_row + "\n"
+    return markdown_msg, plain_msg
+
+
+def legacy_news(items):
+    msg = f"📰 *Top 3 Crypto News*\n\n"
+    for i, item in enumerate(items):
+        title_escaped = item["title"].replace("-", "\\-").replace(".", "\\.").replace("(", "\\(")
+        summary_escaped = item["summary"].replace("-", "\\-").replace(".", "\\.").replace("(", "\\(")
+        msg += f"*{i+1}\\. {title_escaped}*\n"
+        msg += f"_{summary_escaped}_\n"
+        msg += f"[Read more ↗]({item['url']})\n\n"
+    plain_msg = "📰 Top 3 Crypto News:\n\n"
+    for i, item in enumerate(items):
+        plain_msg += f"{i+1}. {item['title']}\n"
+        plain_msg += f"   {item['summary']}\n"
+        plain_msg += f"   {item['url']}\n\n"
+    return msg, plain_msg
+
+
+# -- Workload ----------------------------------------------------------------
+
+def make_cells(n, rng):
+    cells = []
+    for _ in range(n):
+        price = rng.uniform(0.0001, 100000)
+        change = rng.uniform(-25, 25)
+        first, last = price * rng.uniform(0.8, 1.2), price
+        cells.append((
+            "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(rng.randint(2, 5))),
+            f"{price:,.2f}",
+            f"{'🟢 +' if change >= 0 else '🔴 -'}{abs(change):.2f}%",
+            f"{first:,.2f} → {last:,.2f}",
+        ))
+    return cells
+
+
+def make_news(n, rng):
+    words = ["Bitcoin", "ETF", "(SEC)", "rally", "v2.0", "price-action", "#crypto", "up", "5%!", "L2", "[update]"]
+    return [{
+        "title": " ".join(rng.choice(words) for _ in range(10)),
+        "summary": " ".join(rng.choice(words) for _ in range(30)),
+        "url": f"https://example.com/news/{i}?ref=bot_(feed)",
+    } for i in range(n)]
+
+
+def per_call_us(func, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        func()
+    return (time.process_time() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MarkdownV2 rendering micro-benchmark")
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=30)
+    parser.add_argument("--json", action="store_true", help="Emit machine-readable results")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    cells = make_cells(args.rows, rng)
+    items = make_news(5, rng)
+    text = " ".join(" ".join(row) for row in cells)
+
+    results = {
+        "escape_legacy_us": per_call_us(lambda: legacy_escape_markdown(text), args.repeat),
+        "escape_translate_us": per_call_us(lambda: escape_md(text), args.repeat),
+        "table_legacy_us": per_call_us(lambda: legacy_table(args.rows, cells), args.repeat),
+        "table_template_us": per_call_us(lambda: table_message(f"📈 Top {args.rows} Cryptocurrencies", COIN_TABLE, cells), args.repeat),
+        "news_legacy_us": per_call_us(lambda: legacy_news(items), args.repeat),
+        "news_builder_us": per_call_us(lambda: link_list_message("📰 Top 5 Crypto News", items), args.repeat),
+    }
+    assert escape_md(text) == legacy_escape_markdown(text), "escaper output changed for text without backslashes"
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for name, legacy, new in (("escape", "escape_legacy_us", "escape_translate_us"),
+                              ("table message", "table_legacy_us", "table_template_us"),
+                              ("news message", "news_legacy_us", "news_builder_us")):
+        print(f"{name:<14} legacy {results[legacy]:9.1f} µs   new {results[new]:9.1f} µs   "
+              f"speedup x{results[legacy] / results[new]:.1f}")
+    # The legacy news/table builders leave reserved characters unescaped, so Telegram
+    # rejected them and every message paid for a second, plain-text send as well.
+    print("note: legacy markdown output is invalid MarkdownV2 and always hit the plain-text fallback")
+    # legacy_news only replaces "-", "." and "(", so it skips most of the escaping work; the
+    # rest of link_list_message builds the message in about the same time as legacy_news.
+    print("note: the news message is slower than legacy because it escapes all 18 reserved characters "
+          "(one escape_md pass over the item text); legacy_news replaces only '-', '.' and '('")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# benchmarks/loadtest/fake_exchange.py
+#
+# Local stand-in for an exchange WebSocket ticker feed, speaking Binance's combined
+# stream format, for exercising services/price_stream.py. Besides steady ticks it can
+# drop every connection after a while, go silent with the socket still open (stale
+# stream and gap detection) and resend old ticks (out-of-order handling).
+#
+#   exchange = FakeExchange(interval=0.2, drop_every=10, stall_every=15, stall_for=40)
+#   url = exchange.start()     # then run the bot with PRICE_STREAM=1 PRICE_STREAM_URL=<url>
+#   ...
+#   exchange.stop()
+
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.loadtest.stub_providers import COINS
+
+SYMBOLS = {f"{sym.upper()}USDT": coin_id for coin_id, (sym, _, _) in COINS.items() if sym != "usdt"}
+
+
+class FakeExchange:
+    def __init__(self, interval=1.0, drop_every=0.0, stall_every=0.0, stall_for=0.0, duplicate_rate=0.0, seed=0):
+        self.interval = interval
+        self.drop_every = drop_every
+        self.stall_every = stall_every
+        self.stall_for = stall_for
+        self.duplicate_rate = duplicate_rate
+        self.rng = random.Random(seed)
+        self.connections = 0
+        self.drops = 0
+        self.sent = 0
+        self._started = time.time()
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    def price(self, coin_id):
+        base = COINS[coin_id][2]
+        return base * (1 + 0.02 * math.sin((time.time() - self._started) / 30 + len(coin_id)))
+
+    def ticker(self, symbol, event_ms):
+        coin_id = SYMBOLS[symbol]
+        price = self.price(coin_id)
+        return json.dumps({
+            "stream": f"{symbol.lower()}@ticker",
+            "data": {"e": "24hrTicker", "E": event_ms, "s": symbol, "c": f"{price:.8f}",
+                     "P": "1.500", "q": f"{price * 1_000_000:.2f}"},
+        })
+
+    async def _serve(self, ws):
+        request = getattr(ws, "request", None)
+        path = request.path if request is not None else ws.path   # websockets >= 13 / legacy API
+        streams = parse_qs(urlsplit(path).query).get("streams", [""])[0].split("/")
+        symbols = [s.split("@")[0].upper() for s in streams if s.split("@")[0].upper() in SYMBOLS]
+        self.connections += 1
+        opened = time.monotonic()
+        last_stall = opened
+        sent = {}   # symbol -> previous message, for duplicates
+        try:
+            while True:
+                now = time.monotonic()
+                if self.drop_every and now - opened >= self.drop_every:
+                    self.drops += 1
+                    await ws.close(code=1001, reason="fake exchange maintenance")
+                    return
+                if self.stall_every and now - last_stall >= self.stall_every:
+                    await asyncio.sleep(self.stall_for)  # Socket stays open, nothing is sent
+                    last_stall = time.monotonic()
+                for symbol in symbols:
+                    if symbol in sent and self.rng.random() < self.duplicate_rate:
+                        await ws.send(sent[symbol])
+                    sent[symbol] = self.ticker(symbol, int(time.time() * 1000))
+                    await ws.send(sent[symbol])
+                    self.sent += 1
+                await asyncio.sleep(self.interval)
+        except Exception:
+            return  # Client went away
+
+    def start(self, host="127.0.0.1", port=0):
+        import websockets
+        ready = threading.Event()
+
+        async def serve():
+            self._server = await websockets.serve(self._serve, host, port)
+            ready.set()
+            await self._server.wait_closed()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(serve())
+
+        self._thread = threading.Thread(target=run, name="fake-exchange", daemon=True)
+        self._thread.start()
+        ready.wait(10)
+        bound = next(iter(self._server.sockets)).getsockname()[1]
+        return f"ws://{host}:{bound}/stream"
+
+    def stop(self):
+        if self._server is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+            self._thread.join(timeout=5)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Serve fake exchange ticker streams")
+    parser.add_argument("--port", type=int, default=9443)
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--drop-every", type=float, default=0.0)
+    parser.add_argument("--stall-every", type=float, default=0.0)
+    parser.add_argument("--stall-for", type=float, default=0.0)
+    parser.add_argument("--duplicate-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    exchange = FakeExchange(args.interval, args.drop_every, args.stall_every, args.stall_for, args.duplicate_rate)
+    print(exchange.start(port=args.port))
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        exchange.stop()
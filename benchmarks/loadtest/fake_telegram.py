@@ -0,0 +1,152 @@
+# benchmarks/loadtest/fake_telegram.py
+#
+# A local stand-in for the Telegram Bot API: enough of getMe, getUpdates (long
+# polling), sendMessage, sendPhoto and sendDocument for the bot to run against it,
+# with configurable response latency and 429 injection on the send methods.
+
+import email.parser
+import json
+import random
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+SEND_METHODS = ("sendMessage", "sendPhoto", "sendDocument")
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "PricePilot", "username": "price_pilot_loadtest_bot"}
+
+
+def _parse_body(content_type, body):
+    """PTB posts form-encoded fields, or multipart when a file is attached."""
+    if content_type.startswith("multipart/form-data"):
+        message = email.parser.BytesParser().parsebytes(
+            b"Content-Type: " + content_type.encode() + b"\r\n\r\n" + body)
+        fields = {}
+        for part in message.get_payload():
+            name = part.get_param("name", header="content-disposition")
+            if name and part.get_filename() is None:
+                fields[name] = part.get_payload(decode=True).decode("utf-8", "replace")
+        return fields
+    if content_type.startswith("application/json"):
+        return json.loads(body or b"{}")
+    return dict(parse_qsl(body.decode("utf-8")))
+
+
+class FakeTelegram:
+    def __init__(self, latency=0.0, jitter=0.0, rate_limit=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.rng = random.Random(seed)
+        self.calls = Counter()
+        self.rate_limited = 0
+        self.on_reply = None            # callable(chat_id, method), set by the driver
+        self._updates = deque()
+        self._next_update_id = 1
+        self._next_message_id = 1
+        self._cond = threading.Condition()
+        self.server = None
+
+    # -- driver side --------------------------------------------------------
+
+    def push_command(self, user_id, text):
+        command = text.split()[0]
+        with self._cond:
+            update = {
+                "update_id": self._next_update_id,
+                "message": {
+                    "message_id": self._next_message_id,
+                    "date": int(time.time()),
+                    "chat": {"id": user_id, "type": "private", "first_name": f"user{user_id}"},
+                    "from": {"id": user_id, "is_bot": False, "first_name": f"user{user_id}"},
+                    "text": text,
+                    "entities": [{"type": "bot_command", "offset": 0, "length": len(command)}],
+                },
+            }
+            self._next_update_id += 1
+            self._next_message_id += 1
+            self._updates.append(update)
+            self._cond.notify_all()
+
+    def start(self, host="127.0.0.1", port=0):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                params = _parse_body(self.headers.get("Content-Type", ""), self.rfile.read(length))
+                method = self.path.rstrip("/").rsplit("/", 1)[-1]
+                status, payload = fake.handle(method, params)
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST
+
+            def log_message(self, format, *args):
+                return
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name="fake-telegram", daemon=True).start()
+        return f"http://{host}:{self.server.server_address[1]}"
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+
+    # -- Bot API side -------------------------------------------------------
+
+    def handle(self, method, params):
+        self.calls[method] += 1
+        if method == "getMe":
+            return 200, {"ok": True, "result": BOT_USER}
+        if method == "getUpdates":
+            return 200, {"ok": True, "result": self._get_updates(params)}
+        if method in SEND_METHODS:
+            return self._send(method, params)
+        return 200, {"ok": True, "result": True}
+
+    def _get_updates(self, params):
+        offset = int(params.get("offset") or 0)
+        timeout = float(params.get("timeout") or 0)
+        limit = int(params.get("limit") or 100)
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._updates and self._updates[0]["update_id"] < offset:
+                self._updates.popleft()  # Confirmed by the offset
+            while not self._updates:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                self._cond.wait(remaining)
+            return [self._updates[i] for i in range(min(limit, len(self._updates)))]
+
+    def _send(self, method, params):
+        delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+        if self.rate_limit and self.rng.random() < self.rate_limit:
+            self.rate_limited += 1
+            return 429, {"ok": False, "error_code": 429, "description": "Too Many Requests: retry after 1",
+                         "parameters": {"retry_after": 1}}
+
+        chat_id = int(params.get("chat_id"))
+        with self._cond:
+            message_id = self._next_message_id
+            self._next_message_id += 1
+        if self.on_reply:
+            self.on_reply(chat_id, method)
+        return 200, {"ok": True, "result": {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": BOT_USER,
+            "text": params.get("text", ""),
+        }}
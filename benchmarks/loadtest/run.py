@@ -0,0 +1,260 @@
+# benchmarks/loadtest/run.py
+#
+# End-to-end load test: runs the real main.py against a local fake Bot API and stub
+# price/news providers, drives it with simulated users, and reports per-command
+# latency percentiles and throughput.
+#
+# Run from the repo root:
+#   python -m benchmarks.loadtest.run --users 2000 --duration 60 --think 2
+#   python -m benchmarks.loadtest.run --users 500 --send-latency-ms 50 --rate-limit 0.01 --json
+#
+# Latency is measured from the moment an update becomes available to getUpdates until
+# the bot's first send* call for that chat reaches the fake API.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from benchmarks.loadtest.fake_telegram import FakeTelegram
+from benchmarks.loadtest.stub_providers import COINS, StubProviders
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+TOKEN = "123456:LOADTEST"
+DEFAULT_MIX = "price=0.4,setalert=0.2,graph=0.1,viewportfolio=0.2,news=0.1"
+SYMBOLS = [symbol for symbol, _, _ in COINS.values()]
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name] = float(weight)
+    return mix
+
+
+def command_text(name, rng):
+    symbol = rng.choice(SYMBOLS)
+    if name == "setalert":
+        return f"/setalert {symbol} {rng.randint(1, 100000)}"
+    if name in ("price", "graph"):
+        return f"/{name} {symbol}"
+    if name == "news":
+        return rng.choice(["/news", f"/news {symbol}"])
+    return f"/{name}"
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, round(q * (len(sorted_values) - 1)))]
+
+
+class Driver:
+    """Closed-loop users: each sends one command, waits for the reply (or timeout), thinks, repeats."""
+
+    def __init__(self, telegram, loop, timeout):
+        self.telegram = telegram
+        self.loop = loop
+        self.timeout = timeout
+        self.pending = {}    # chat_id -> future
+        self.samples = {}    # command -> [latency seconds]
+        self.timeouts = {}   # command -> count
+        telegram.on_reply = self._on_reply
+
+    def _on_reply(self, chat_id, method):
+        # Called from the fake API's threads
+        self.loop.call_soon_threadsafe(self._resolve, chat_id)
+
+    def _resolve(self, chat_id):
+        future = self.pending.pop(chat_id, None)
+        if future is not None and not future.done():
+            future.set_result(time.perf_counter())
+
+    async def issue(self, user_id, name, text):
+        future = self.loop.create_future()
+        self.pending[user_id] = future
+        start = time.perf_counter()
+        self.telegram.push_command(user_id, text)
+        try:
+            done = await asyncio.wait_for(future, self.timeout)
+            self.samples.setdefault(name, []).append(done - start)
+            return True
+        except asyncio.TimeoutError:
+            self.pending.pop(user_id, None)
+            self.timeouts[name] = self.timeouts.get(name, 0) + 1
+            return False
+
+    async def user(self, user_id, mix, think, deadline, seed):
+        rng = random.Random(seed)
+        names, weights = zip(*mix.items())
+        # Give every user a holding so /viewportfolio does real work
+        await self.issue(user_id, "buy", f"/buy {rng.choice(SYMBOLS)} {rng.uniform(0.1, 5):.3f} {rng.randint(1, 1000)}")
+        while time.monotonic() < deadline:
+            await asyncio.sleep(rng.expovariate(1 / think) if think else 0)
+            name = rng.choices(names, weights=weights)[0]
+            await self.issue(user_id, name, command_text(name, rng))
+
+
+def wait_until_ready(health_url, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"main.py exited early with status {process.returncode}")
+        try:
+            with urllib.request.urlopen(f"{health_url}/ready", timeout=2) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError("main.py did not become ready in time")
+
+
+def free_port():
+    import socket
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_bot(workdir, telegram_url, providers_url, args):
+    health_port = free_port()
+    env = dict(os.environ)
+    env.update({
+        "TELEGRAM_BOT_TOKEN": TOKEN,
+        "TELEGRAM_API_URL": telegram_url,
+        "COINGECKO_API_URL": f"{providers_url}/coingecko",
+        "COINPAPRIKA_API_URL": f"{providers_url}/coinpaprika",
+        "CRYPTOCOMPARE_API_URL": f"{providers_url}/cryptocompare",
+        "COINMARKETCAP_API_KEY": "",
+        "DB_PATH": os.path.join(workdir, "alerts.db"),
+        "HEALTH_PORT": str(health_port),
+        "DASHBOARD_PORT": str(free_port()),
+        "POLL_INTERVAL": str(args.poll_interval),
+        "SLOW_COMMAND_MS": str(args.slow_command_ms),
+    })
+    log = open(os.path.join(workdir, "bot.log"), "w")
+    process = subprocess.Popen([sys.executable, os.path.join(REPO_ROOT, "main.py")],
+                               cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+    return process, f"http://127.0.0.1:{health_port}", log
+
+
+async def drive(telegram, args):
+    driver = Driver(telegram, asyncio.get_running_loop(), args.timeout)
+    mix = parse_mix(args.mix)
+    deadline = time.monotonic() + args.duration
+    ramp = args.ramp / max(1, args.users)
+
+    async def delayed_user(i):
+        await asyncio.sleep(i * ramp)
+        await driver.user(100_000 + i, mix, args.think, deadline, args.seed + i)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(delayed_user(i) for i in range(args.users)))
+    return driver, time.perf_counter() - started
+
+
+def report(driver, elapsed, telegram, providers, args):
+    commands = {}
+    completed = 0
+    for name in sorted(set(driver.samples) | set(driver.timeouts)):
+        values = sorted(driver.samples.get(name, []))
+        completed += len(values)
+        commands[name] = {
+            "completed": len(values),
+            "timeouts": driver.timeouts.get(name, 0),
+            "p50_ms": percentile(values, 0.50) * 1000,
+            "p95_ms": percentile(values, 0.95) * 1000,
+            "p99_ms": percentile(values, 0.99) * 1000,
+            "max_ms": values[-1] * 1000 if values else 0.0,
+        }
+    return {
+        "benchmark": "loadtest",
+        "params": {k: v for k, v in vars(args).items() if k not in ("json", "output", "keep")},
+        "elapsed_seconds": elapsed,
+        "completed": completed,
+        "throughput_per_second": completed / elapsed if elapsed else 0.0,
+        "commands": commands,
+        "bot_api_calls": dict(telegram.calls),
+        "bot_api_rate_limited": telegram.rate_limited,
+        "provider_calls": dict(providers.calls),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end load test against a fake Telegram Bot API")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=60, help="Seconds of load after ramp-up starts")
+    parser.add_argument("--ramp", type=float, default=10, help="Seconds over which users join")
+    parser.add_argument("--think", type=float, default=2.0, help="Mean think time between commands (s)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Command weights, e.g. price=0.5,news=0.5")
+    parser.add_argument("--timeout", type=float, default=30, help="Seconds before a command counts as lost")
+    parser.add_argument("--send-latency-ms", type=float, default=0.0, help="Fake Bot API latency for send*")
+    parser.add_argument("--send-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Fraction of send* calls answered 429")
+    parser.add_argument("--upstream-latency-ms", type=float, default=0.0, help="Stub provider latency")
+    parser.add_argument("--upstream-error-rate", type=float, default=0.0)
+    parser.add_argument("--poll-interval", type=float, default=0.0, help="POLL_INTERVAL passed to the bot")
+    parser.add_argument("--slow-command-ms", type=float, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="Keep the work directory (bot.log, alerts.db)")
+    parser.add_argument("--json", action="store_true", help="Emit machine-readable results")
+    parser.add_argument("--output", help="Also write the JSON results to this file")
+    args = parser.parse_args()
+
+    telegram = FakeTelegram(args.send_latency_ms / 1000, args.send_jitter_ms / 1000, args.rate_limit, args.seed)
+    providers = StubProviders(args.upstream_latency_ms / 1000, args.upstream_error_rate, args.seed)
+    telegram_url = telegram.start()
+    providers_url = providers.start()
+    workdir = tempfile.mkdtemp(prefix="pricepilot-loadtest-")
+    process, health_url, log = start_bot(workdir, telegram_url, providers_url, args)
+
+    try:
+        wait_until_ready(health_url, process)
+        driver, elapsed = asyncio.run(drive(telegram, args))
+        with urllib.request.urlopen(f"{health_url}/metrics", timeout=5) as response:
+            metrics = response.read().decode()
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        log.close()
+        telegram.stop()
+        providers.stop()
+
+    results = report(driver, elapsed, telegram, providers, args)
+    with open(os.path.join(workdir, "metrics.txt"), "w") as f:
+        f.write(metrics)
+    if args.keep:
+        results["workdir"] = workdir
+    else:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{results['completed']} commands in {elapsed:.1f}s = {results['throughput_per_second']:.1f}/s "
+          f"({args.users} users, think {args.think}s)")
+    for name, stats in results["commands"].items():
+        print(f"  {name:<14} n={stats['completed']:<7} p50 {stats['p50_ms']:8.1f} ms  p95 {stats['p95_ms']:8.1f} ms  "
+              f"p99 {stats['p99_ms']:8.1f} ms  timeouts {stats['timeouts']}")
+    print(f"  Bot API 429s injected: {telegram.rate_limited}")
+
+
+if __name__ == "__main__":
+    main()
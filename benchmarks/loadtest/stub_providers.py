@@ -0,0 +1,118 @@
+# benchmarks/loadtest/stub_providers.py
+#
+# One local HTTP server standing in for CoinGecko, CoinPaprika and CryptoCompare.
+# Each provider lives under its own path prefix so the bot's *_API_URL settings can
+# point at http://host:port/coingecko, /coinpaprika and /cryptocompare.
+
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+COINS = {
+    "bitcoin": ("btc", "Bitcoin", 65000.0),
+    "ethereum": ("eth", "Ethereum", 3200.0),
+    "solana": ("sol", "Solana", 150.0),
+    "xrp": ("xrp", "XRP", 0.55),
+    "usdt": ("usdt", "Tether", 1.0),
+    "cardano": ("ada", "Cardano", 0.45),
+    "dogecoin": ("doge", "Dogecoin", 0.12),
+}
+
+
+class StubProviders:
+    def __init__(self, latency=0.0, error_rate=0.0, seed=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.calls = Counter()
+        self.server = None
+        self._started = time.time()
+
+    def price(self, coin_id):
+        # Deterministic slow wobble so repeated calls see moving prices
+        base = COINS[coin_id][2]
+        return base * (1 + 0.02 * math.sin((time.time() - self._started) / 30 + len(coin_id)))
+
+    def _news(self, count, category):
+        now = int(time.time())
+        return [{
+            "title": f"{category} market update #{i}",
+            "body": f"Synthetic {category} article {i} for load testing.",
+            "url": f"https://news.example.com/{category.lower()}/{now // 300}/{i}",
+            "source": "stub",
+            "published_on": now - i * 60,
+        } for i in range(count)]
+
+    def route(self, path, query):
+        provider, _, rest = path.strip("/").partition("/")
+        self.calls[provider] += 1
+
+        if provider == "coingecko":
+            if rest == "simple/price":
+                ids = query.get("ids", [""])[0].split(",")
+                return {coin_id: {"usd": self.price(coin_id)} for coin_id in ids if coin_id in COINS}
+            if rest == "exchange_rates":
+                rates = {"btc": 1.0, "usd": self.price("bitcoin"), "eur": self.price("bitcoin") * 0.92,
+                         "gbp": self.price("bitcoin") * 0.79, "jpy": self.price("bitcoin") * 151.0}
+                return {"rates": {code: {"value": value} for code, value in rates.items()}}
+            if rest == "coins/list":
+                return [{"id": coin_id, "symbol": sym, "name": name} for coin_id, (sym, name, _) in COINS.items()]
+            if rest == "coins/markets":
+                return [{
+                    "id": coin_id, "symbol": sym, "name": name, "current_price": self.price(coin_id),
+                    "price_change_percentage_24h": 1.5, "sparkline_in_7d": {"price": [base * 0.95, base]},
+                } for coin_id, (sym, name, base) in COINS.items()]
+            if rest.startswith("coins/") and rest.endswith("/market_chart"):
+                coin_id = rest.split("/")[1]
+                base = COINS.get(coin_id, ("", "", 1.0))[2]
+                now_ms = int(time.time() * 1000)
+                return {"prices": [[now_ms - d * 86_400_000, base * (1 + d / 100)] for d in range(7, -1, -1)]}
+            if rest == "news":
+                return {"news": self._news(5, "General")}
+        elif provider == "coinpaprika" and rest.startswith("tickers/"):
+            coin_id = rest.split("/", 1)[1].split("-", 1)[-1]
+            if coin_id in COINS:
+                return {"quotes": {"USD": {"price": self.price(coin_id)}}}
+        elif provider == "cryptocompare" and rest.rstrip("/") == "v2/news":
+            category = query.get("categories", ["General"])[0].split(",")[0]
+            return {"Data": self._news(10, category)}
+        return None
+
+    def start(self, host="127.0.0.1", port=0):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if stub.error_rate and stub.rng.random() < stub.error_rate:
+                    status, payload = 503, {"error": "injected failure"}
+                else:
+                    payload = stub.route(parts.path, parse_qs(parts.query))
+                    status = 200 if payload is not None else 404
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                return
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name="stub-providers", daemon=True).start()
+        return f"http://{host}:{self.server.server_address[1]}"
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
@@ -14,6 +14,87 @@ COINMARKETCAP_API_KEY = os.getenv("COINMARKETCAP_API_KEY")
 
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
 
+# Upstream base URLs; overridable so load tests can point the bot at local stand-ins
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+COINGECKO_API_URL = os.getenv("COINGECKO_API_URL", "https://api.coingecko.com/api/v3")
+COINPAPRIKA_API_URL = os.getenv("COINPAPRIKA_API_URL", "https://api.coinpaprika.com/v1")
+COINMARKETCAP_API_URL = os.getenv("COINMARKETCAP_API_URL", "https://pro-api.coinmarketcap.com/v1")
+CRYPTOCOMPARE_API_URL = os.getenv("CRYPTOCOMPARE_API_URL", "https://min-api.cryptocompare.com/data")
+
+# Webhook mode: set WEBHOOK_URL to the public base URL that reaches HEALTH_PORT
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram/webhook")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")
+UPDATE_QUEUE_SIZE = int(os.getenv("UPDATE_QUEUE_SIZE", "1000"))
+
+# Seconds PTB waits between getUpdates calls
+POLL_INTERVAL = float(os.getenv("POLL_INTERVAL", "30"))
+
+# SQLite database file shared by the bot and the dashboard
+DB_PATH = os.getenv("DB_PATH", "alerts.db")
+
+# Health/metrics server port
+HEALTH_PORT = int(os.getenv("HEALTH_PORT", "8080"))
+DASHBOARD_PORT = int(os.getenv("DASHBOARD_PORT", "5001"))
+
+# Updates handled at once; each chat's updates still run one at a time, in order
+CONCURRENT_UPDATES = int(os.getenv("CONCURRENT_UPDATES", "16"))
+# Updates one user may have waiting or running before new ones are turned away
+USER_INFLIGHT_CAP = int(os.getenv("USER_INFLIGHT_CAP", "3"))
+
+# Multi-process alert evaluation: 0 keeps hourly_check in the bot process
+ALERT_WORKERS = int(os.getenv("ALERT_WORKERS", "0"))
+ALERT_PARTITIONS = int(os.getenv("ALERT_PARTITIONS", "64"))
+ALERT_LEASE_TTL = float(os.getenv("ALERT_LEASE_TTL", "30"))
+PRICE_FEED_SOCKET = os.getenv("PRICE_FEED_SOCKET", os.path.join("data", "price_feed.sock"))
+PRICE_FEED_INTERVAL = float(os.getenv("PRICE_FEED_INTERVAL", "600"))
+
+# Shared-memory price board every process on the host reads latest prices from
+PRICE_BOARD_NAME = os.getenv("PRICE_BOARD_NAME", "pricepilot_prices")
+PRICE_BOARD_SLOTS = int(os.getenv("PRICE_BOARD_SLOTS", "1024"))
+
+# Optional streaming prices from an exchange WebSocket (Binance combined ticker streams);
+# REST providers still answer for any coin whose stream has been silent PRICE_STREAM_STALE seconds
+PRICE_STREAM = os.getenv("PRICE_STREAM", "0") == "1"
+PRICE_STREAM_URL = os.getenv("PRICE_STREAM_URL", "wss://stream.binance.com:9443/stream")
+PRICE_STREAM_STALE = float(os.getenv("PRICE_STREAM_STALE", "30"))
+
+# Quote currencies users can pick with /currency; non-USD prices come from one FX table
+QUOTE_CURRENCIES = tuple(c.strip().lower() for c in os.getenv("QUOTE_CURRENCIES", "usd,eur,gbp,jpy,btc").split(",") if c.strip())
+FX_REFRESH_INTERVAL = float(os.getenv("FX_REFRESH_INTERVAL", "600"))
+FX_RETRY_INTERVAL = float(os.getenv("FX_RETRY_INTERVAL", "60"))  # Between on-demand refreshes after a failure
+
+# Bulk /import documents (CSV or JSON, optionally gzipped) and streamed CSV exports
+IMPORT_MAX_BYTES = int(os.getenv("IMPORT_MAX_BYTES", str(5_000_000)))
+IMPORT_MAX_ROWS = int(os.getenv("IMPORT_MAX_ROWS", "5000"))
+EXPORT_SPOOL_BYTES = int(os.getenv("EXPORT_SPOOL_BYTES", str(1_000_000)))  # Larger exports spill to a temp file
+
+# Upstream API requests per minute for the whole process (CoinGecko's free tier allows ~30)
+UPSTREAM_BUDGET_PER_MINUTE = float(os.getenv("UPSTREAM_BUDGET_PER_MINUTE", "30"))
+
+# Adaptive alert polling: each coin is polled between POLL_MIN_INTERVAL and POLL_MAX_INTERVAL
+# seconds depending on how close its nearest alert is; ADAPTIVE_POLLING=0 restores fixed
+# POLL_FIXED_INTERVAL polling, which is also the baseline for the "calls saved" figure
+ADAPTIVE_POLLING = os.getenv("ADAPTIVE_POLLING", "1") == "1"
+POLL_MIN_INTERVAL = float(os.getenv("POLL_MIN_INTERVAL", "5"))
+POLL_MAX_INTERVAL = float(os.getenv("POLL_MAX_INTERVAL", "1800"))
+POLL_FIXED_INTERVAL = float(os.getenv("POLL_FIXED_INTERVAL", "600"))
+# Share of the upstream budget the poller may use; the rest stays free for user commands
+POLL_BUDGET_SHARE = float(os.getenv("POLL_BUDGET_SHARE", "0.6"))
+
+# Commands slower than this are logged with their span breakdown
+SLOW_COMMAND_MS = float(os.getenv("SLOW_COMMAND_MS", "2000"))
+
+# Callbacks holding the event loop longer than this are logged with their stack
+LOOP_BLOCK_MS = float(os.getenv("LOOP_BLOCK_MS", "250"))
+
+# Telegram user ids allowed to run admin commands such as /stats (comma-separated)
+ADMIN_USER_IDS = {uid.strip() for uid in os.getenv("ADMIN_USER_IDS", "").split(",") if uid.strip()}
+
+# Shared secret for the dashboard's state-changing /admin endpoints (X-Admin-Token header or
+# admin_token form field); unset disables them
+DASHBOARD_ADMIN_TOKEN = os.getenv("DASHBOARD_ADMIN_TOKEN")
+
 # Supported coin mapping
 COIN_MAP = {
     "btc": "bitcoin",
@@ -28,6 +109,3 @@ HEADERS = {
     "User-Agent": "PricePilotBot/1.0",
     "Accept": "application/json"
 }
-
-
-last_known_prices = {}
\ No newline at end of file
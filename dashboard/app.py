@@ -1,50 +1,245 @@
-from flask import Flask, render_template_string, request
-import sqlite3
-import asyncio
-from handlers.job_handlers import hourly_check
-from main import app_instance
+from flask import Flask, Response, g, jsonify, render_template, request
+import functools
+import hmac
+import json
+import math
+import os
+import time
+from config import DASHBOARD_ADMIN_TOKEN, DB_PATH
+from database.database import connect
+from services import command_bus
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates")
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+SSE_KEEPALIVE = 15
+SSE_TOPICS = ("price", "alert", "queue")
+
+dashboard_app = Flask(__name__, template_folder=TEMPLATE_DIR)
+
+
+def get_db():
+    """Per-request read-only connection; it can never take the bot's write lock."""
+    if "db" not in g:
+        g.db = connect(f"file:{DB_PATH}?mode=ro", uri=True)
+        g.db.execute("PRAGMA query_only = 1")
+    return g.db
+
+
+@dashboard_app.teardown_appcontext
+def close_db(exc):
+    db = g.pop("db", None)
+    if db is not None:
+        db.close()
+
+
+def _page_size():
+    try:
+        limit = int(request.args.get("limit", PAGE_SIZE))
+    except ValueError:
+        limit = PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def _coin_filter():
+    coin = request.args.get("coin")
+    if not coin:
+        return None
+    from services.coin_registry import resolve_coin
+    return resolve_coin(coin) or coin.lower()
+
+
+def _keyset_page(sql, filters, params, cursor_clause, cursor, order, limit):
+    """Run a keyset-paginated query. Fetches one extra row to know whether a next page exists."""
+    if cursor is not None:
+        filters.append(cursor_clause)
+        params.append(cursor)
+    if filters:
+        sql += " WHERE " + " AND ".join(filters)
+    sql += f" ORDER BY {order} LIMIT ?"
+    params.append(limit + 1)
+    rows = get_db().execute(sql, params).fetchall()
+    return rows[:limit], len(rows) > limit
 
-dashboard_app = Flask(__name__)
 
 @dashboard_app.route('/')
 def dashboard():
-    conn = sqlite3.connect("alerts.db")
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM alerts")
-    alerts = cur.fetchall()
-    conn.close()
-
-    html = """
-    <html>
-    <body>
-    <h2>All Alerts</h2>
-    <table border="1" cellpadding="10">
-      <tr><th>User</th><th>Coin</th><th>Type</th><th>Target</th><th>Triggered?</th></tr>
-    {% for alert in alerts %}
-      <tr>
-        <td>{{ alert[1] }}</td>
-        <td>{{ alert[2].upper() }}</td>
-        <td>{{ alert[3] }}</td>
-        <td>{{ alert[4] or alert[5] ~ "-" ~ alert[6] or '' }}</td>
-        <td>{{ 'Yes' if alert[7] else 'No' }}</td>
-      </tr>
-    {% endfor %}
-    </table>
-    <br>
-    <form action="/test">
-      <input type="text" name="price" placeholder="Price" />
-      <input type="text" name="coin" placeholder="Coin (e.g. btc)" />
-      <button type="submit">Trigger Fake Alert</button>
-    </form>
-    </body>
-    </html>
-    """
-    return render_template_string(html, alerts=alerts)
-
-
-@dashboard_app.route('/test')
+    return render_template("dashboard.html", page_size=PAGE_SIZE)
+
+
+@dashboard_app.route('/api/alerts')
+def api_alerts():
+    filters, params = [], []
+    if request.args.get("user"):
+        filters.append("user_id = ?")
+        params.append(request.args["user"])
+    coin_id = _coin_filter()
+    if coin_id:
+        filters.append("coin_id = ?")
+        params.append(coin_id)
+    if request.args.get("type"):
+        filters.append("alert_type = ?")
+        params.append(request.args["type"])
+    if request.args.get("triggered") in ("0", "1"):
+        filters.append("triggered = ?")
+        params.append(int(request.args["triggered"]))
+
+    before = request.args.get("before", type=int)
+    rows, has_more = _keyset_page(
+        "SELECT id, user_id, coin_id, alert_type, target_price, low, high, triggered FROM alerts",
+        filters, params, "id < ?", before, "id DESC", _page_size(),
+    )
+    items = [{
+        "id": r[0], "user_id": r[1], "coin_id": r[2], "type": r[3],
+        "target": r[4], "low": r[5], "high": r[6], "triggered": bool(r[7]),
+    } for r in rows]
+    return jsonify(items=items, next=items[-1]["id"] if has_more else None)
+
+
+@dashboard_app.route('/api/subscribers')
+def api_subscribers():
+    after = request.args.get("after")
+    rows, has_more = _keyset_page(
+        "SELECT user_id FROM subscribers", [], [], "user_id > ?", after, "user_id", _page_size(),
+    )
+    items = [{"user_id": r[0]} for r in rows]
+    return jsonify(items=items, next=items[-1]["user_id"] if has_more else None)
+
+
+@dashboard_app.route('/api/portfolios')
+def api_portfolios():
+    filters, params = [], []
+    if request.args.get("user"):
+        filters.append("user_id = ?")
+        params.append(request.args["user"])
+    coin_id = _coin_filter()
+    if coin_id:
+        filters.append("coin_id = ?")
+        params.append(coin_id)
+
+    before = request.args.get("before", type=int)
+    rows, has_more = _keyset_page(
+        "SELECT id, user_id, coin_id, amount, bought_at FROM portfolio",
+        filters, params, "id < ?", before, "id DESC", _page_size(),
+    )
+    items = [{"id": r[0], "user_id": r[1], "coin_id": r[2], "amount": r[3], "bought_at": r[4]} for r in rows]
+    return jsonify(items=items, next=items[-1]["id"] if has_more else None)
+
+
+def _sse(topic, data):
+    return f"event: {topic}\ndata: {json.dumps(data)}\n\n"
+
+
+@dashboard_app.route('/events')
+def events():
+    """Server-Sent Events: price board updates, alert triggers and send-queue depth."""
+    from services.event_bus import event_bus
+    from utils.price_board import price_board
+    from handlers import job_handlers
+
+    topics = [t for t in request.args.get("topics", "").split(",") if t in SSE_TOPICS] or list(SSE_TOPICS)
+    sub = event_bus.subscribe(topics)
+
+    def stream():
+        try:
+            # Current state first, so a new viewer doesn't wait for the next tick
+            if "price" in topics:
+                for coin_id, quote in price_board().snapshot().items():
+                    timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(quote.ts))
+                    yield _sse("price", {"coin_id": coin_id, "price": quote.price, "timestamp": timestamp})
+            if "queue" in topics:
+                yield _sse("queue", {"depth": job_handlers.send_queue_depth})
+
+            while not sub.closed:
+                event = sub.get(timeout=SSE_KEEPALIVE)
+                if event is None:
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse(*event)
+            # Closed by the bus for falling too far behind; the browser will reconnect
+            yield _sse("lagged", {"dropped": sub.dropped})
+        finally:
+            event_bus.unsubscribe(sub)
+
+    return Response(stream(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+def admin_required(view):
+    """Reject the request unless it carries DASHBOARD_ADMIN_TOKEN. A page open in the operator's
+    browser can post a form to the dashboard but can't know the token, so this also stops CSRF."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not DASHBOARD_ADMIN_TOKEN:
+            return jsonify(error="admin actions are disabled; set DASHBOARD_ADMIN_TOKEN"), 403
+        token = request.headers.get("X-Admin-Token") or request.form.get("admin_token") or ""
+        if not hmac.compare_digest(token.encode(), DASHBOARD_ADMIN_TOKEN.encode()):
+            return jsonify(error="invalid admin token"), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def _run_admin_action(name, **kwargs):
+    """Run an admin action on the bot's loop. Returns (result, error_message, status)."""
+    try:
+        return command_bus.call(name, **kwargs), None, 200
+    except TimeoutError as e:
+        return None, str(e), 504
+    except RuntimeError as e:
+        return None, str(e), 503
+
+
+@dashboard_app.route('/test', methods=['POST'])
+@admin_required
 def test_alert_route():
-    price = float(request.args.get('price', 70000))
-    coin = request.args.get('coin', 'bitcoin').lower()
-    asyncio.run(hourly_check(app_instance, override_price=price, override_coin=coin))
-    return f"<h2>Fake alert triggered for {coin.upper()} @ ${price:,.2f}</h2>"
\ No newline at end of file
+    """Run an alert check at a made-up price; matching users get real notifications."""
+    try:
+        price = float(request.values.get('price') or 70000)
+    except ValueError:
+        price = math.nan
+    if not math.isfinite(price) or price <= 0:
+        return jsonify(error="price must be a positive number"), 400
+    from services.coin_registry import resolve_coin
+    coin_arg = request.values.get('coin') or 'bitcoin'
+    coin = resolve_coin(coin_arg) or coin_arg.lower()
+    _, error, status = _run_admin_action("force_check", price=price, coin=coin)
+    if error:
+        return f"<h2>Fake alert failed: {error}</h2>", status
+    return f"<h2>Fake alert triggered for {coin.upper()} @ ${price:,.2f}</h2>"
+
+
+@dashboard_app.route('/admin/broadcast', methods=['POST'])
+@admin_required
+def admin_broadcast():
+    text = request.form.get('text') or (request.get_json(silent=True) or {}).get('text')
+    if not text:
+        return jsonify(error="text is required"), 400
+    result, error, status = _run_admin_action("broadcast", text=text)
+    return (jsonify(error=error), status) if error else jsonify(result)
+
+
+@dashboard_app.route('/admin/flush', methods=['POST'])
+@admin_required
+def admin_flush():
+    target = request.values.get('target', 'all')
+    if target not in ("prices", "news", "coins", "all"):
+        return jsonify(error="target must be one of prices, news, coins, all"), 400
+    result, error, status = _run_admin_action("flush_cache", target=target)
+    return (jsonify(error=error), status) if error else jsonify(result)
+
+
+@dashboard_app.route('/admin/profile', methods=['POST'])
+@admin_required
+def admin_profile():
+    """Sample the live process and return collapsed stacks (flamegraph.pl / speedscope input)."""
+    from utils.profiler import ProfilerBusy, profile
+    seconds = request.values.get('seconds', 10, type=float)
+    try:
+        result = profile(seconds)
+    except ProfilerBusy as e:
+        return jsonify(error=str(e)), 409
+    return Response(result["collapsed"], mimetype="text/plain", headers={
+        "Content-Disposition": "attachment; filename=profile.collapsed",
+        "X-Profile-Samples": str(result["samples"]),
+        "X-Profile-Overhead-Pct": f"{result['overhead_pct']:.2f}",
+    })
@@ -1,25 +1,48 @@
 import sqlite3
+import time
+from datetime import datetime, timezone
+from config import DB_PATH
+from utils.metrics import SQLITE_LATENCY
+from utils.tracing import add_span
 
-def init_db():
-    conn = sqlite3.connect("alerts.db")
-    cur = conn.cursor()
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS alerts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id TEXT NOT NULL,
-            coin_id TEXT NOT NULL,
-            alert_type TEXT NOT NULL,
-            target_price REAL,
-            low REAL,
-            high REAL,
-            triggered BOOLEAN DEFAULT 0
-        )
-    """)
-    cur.execute("CREATE TABLE IF NOT EXISTS subscribers (user_id TEXT PRIMARY KEY)")
-    cur.execute("CREATE TABLE IF NOT EXISTS sol_subscribers (user_id TEXT PRIMARY KEY)")
-    cur.execute("CREATE TABLE IF NOT EXISTS xrp_subscribers (user_id TEXT PRIMARY KEY)")
-    conn.commit()
-    conn.close()
+
+def _operation(sql):
+    words = sql.split(None, 1)
+    return words[0].upper() if words else "UNKNOWN"
+
+
+def _timed(method, sql, *args):
+    start = time.perf_counter()
+    try:
+        return method(sql, *args)
+    finally:
+        elapsed = time.perf_counter() - start
+        SQLITE_LATENCY.observe(elapsed, operation=_operation(sql))
+        add_span("db", elapsed)
+
+
+class _TimedCursor(sqlite3.Cursor):
+    def execute(self, sql, *args):
+        return _timed(super().execute, sql, *args)
+
+    def executemany(self, sql, *args):
+        return _timed(super().executemany, sql, *args)
+
+
+class _TimedConnection(sqlite3.Connection):
+    def cursor(self, factory=_TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, *args):
+        return self.cursor().execute(sql, *args)
+
+    def executemany(self, sql, *args):
+        return self.cursor().executemany(sql, *args)
+
+
+def connect(path=DB_PATH, **kwargs):
+    """Open the bot's SQLite database; every statement's latency lands in /metrics."""
+    return sqlite3.connect(path, factory=_TimedConnection, **kwargs)
 
 
 def load_alerts(include_triggered=False):
@@ -27,17 +50,23 @@ def load_alerts(include_triggered=False):
     if include_triggered:
         query = "SELECT * FROM alerts"
 
-    conn = sqlite3.connect("alerts.db")
+    conn = connect()
     cur = conn.cursor()
     cur.execute(query)
     rows = cur.fetchall()
+    conn.close()
+    return alerts_from_rows(rows)
 
+
+def alerts_from_rows(rows):
+    """Group `SELECT * FROM alerts` rows into {user_id: [alert]} (price and range alerts)."""
     alerts = {}
     for row in rows:
         alert_id = row[0]
         user_id = row[1]
         coin_id = row[2]
         alert_type = row[3]
+        currency = (row[8] if len(row) > 8 else None) or "usd"
 
         if user_id not in alerts:
             alerts[user_id] = []
@@ -48,6 +77,7 @@ def load_alerts(include_triggered=False):
                 "id": alert_id,
                 "coin_id": coin_id,
                 "price": price,
+                "currency": currency,
                 "triggered": bool(row[7])
             })
         elif alert_type == "range":
@@ -57,27 +87,27 @@ def load_alerts(include_triggered=False):
                 "coin_id": coin_id,
                 "low": low,
                 "high": high,
+                "currency": currency,
                 "triggered": bool(row[7])
             })
 
-    conn.close()
     return alerts
 
 
-def save_alert(user_id, coin_id, alert_type, price=None, low=None, high=None):
-    conn = sqlite3.connect("alerts.db")
+def save_alert(user_id, coin_id, alert_type, price=None, low=None, high=None, currency="usd"):
+    conn = connect()
     cur = conn.cursor()
     if alert_type == "price":
-        cur.execute("INSERT INTO alerts (user_id, coin_id, alert_type, target_price) VALUES (?, ?, ?, ?)",
-                    (user_id, coin_id, alert_type, price))
+        cur.execute("INSERT INTO alerts (user_id, coin_id, alert_type, target_price, currency) VALUES (?, ?, ?, ?, ?)",
+                    (user_id, coin_id, alert_type, price, currency))
     elif alert_type == "range":
-        cur.execute("INSERT INTO alerts (user_id, coin_id, alert_type, low, high) VALUES (?, ?, ?, ?, ?)",
-                    (user_id, coin_id, alert_type, low, high))
+        cur.execute("INSERT INTO alerts (user_id, coin_id, alert_type, low, high, currency) VALUES (?, ?, ?, ?, ?, ?)",
+                    (user_id, coin_id, alert_type, low, high, currency))
     conn.commit()
     conn.close()
 
 def save_change_alert(user_id, coin_id, change_percent):
-    conn = sqlite3.connect("alerts.db")
+    conn = connect()
     cur = conn.cursor()
     cur.execute("""
         INSERT INTO alerts (user_id, coin_id, alert_type, target_price)
@@ -87,7 +117,7 @@ def save_change_alert(user_id, coin_id, change_percent):
     conn.close()
 
 def save_volume_alert(user_id, coin_id, volume_percent):
-    conn = sqlite3.connect("alerts.db")
+    conn = connect()
     cur = conn.cursor()
     cur.execute("""
         INSERT INTO alerts (user_id, coin_id, alert_type, target_price)
@@ -99,8 +129,15 @@ def save_volume_alert(user_id, coin_id, volume_percent):
 # database/database.py
 
 
-def init_db():
-    conn = sqlite3.connect("alerts.db")
+def _add_column(cur, table, column, definition):
+    """ALTER TABLE ... ADD COLUMN unless an older database already has it."""
+    columns = {row[1] for row in cur.execute(f"PRAGMA table_info({table})")}
+    if column not in columns:
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def init_db(path=DB_PATH):
+    conn = connect(path)
     cur = conn.cursor()
     
     # Existing tables
@@ -117,7 +154,13 @@ def init_db():
         )
     """)
     
+    # Thresholds are in the currency the user had selected when setting the alert
+    _add_column(cur, "alerts", "currency", "TEXT NOT NULL DEFAULT 'usd'")
+
     cur.execute("CREATE TABLE IF NOT EXISTS subscribers (user_id TEXT PRIMARY KEY)")
+    cur.execute("CREATE TABLE IF NOT EXISTS user_settings (user_id TEXT PRIMARY KEY, currency TEXT NOT NULL DEFAULT 'usd')")
+    cur.execute("CREATE TABLE IF NOT EXISTS sol_subscribers (user_id TEXT PRIMARY KEY)")
+    cur.execute("CREATE TABLE IF NOT EXISTS xrp_subscribers (user_id TEXT PRIMARY KEY)")
     
     # Portfolio table
     cur.execute("""
@@ -131,6 +174,30 @@ def init_db():
         )
     """)
 
+    # When each lot was added (NULL for lots from before it was tracked), for /performance
+    _add_column(cur, "portfolio", "created_at", "TEXT")
+
+    # Daily USD closes per coin (UTC dates), the price history /performance runs over
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS price_bars (
+            coin_id TEXT NOT NULL,
+            day TEXT NOT NULL,
+            close REAL NOT NULL,
+            PRIMARY KEY (coin_id, day)
+        )
+    """)
+
+    # Indexes backing per-user lookups and the dashboard's filtered, id-ordered pages
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_alerts_user ON alerts (user_id, id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_alerts_coin ON alerts (coin_id, id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_alerts_type ON alerts (alert_type, id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_alerts_triggered ON alerts (triggered, id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_portfolio_user ON portfolio (user_id, id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_portfolio_coin ON portfolio (coin_id, id)")
+
+    # WAL lets the dashboard's read-only connections read while the bot writes
+    cur.execute("PRAGMA journal_mode=WAL")
+
     conn.commit()
     conn.close()
 
@@ -143,20 +210,136 @@ def save_portfolio_data(user_id, coin_id, amount, bought_at=None):
             raise ValueError(f"Failed to fetch current price for {coin_id}")
         bought_at = current_price
 
-    conn = sqlite3.connect("alerts.db")
+    conn = connect()
     cur = conn.cursor()
     cur.execute("""
-        INSERT INTO portfolio (user_id, coin_id, amount, bought_at)
-        VALUES (?, ?, ?, ?)
-    """, (user_id, coin_id, amount, bought_at))
+        INSERT INTO portfolio (user_id, coin_id, amount, bought_at, created_at)
+        VALUES (?, ?, ?, ?, ?)
+    """, (user_id, coin_id, amount, bought_at, _utc_now()))
     conn.commit()
     conn.close()
 
 
+def _utc_now():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def update_portfolio(user_id, coin_id, amount):
+    """Record a sale (negative `amount`) as a lot at the coin's average cost, keeping the average unchanged."""
+    if not amount < 0:
+        raise ValueError(f"a sale needs a negative amount, got {amount}")
+    conn = connect()
+    cur = conn.cursor()
+    cur.execute("SELECT SUM(amount), SUM(amount * bought_at) FROM portfolio WHERE user_id = ? AND coin_id = ?",
+                (user_id, coin_id))
+    held, cost = cur.fetchone()
+    avg_cost = cost / held if held else 0.0
+    cur.execute("""
+        INSERT INTO portfolio (user_id, coin_id, amount, bought_at, created_at)
+        VALUES (?, ?, ?, ?, ?)
+    """, (user_id, coin_id, amount, avg_cost, _utc_now()))
+    conn.commit()
+    conn.close()
+
+
+def load_portfolio_lots(user_id):
+    """[(id, coin_id, amount, created_at)] in the order they were added; created_at is UTC or None."""
+    conn = connect()
+    rows = conn.execute("SELECT id, coin_id, amount, created_at FROM portfolio WHERE user_id = ? ORDER BY id",
+                        (user_id,)).fetchall()
+    conn.close()
+    return rows
+
+
+def load_price_bars(coin_ids, since):
+    """[(coin_id, day, close)] for `coin_ids` from UTC date `since` ("YYYY-MM-DD") on."""
+    if not coin_ids:
+        return []
+    conn = connect()
+    marks = ",".join("?" * len(coin_ids))
+    rows = conn.execute(f"SELECT coin_id, day, close FROM price_bars WHERE coin_id IN ({marks}) AND day >= ? "
+                        "ORDER BY day", (*coin_ids, since)).fetchall()
+    conn.close()
+    return rows
+
+
+def latest_price_bar_day(coin_id):
+    conn = connect()
+    row = conn.execute("SELECT MAX(day) FROM price_bars WHERE coin_id = ?", (coin_id,)).fetchone()
+    conn.close()
+    return row[0]
+
+
+def save_price_bars(coin_id, bars):
+    """Upsert [(day, close)] daily closes for `coin_id`."""
+    conn = connect()
+    conn.executemany("INSERT INTO price_bars (coin_id, day, close) VALUES (?, ?, ?) "
+                     "ON CONFLICT(coin_id, day) DO UPDATE SET close = excluded.close",
+                     [(coin_id, day, close) for day, close in bars])
+    conn.commit()
+    conn.close()
+
+
+def import_user_rows(user_id, lots, alerts):
+    """Insert validated lots [(coin_id, amount, bought_at, created_at)] and alerts
+    [(coin_id, alert_type, target_price, low, high, triggered, currency)] in one transaction: all or nothing."""
+    conn = connect()
+    try:
+        with conn:
+            conn.executemany("INSERT INTO portfolio (user_id, coin_id, amount, bought_at, created_at) VALUES (?, ?, ?, ?, ?)",
+                             [(user_id, *lot) for lot in lots])
+            conn.executemany("INSERT INTO alerts (user_id, coin_id, alert_type, target_price, low, high, triggered, currency) "
+                             "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [(user_id, *alert) for alert in alerts])
+    finally:
+        conn.close()
+    return len(lots), len(alerts)
+
+
+def _iter_rows(sql, params, batch=500):
+    conn = connect()
+    try:
+        cur = conn.execute(sql, params)
+        while True:
+            rows = cur.fetchmany(batch)
+            if not rows:
+                return
+            yield from rows
+    finally:
+        conn.close()
+
+
+def iter_user_alerts(user_id):
+    """Stream one user's alerts, oldest first, off idx_alerts_user without loading the table:
+    (coin_id, alert_type, target_price, low, high, triggered, currency)."""
+    return _iter_rows("SELECT coin_id, alert_type, target_price, low, high, triggered, currency FROM alerts "
+                      "WHERE user_id = ? ORDER BY id", (user_id,))
+
+
+def iter_user_lots(user_id):
+    """Stream one user's portfolio lots, oldest first, off idx_portfolio_user: (coin_id, amount, bought_at, created_at)."""
+    return _iter_rows("SELECT coin_id, amount, bought_at, created_at FROM portfolio WHERE user_id = ? ORDER BY id",
+                      (user_id,))
+
+
 def load_portfolio(user_id):
-    conn = sqlite3.connect("alerts.db")
+    conn = connect()
     cur = conn.cursor()
     cur.execute("SELECT coin_id, amount, bought_at FROM portfolio WHERE user_id = ?", (user_id,))
     rows = cur.fetchall()
     conn.close()
-    return rows    
\ No newline at end of file
+    return rows    
+
+
+def get_user_currency(user_id):
+    conn = connect()
+    row = conn.execute("SELECT currency FROM user_settings WHERE user_id = ?", (user_id,)).fetchone()
+    conn.close()
+    return row[0] if row else "usd"
+
+
+def set_user_currency(user_id, currency):
+    conn = connect()
+    conn.execute("INSERT INTO user_settings (user_id, currency) VALUES (?, ?) "
+                 "ON CONFLICT(user_id) DO UPDATE SET currency = excluded.currency", (user_id, currency))
+    conn.commit()
+    conn.close()
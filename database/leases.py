@@ -0,0 +1,96 @@
+# database/leases.py
+#
+# Partition leases for alert workers. Users are hashed into a fixed number of
+# partitions; each partition is owned by at most one live worker. Workers heartbeat,
+# renew their leases, take free or expired partitions up to a fair share, and give
+# back extras when more workers are alive, so a crashed worker's users move on.
+
+import math
+import time
+import zlib
+from database.database import alerts_from_rows, connect
+
+
+def partition_of(user_id, partitions):
+    """Stable across processes and restarts (unlike hash(), which is salted per process)."""
+    return zlib.crc32(str(user_id).encode()) % partitions
+
+
+def init_leases(partitions):
+    conn = connect()
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS partition_leases (
+            partition INTEGER PRIMARY KEY,
+            owner TEXT,
+            expires_at REAL NOT NULL DEFAULT 0
+        )
+    """)
+    conn.execute("CREATE TABLE IF NOT EXISTS cluster_workers (owner TEXT PRIMARY KEY, seen_at REAL NOT NULL)")
+    conn.executemany("INSERT OR IGNORE INTO partition_leases (partition) VALUES (?)",
+                     [(p,) for p in range(partitions)])
+    # A smaller partition count than last run leaves orphan rows nobody should claim
+    conn.execute("DELETE FROM partition_leases WHERE partition >= ?", (partitions,))
+    conn.commit()
+    conn.close()
+
+
+def rebalance(owner, ttl):
+    """Heartbeat, renew, then claim or release partitions toward a fair share. Returns owned partitions."""
+    now = time.time()
+    conn = connect(timeout=30)
+    try:
+        conn.execute("BEGIN IMMEDIATE")  # One worker rebalances at a time
+        conn.execute("INSERT OR REPLACE INTO cluster_workers (owner, seen_at) VALUES (?, ?)", (owner, now))
+        conn.execute("UPDATE partition_leases SET expires_at = ? WHERE owner = ? AND expires_at >= ?",
+                     (now + ttl, owner, now))
+
+        live = conn.execute("SELECT COUNT(*) FROM cluster_workers WHERE seen_at >= ?", (now - ttl,)).fetchone()[0]
+        total = conn.execute("SELECT COUNT(*) FROM partition_leases").fetchone()[0]
+        fair_share = math.ceil(total / max(1, live))
+
+        owned = [row[0] for row in conn.execute(
+            "SELECT partition FROM partition_leases WHERE owner = ? AND expires_at >= ? ORDER BY partition",
+            (owner, now))]
+        if len(owned) < fair_share:
+            free = [row[0] for row in conn.execute(
+                "SELECT partition FROM partition_leases WHERE owner IS NULL OR expires_at < ? "
+                "ORDER BY partition LIMIT ?", (now, fair_share - len(owned)))]
+            conn.executemany("UPDATE partition_leases SET owner = ?, expires_at = ? WHERE partition = ?",
+                             [(owner, now + ttl, p) for p in free])
+            owned.extend(free)
+        elif len(owned) > fair_share:
+            extra = owned[fair_share:]
+            conn.executemany("UPDATE partition_leases SET owner = NULL, expires_at = 0 WHERE partition = ?",
+                             [(p,) for p in extra])
+            owned = owned[:fair_share]
+
+        conn.execute("DELETE FROM cluster_workers WHERE seen_at < ?", (now - 10 * ttl,))
+        conn.commit()
+        return sorted(owned)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def release_all(owner):
+    conn = connect()
+    conn.execute("UPDATE partition_leases SET owner = NULL, expires_at = 0 WHERE owner = ?", (owner,))
+    conn.execute("DELETE FROM cluster_workers WHERE owner = ?", (owner,))
+    conn.commit()
+    conn.close()
+
+
+def load_partition_alerts(partitions, total):
+    """Untriggered alerts of the users hashed into `partitions`, shaped like load_alerts()."""
+    if not partitions:
+        return {}
+    wanted = set(partitions)
+    conn = connect()
+    conn.create_function("partition_of", 2, partition_of, deterministic=True)
+    placeholders = ",".join("?" * len(wanted))
+    rows = conn.execute(f"SELECT * FROM alerts WHERE triggered = 0 AND partition_of(user_id, ?) IN ({placeholders})",
+                        (total, *sorted(wanted))).fetchall()
+    conn.close()
+    return alerts_from_rows(rows)
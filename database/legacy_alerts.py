@@ -0,0 +1,185 @@
+# database/legacy_alerts.py
+#
+# One-off migration of the legacy JSON alert file (data/alerts.json) into the alerts
+# table. The old schema is {user_id: [{"price" | "low"+"high", "triggered"}]} with no
+# coin_id, so every alert is BTC. The file is read incrementally (chunks through
+# json.JSONDecoder.raw_decode, one alert object at a time), so its size doesn't matter,
+# and rows go in with executemany in chunked transactions.
+#
+# Re-runs are idempotent: an alert is only inserted while the file holds more copies of
+# it than the user already has in SQLite, so nothing already migrated (or set by hand)
+# is added twice, while genuine duplicates in the file are kept.
+#
+#   python -m database.legacy_alerts [data/alerts.json] [--chunk-size 1000]
+
+import json
+import logging
+import math
+import os
+import time
+from collections import Counter
+from database.database import connect, init_db
+
+LEGACY_ALERTS_PATH = os.path.join("data", "alerts.json")
+LEGACY_COIN_ID = "bitcoin"
+READ_SIZE = 64 * 1024
+CHUNK_SIZE = 1000
+_WHITESPACE = " \t\r\n"
+
+
+class _IncrementalReader:
+    """Just enough of a streaming JSON reader for {key: [object, ...], ...}."""
+
+    def __init__(self, fileobj):
+        self.file = fileobj
+        self.buf = ""
+        self.pos = 0
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        chunk = self.file.read(READ_SIZE)
+        if not chunk:
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character, or "" at end of file."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf) or not self._fill():
+                return self.buf[self.pos:self.pos + 1]
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"expected {char!r}, got {self.peek()!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value, reading more of the file until it is."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            self.pos = end
+            return value
+
+    def items(self, open_char, close_char):
+        """Walk a container's members; yields once per member, positioned at its start."""
+        self.expect(open_char)
+        if self.peek() == close_char:
+            self.pos += 1
+            return
+        while True:
+            yield
+            following = self.peek()
+            self.pos += 1
+            if following == close_char:
+                return
+            if following != ",":
+                raise ValueError(f"expected ',' or {close_char!r}, got {following!r}")
+
+
+def iter_legacy_alerts(fileobj):
+    """Yield (user_id, legacy alert dict) from a legacy alert file without loading it whole."""
+    reader = _IncrementalReader(fileobj)
+    for _ in reader.items("{", "}"):
+        user_id = reader.value()
+        reader.expect(":")
+        if reader.peek() != "[":
+            reader.value()  # Not an alert list; skip it
+            continue
+        for _ in reader.items("[", "]"):
+            yield str(user_id), reader.value()
+
+
+def legacy_row(alert):
+    """The alerts-table key (alert_type, target_price, low, high) and triggered flag, or None if unusable."""
+    if not isinstance(alert, dict):
+        return None
+    try:
+        if alert.get("price") is not None:
+            key = ("price", float(alert["price"]), None, None)
+        elif alert.get("low") is not None and alert.get("high") is not None:
+            key = ("range", None, float(alert["low"]), float(alert["high"]))
+        else:
+            return None
+    except (TypeError, ValueError):
+        return None
+    # json accepts NaN/Infinity; SQLite would store NaN as NULL, which never dedupes or evaluates
+    if not all(math.isfinite(v) for v in key[1:] if v is not None):
+        return None
+    return key, int(bool(alert.get("triggered", False)))
+
+
+def _existing(conn, user_id):
+    rows = conn.execute("SELECT coin_id, alert_type, target_price, low, high, COUNT(*) FROM alerts "
+                        "WHERE user_id = ? AND alert_type IN ('price', 'range') "
+                        "GROUP BY coin_id, alert_type, target_price, low, high", (user_id,)).fetchall()
+    return Counter({tuple(row[:5]): row[5] for row in rows})
+
+
+def migrate_legacy_alerts(path=LEGACY_ALERTS_PATH, chunk_size=CHUNK_SIZE):
+    """Copy alerts from the legacy JSON file into SQLite. Returns counts of what happened to them."""
+    init_db()
+    stats = {"read": 0, "inserted": 0, "duplicates": 0, "invalid": 0, "seconds": 0.0}
+    started = time.monotonic()
+    total_bytes = os.path.getsize(path)
+    conn = connect()
+    pending = []
+    current_user = None
+    existing = seen = None     # Per-user counts; a JSON object keeps each user's alerts together
+
+    def flush():
+        with conn:
+            conn.executemany("INSERT INTO alerts (user_id, coin_id, alert_type, target_price, low, high, triggered, "
+                             "currency) VALUES (?, ?, ?, ?, ?, ?, ?, 'usd')", pending)
+        stats["inserted"] += len(pending)
+        pending.clear()
+        elapsed = time.monotonic() - started
+        logging.info(f"Legacy alerts: {stats['read']} read ({f.buffer.tell() / max(total_bytes, 1):.0%}), "
+                     f"{stats['inserted']} inserted, {stats['duplicates']} duplicates, {stats['invalid']} invalid, "
+                     f"{stats['read'] / max(elapsed, 1e-9):,.0f} alerts/s")
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            for user_id, alert in iter_legacy_alerts(f):
+                stats["read"] += 1
+                if stats["read"] % chunk_size == 0:
+                    flush()  # One transaction and one progress line per chunk read
+                row = legacy_row(alert)
+                if row is None:
+                    stats["invalid"] += 1
+                    continue
+                key, triggered = row
+                key = (str(alert.get("coin_id") or LEGACY_COIN_ID), *key)
+                if user_id != current_user:
+                    current_user = user_id
+                    existing, seen = _existing(conn, user_id), Counter()
+                seen[key] += 1
+                if seen[key] <= existing[key]:
+                    stats["duplicates"] += 1  # Already in SQLite from an earlier run or set since
+                    continue
+                pending.append((user_id, *key, triggered))
+            flush()
+    finally:
+        conn.close()
+    stats["seconds"] = time.monotonic() - started
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    parser = argparse.ArgumentParser(description="Migrate legacy data/alerts.json alerts into SQLite")
+    parser.add_argument("path", nargs="?", default=LEGACY_ALERTS_PATH)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+    result = migrate_legacy_alerts(args.path, args.chunk_size)
+    print(json.dumps(result))
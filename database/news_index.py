@@ -0,0 +1,198 @@
+# database/news_index.py
+
+import logging
+import os
+import re
+import time
+from database.database import connect
+
+NEWS_RETENTION_DAYS = int(os.getenv("NEWS_RETENTION_DAYS", "30"))
+INGEST_BATCH_SIZE = 200
+
+# Tickers that appear in ordinary headlines and also happen to be listed coins
+_TICKER_STOPWORDS = {"CEO", "SEC", "ETF", "USA", "THE", "AND", "FOR", "NEW", "NFT", "API", "AI", "US", "UK", "EU"}
+_TICKER_RE = re.compile(r"\b[A-Z][A-Z0-9]{1,5}\b")
+
+
+def init_news_index():
+    conn = connect()
+    cur = conn.cursor()
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS news_articles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url_key TEXT UNIQUE,
+            title_key TEXT UNIQUE,
+            title TEXT NOT NULL,
+            summary TEXT,
+            url TEXT,
+            source TEXT,
+            published_on INTEGER,
+            ingested_at INTEGER NOT NULL
+        )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_news_articles_published ON news_articles (published_on)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_news_articles_ingested ON news_articles (ingested_at)")
+    cur.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS news_fts USING fts5(
+            title, summary, content='news_articles', content_rowid='id', tokenize='porter unicode61'
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS news_coins (
+            coin_id TEXT NOT NULL,
+            article_id INTEGER NOT NULL,
+            PRIMARY KEY (coin_id, article_id)
+        ) WITHOUT ROWID
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_news_coins_article ON news_coins (article_id)")
+
+    # Keep the FTS index and coin tags in step with the article table
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS news_articles_ai AFTER INSERT ON news_articles BEGIN
+            INSERT INTO news_fts (rowid, title, summary) VALUES (new.id, new.title, new.summary);
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS news_articles_ad AFTER DELETE ON news_articles BEGIN
+            INSERT INTO news_fts (news_fts, rowid, title, summary) VALUES ('delete', old.id, old.title, old.summary);
+            DELETE FROM news_coins WHERE article_id = old.id;
+        END
+    """)
+    conn.commit()
+    conn.close()
+
+
+def tag_coins(article, coin_hint=None):
+    """Coin ids an article is about: provider categories, tickers in the title, and the feed it came from."""
+    from services.coin_registry import coin_registry
+
+    coin_ids = set()
+    if coin_hint:
+        coin_ids.add(coin_hint)
+
+    tickers = {c.upper() for c in article.get("categories") or []}
+    tickers.update(t for t in _TICKER_RE.findall(article.get("title") or "") if t not in _TICKER_STOPWORDS)
+    for ticker in tickers:
+        # Only trust tickers that resolve to the coin the symbol is pinned or preferred for
+        coin_id = coin_registry.resolve(ticker)
+        if coin_id and (ticker in (article.get("categories") or []) or ticker.lower() in coin_registry.pinned):
+            coin_ids.add(coin_id)
+
+    title = (article.get("title") or "").lower()
+    for symbol, coin_id in coin_registry.pinned.items():
+        if coin_registry.name_for(coin_id).lower() in title:
+            coin_ids.add(coin_id)
+    return coin_ids
+
+
+def ingest_articles(articles, coin_hint=None, batch_size=INGEST_BATCH_SIZE):
+    """Stream articles into the index, one transaction per batch. Returns the number of new rows."""
+    from services.news_service import article_keys
+
+    inserted = 0
+    batch = []
+    conn = connect()
+    try:
+        for article in articles:
+            batch.append(article)
+            if len(batch) >= batch_size:
+                inserted += _ingest_batch(conn, batch, coin_hint, article_keys)
+                batch = []
+        if batch:
+            inserted += _ingest_batch(conn, batch, coin_hint, article_keys)
+    finally:
+        conn.close()
+    return inserted
+
+
+def _ingest_batch(conn, batch, coin_hint, article_keys):
+    now = int(time.time())
+    inserted = 0
+    tags = []
+    with conn:
+        cur = conn.cursor()
+        for article in batch:
+            if not article.get("title"):
+                continue
+            url_key, title_key = article_keys(article)
+            cur.execute("""
+                INSERT OR IGNORE INTO news_articles
+                    (url_key, title_key, title, summary, url, source, published_on, ingested_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (url_key, title_key, article["title"], article.get("summary"), article.get("url"),
+                  article.get("source"), int(article.get("published_on") or now), now))
+            if cur.rowcount == 1:
+                inserted += 1
+                tags.extend((coin_id, cur.lastrowid) for coin_id in tag_coins(article, coin_hint))
+            elif coin_hint:
+                # Already indexed from another feed; still record that this coin's feed carried it
+                cur.execute("SELECT id FROM news_articles WHERE url_key = ? OR title_key = ?", (url_key, title_key))
+                tags.extend((coin_hint, row[0]) for row in cur.fetchall())
+        cur.executemany("INSERT OR IGNORE INTO news_coins (coin_id, article_id) VALUES (?, ?)", tags)
+    return inserted
+
+
+def purge_old_articles(retention_days=NEWS_RETENTION_DAYS):
+    cutoff = int(time.time()) - retention_days * 86400
+    conn = connect()
+    with conn:
+        deleted = conn.execute("DELETE FROM news_articles WHERE ingested_at < ?", (cutoff,)).rowcount
+    conn.close()
+    if deleted:
+        logging.info(f"Purged {deleted} news articles older than {retention_days} days")
+    return deleted
+
+
+def _fts_query(terms):
+    """Turn free text into a safe FTS5 query: every word must match, the last one as a prefix."""
+    words = re.findall(r"\w+", terms.lower())
+    if not words:
+        return None
+    quoted = [f'"{word}"' for word in words]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _rows_to_articles(rows):
+    return [{"title": r[0], "summary": r[1] or "", "url": r[2], "source": r[3], "published_on": r[4]} for r in rows]
+
+
+def search_news(terms, limit=5, coin_id=None):
+    """BM25-ranked full-text search (title matches weigh more than summary matches)."""
+    query = _fts_query(terms)
+    if query is None:
+        return []
+    sql = """
+        SELECT a.title, a.summary, a.url, a.source, a.published_on
+        FROM news_fts
+        JOIN news_articles a ON a.id = news_fts.rowid
+    """
+    params = [query]
+    if coin_id:
+        sql += " JOIN news_coins c ON c.article_id = a.id AND c.coin_id = ?"
+        params.insert(0, coin_id)
+    sql += " WHERE news_fts MATCH ? ORDER BY bm25(news_fts, 10.0, 1.0) LIMIT ?"
+    params.append(limit)
+
+    conn = connect()
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+    return _rows_to_articles(rows)
+
+
+def news_for_coin(coin_id, limit=5):
+    conn = connect()
+    try:
+        rows = conn.execute("""
+            SELECT a.title, a.summary, a.url, a.source, a.published_on
+            FROM news_coins c
+            JOIN news_articles a ON a.id = c.article_id
+            WHERE c.coin_id = ?
+            ORDER BY a.published_on DESC
+            LIMIT ?
+        """, (coin_id, limit)).fetchall()
+    finally:
+        conn.close()
+    return _rows_to_articles(rows)
@@ -0,0 +1,125 @@
+# handlers/admin_handlers.py
+
+import asyncio
+import logging
+import time
+from io import BytesIO
+from telegram import Update
+from telegram.ext import ContextTypes
+from config import ADMIN_USER_IDS
+from utils.render import TableTemplate, table_message
+
+STATS_TABLE = TableTemplate([
+    ("Command", 14, "<"),
+    ("Count", 7, ">"),
+    ("p50 ms", 9, ">"),
+    ("p95 ms", 9, ">"),
+    ("p99 ms", 9, ">"),
+])
+LANES_TABLE = TableTemplate([
+    ("Chat", 14, "<"),
+    ("Queued", 7, ">"),
+    ("Max wait ms", 12, ">"),
+])
+
+POLL_TABLE = TableTemplate([
+    ("Coin", 14, "<"),
+    ("Every s", 8, ">"),
+    ("Nearest %", 10, ">"),
+])
+
+JOBS_TABLE = TableTemplate([
+    ("Job", 22, "<"),
+    ("Last ms", 9, ">"),
+    ("Items", 6, ">"),
+    ("Drift ms", 9, ">"),
+    ("Over", 5, ">"),
+    ("Skip", 5, ">"),
+])
+
+
+def is_admin(update: Update):
+    return update.effective_user is not None and str(update.effective_user.id) in ADMIN_USER_IDS
+
+
+async def stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if not is_admin(update):
+        await update.message.reply_text("⛔ This command is for bot admins only.")
+        return
+
+    from utils.tracing import command_stats
+    per_command = command_stats()
+    if not per_command:
+        await update.message.reply_text("No commands handled yet.")
+        return
+
+    rows = [
+        (command, s["count"], f"{s['p50']:.0f}", f"{s['p95']:.0f}", f"{s['p99']:.0f}")
+        for command, s in sorted(per_command.items(), key=lambda item: item[1]["p95"], reverse=True)
+    ]
+    markdown_msg, plain_msg = table_message("⏱ Command latency (recent updates)", STATS_TABLE, rows)
+
+    from utils.lanes import busiest_lanes
+    lanes = [(chat_id, queued, f"{max_wait * 1000:.0f}") for chat_id, queued, max_wait in busiest_lanes()]
+    if lanes:
+        lanes_markdown, lanes_plain = table_message("🚦 Busiest chat lanes", LANES_TABLE, lanes)
+        markdown_msg += "\n\n" + lanes_markdown
+        plain_msg += "\n\n" + lanes_plain
+
+    from services.poll_scheduler import poller
+    polling = poller.summary()
+    if polling["requests"] or polling["intervals"]:
+        coins = [
+            (coin_id, f"{interval:.0f}", "-" if distance is None else f"{distance * 100:.2f}")
+            for coin_id, (interval, distance) in list(polling["intervals"].items())[:5]
+        ]
+        title = (f"📡 Alert polling: {polling['requests']} calls vs {polling['baseline']} at a fixed interval "
+                 f"({polling['saved']} saved)")
+        poll_markdown, poll_plain = table_message(title, POLL_TABLE, coins)
+        markdown_msg += "\n\n" + poll_markdown
+        plain_msg += "\n\n" + poll_plain
+
+    from utils.jobs import job_stats
+    jobs = [
+        (name, "-" if run["duration"] is None else f"{run['duration'] * 1000:.0f}",
+         "-" if run["items"] is None else run["items"],
+         "-" if run["drift"] is None else f"{run['drift'] * 1000:.0f}",
+         run["overruns"], run["skipped"])
+        for name, run in sorted(job_stats().items())
+    ]
+    if jobs:
+        jobs_markdown, jobs_plain = table_message("🗓 Scheduled jobs (last run)", JOBS_TABLE, jobs)
+        markdown_msg += "\n\n" + jobs_markdown
+        plain_msg += "\n\n" + jobs_plain
+    try:
+        await update.message.reply_markdown_v2(markdown_msg)
+    except Exception as e:
+        logging.error(f"MarkdownV2 failed: {e}")
+        await update.message.reply_text(plain_msg)
+
+
+async def profile(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if not is_admin(update):
+        await update.message.reply_text("⛔ This command is for bot admins only.")
+        return
+
+    from utils.profiler import MAX_PROFILE_SECONDS, ProfilerBusy, profile as run_profile
+    try:
+        seconds = float(context.args[0]) if context.args else 10
+    except ValueError:
+        await update.message.reply_text(f"Usage: /profile <seconds> (1-{MAX_PROFILE_SECONDS})")
+        return
+
+    await update.message.reply_text(f"🔬 Profiling for {min(max(seconds, 1), MAX_PROFILE_SECONDS):.0f}s...")
+    try:
+        # Sample from a worker thread so the loop keeps running (and shows up in the profile)
+        result = await asyncio.to_thread(run_profile, seconds)
+    except ProfilerBusy:
+        await update.message.reply_text("A profile is already running, try again when it finishes.")
+        return
+
+    filename = f"profile-{time.strftime('%Y%m%d-%H%M%S')}.collapsed"
+    caption = (f"{result['samples']} samples over {result['seconds']:.1f}s, "
+               f"profiler overhead {result['overhead_pct']:.2f}% of one core")
+    await update.message.reply_document(document=BytesIO(result["collapsed"].encode("utf-8")),
+                                        filename=filename, caption=caption)
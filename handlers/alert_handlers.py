@@ -1,11 +1,11 @@
 # handlers/alert_handlers.py
 
-from io import BytesIO
 from telegram._update import Update
 from telegram.ext import ContextTypes
 from services.crypto_service import get_crypto_price
-from database.database import load_alerts, save_alert
-from config import COIN_MAP
+from database.database import get_user_currency, load_alerts, save_alert
+from services.fx import format_money
+from services.coin_registry import resolve_coin, unknown_coin_message
 import sqlite3
 
 
@@ -17,8 +17,9 @@ async def setalert(update: Update, context: ContextTypes.DEFAULT_TYPE):
     coin_arg = context.args[0].lower()
     target_price_str = context.args[1]
 
-    if coin_arg not in COIN_MAP:
-        await update.message.reply_text(f"Unsupported coin: {coin_arg}. Supported: btc, eth, sol, xrp")
+    coin_id = resolve_coin(coin_arg)
+    if coin_id is None:
+        await update.message.reply_text(unknown_coin_message(coin_arg))
         return
 
     try:
@@ -27,10 +28,10 @@ async def setalert(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("Please enter a valid number.")
         return
 
-    coin_id = COIN_MAP[coin_arg]
     user_id = str(update.effective_user.id)
-    save_alert(user_id, coin_id, "price", price=target_price)
-    await update.message.reply_text(f"{coin_id.capitalize()} alert set at ${target_price:,.2f}")
+    currency = get_user_currency(user_id)
+    save_alert(user_id, coin_id, "price", price=target_price, currency=currency)
+    await update.message.reply_text(f"{coin_id.capitalize()} alert set at {format_money(target_price, currency)}")
 
 def register_alert_handlers(app):
     from telegram.ext import CommandHandler
@@ -45,8 +46,9 @@ async def setrangalert(update: Update, context: ContextTypes.DEFAULT_TYPE):
     low_str = context.args[1]
     high_str = context.args[2]
 
-    if coin_arg not in COIN_MAP:
-        await update.message.reply_text(f"Unsupported coin: {coin_arg}. Supported: btc, eth, sol, xrp")
+    coin_id = resolve_coin(coin_arg)
+    if coin_id is None:
+        await update.message.reply_text(unknown_coin_message(coin_arg))
         return
 
     try:
@@ -60,32 +62,26 @@ async def setrangalert(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("Low must be less than high.")
         return
 
-    coin_id = COIN_MAP[coin_arg]
     user_id = str(update.effective_user.id)
-    save_alert(user_id, coin_id, "range", low=low, high=high)
-    await update.message.reply_text(f"{coin_id.capitalize()} range alert set: ${low:,.2f} - ${high:,.2f}")
+    currency = get_user_currency(user_id)
+    save_alert(user_id, coin_id, "range", low=low, high=high, currency=currency)
+    await update.message.reply_text(f"{coin_id.capitalize()} range alert set: "
+                                    f"{format_money(low, currency)} - {format_money(high, currency)}")
 
 async def export_alerts(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    user_id = str(update.effective_user.id)
-    from database.database import load_alerts
-    alerts = load_alerts().get(user_id, [])
-    
-    if not alerts:
-        await update.message.reply_text("No alerts to export.")
-        return
+    import asyncio
+    from services.bulk_io import export_alerts as export_user_alerts
 
-    csv_lines = ["Coin,Alert Type,Target,Triggered"]
-    for alert in alerts:
-        if "price" in alert:
-            csv_lines.append(f"{alert['coin_id']},Price Alert,{alert['price']},{alert['triggered']}")
-        elif "low" in alert and "high" in alert:
-            csv_lines.append(f"{alert['coin_id']},Range Alert,{alert['low']} - {alert['high']},{alert['triggered']}")
-
-    csv_content = "\n".join(csv_lines)
-    bio = BytesIO(csv_content.encode())
-    bio.name = f"{user_id}_alerts.csv"
-
-    await update.message.reply_document(document=bio, filename=bio.name, caption="📊 Your alerts exported as CSV")
+    user_id = str(update.effective_user.id)
+    compress = bool(context.args) and context.args[0].lower() in ("gz", "gzip")
+    document, count = await asyncio.to_thread(export_user_alerts, user_id, compress)
+    with document:
+        if not count:
+            await update.message.reply_text("No alerts to export.")
+            return
+        filename = f"{user_id}_alerts.csv" + (".gz" if compress else "")
+        await update.message.reply_document(document=document, filename=filename,
+                                            caption=f"📊 Your {count} alerts exported as CSV (re-importable with /import)")
 
 
 async def setchangealert(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -96,8 +92,9 @@ async def setchangealert(update: Update, context: ContextTypes.DEFAULT_TYPE):
     coin_arg = context.args[0].lower()
     percent_str = context.args[1]
 
-    if coin_arg not in COIN_MAP:
-        await update.message.reply_text(f"Unsupported coin: {coin_arg}. Supported: btc, eth, sol, xrp")
+    coin_id = resolve_coin(coin_arg)
+    if coin_id is None:
+        await update.message.reply_text(unknown_coin_message(coin_arg))
         return
 
     try:
@@ -106,7 +103,6 @@ async def setchangealert(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("Please enter a valid percentage.")
         return
 
-    coin_id = COIN_MAP[coin_arg]
     user_id = str(update.effective_user.id)
 
     from database.database import save_change_alert
@@ -124,8 +120,9 @@ async def setvolumealert(update: Update, context: ContextTypes.DEFAULT_TYPE):
     coin_arg = context.args[0].lower()
     percent_str = context.args[1]
 
-    if coin_arg not in COIN_MAP:
-        await update.message.reply_text(f"Unsupported coin: {coin_arg}. Supported: btc, eth, sol, xrp")
+    coin_id = resolve_coin(coin_arg)
+    if coin_id is None:
+        await update.message.reply_text(unknown_coin_message(coin_arg))
         return
 
     try:
@@ -134,7 +131,6 @@ async def setvolumealert(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("Please enter a valid number.")
         return
 
-    coin_id = COIN_MAP[coin_arg]
     user_id = str(update.effective_user.id)
 
     from database.database import save_volume_alert
@@ -154,10 +150,11 @@ async def listalerts(update: Update, context: ContextTypes.DEFAULT_TYPE):
     msg = "Your active alerts:\n"
     for i, alert in enumerate(alerts):
         coin_name = alert.get("coin_id", "unknown").capitalize()
+        currency = alert.get("currency", "usd")
         if "price" in alert:
-            msg += f"{i+1}. {coin_name} Target: ${alert['price']:,.2f}\n"
+            msg += f"{i+1}. {coin_name} Target: {format_money(alert['price'], currency)}\n"
         elif "low" in alert and "high" in alert:
-            msg += f"{i+1}. {coin_name} Range: ${alert['low']:,.2f} - ${alert['high']:,.2f}\n"
+            msg += f"{i+1}. {coin_name} Range: {format_money(alert['low'], currency)} - {format_money(alert['high'], currency)}\n"
 
     await update.message.reply_text(msg)
 
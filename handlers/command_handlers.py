@@ -4,23 +4,25 @@ import logging
 from telegram._update import Update
 from telegram.ext import ContextTypes
 import sqlite3  # Required for subscriptions
-from config import COIN_MAP 
 from handlers.alert_handlers import export_alerts, listalerts, setalert, setchangealert, setrangalert, setvolumealert
 from handlers.graph_command import graph
 from handlers.manual_handlers import forcerun, history, sendprices, subscribe, unsubscribe
 from handlers.market_handlers import listcoinsgain, listcoinsloss, listcoinstop
 from handlers.news_handlers import news
-from handlers.portfolio_handlers import buy, portfolio, sell, viewportfolio
-from handlers.price_handlers import price, price_btc, price_eth, price_sol, price_usdt, price_xrp
+from handlers.import_handlers import import_data
+from handlers.portfolio_handlers import buy, export_portfolio, performance, portfolio, sell, viewportfolio
+from handlers.price_handlers import currency, price, price_btc, price_eth, price_sol, price_usdt, price_xrp
 from utils.forcenow import forcenow
-from config import last_known_prices
 from utils.price_utils import price_history, MAX_HISTORY_ITEMS
 from handlers.misc_handlers import start, help_command
+from handlers.admin_handlers import profile, stats
+from utils.lanes import laned
+from utils.tracing import trace_command_handlers, traced
 
 
 
 def register_commands(app):
-    from telegram.ext import CommandHandler
+    from telegram.ext import CommandHandler, MessageHandler, filters
 
      # Misc
 
@@ -36,6 +38,7 @@ def register_commands(app):
     app.add_handler(CommandHandler("pricesol", price_sol))
     app.add_handler(CommandHandler("pricexrp", price_xrp))
     app.add_handler(CommandHandler("priceusdt", price_usdt))
+    app.add_handler(CommandHandler("currency", currency))
 
     # Alerts
 
@@ -55,6 +58,8 @@ def register_commands(app):
     app.add_handler(CommandHandler("unsubscribe", unsubscribe))
     app.add_handler(CommandHandler("forcenow", forcenow))
     app.add_handler(CommandHandler("history", history))
+    app.add_handler(CommandHandler("stats", stats))
+    app.add_handler(CommandHandler("profile", profile))
 
      # Market updates
 
@@ -74,5 +79,16 @@ def register_commands(app):
 
     app.add_handler(CommandHandler("portfolio", portfolio))
     app.add_handler(CommandHandler("viewportfolio", viewportfolio))
+    app.add_handler(CommandHandler("performance", performance))
     app.add_handler(CommandHandler("sell", sell))
     app.add_handler(CommandHandler("buy", buy))
+    app.add_handler(CommandHandler("export_portfolio", export_portfolio))
+
+     # Bulk import: "/import" replying to a file, or a file captioned "/import"
+
+    app.add_handler(CommandHandler("import", import_data))
+    app.add_handler(MessageHandler(filters.Document.ALL & filters.CaptionRegex(r"^/import\b"),
+                                   traced("import", laned(import_data))))
+
+    # Per-update latency tracing for everything registered above
+    trace_command_handlers(app)
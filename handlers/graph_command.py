@@ -4,6 +4,7 @@ from io import BytesIO
 from telegram import Update
 from telegram.ext import ContextTypes
 from utils.price_utils import price_history
+from utils.tracing import span
 
 async def graph(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if len(context.args) != 1:
@@ -11,12 +12,12 @@ async def graph(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     coin_arg = context.args[0].lower()
-    from config import COIN_MAP
-    if coin_arg not in COIN_MAP:
-        await update.message.reply_text(f"Unsupported coin: {coin_arg}")
+    from services.coin_registry import resolve_coin, unknown_coin_message
+    coin_id = resolve_coin(coin_arg)
+    if coin_id is None:
+        await update.message.reply_text(unknown_coin_message(coin_arg))
         return
 
-    coin_id = COIN_MAP[coin_arg]
     history_data = price_history.get(coin_id, [])
 
     if not history_data:
@@ -26,17 +27,18 @@ async def graph(update: Update, context: ContextTypes.DEFAULT_TYPE):
     prices = [p for p, _ in history_data]
     timestamps = [t for _, t in history_data]
 
-    plt.figure(figsize=(10, 5))
-    plt.plot(timestamps, prices, marker='o', linestyle='-', label=coin_id.capitalize())
-    plt.title(f"{coin_id.capitalize()} Price Over Time")
-    plt.xlabel("Time")
-    plt.ylabel("Price (USD)")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-
-    bio = BytesIO()
-    plt.savefig(bio, format="png")
-    bio.seek(0)
-    plt.close()
+    with span("render"):
+        plt.figure(figsize=(10, 5))
+        plt.plot(timestamps, prices, marker='o', linestyle='-', label=coin_id.capitalize())
+        plt.title(f"{coin_id.capitalize()} Price Over Time")
+        plt.xlabel("Time")
+        plt.ylabel("Price (USD)")
+        plt.xticks(rotation=45)
+        plt.tight_layout()
+
+        bio = BytesIO()
+        plt.savefig(bio, format="png")
+        bio.seek(0)
+        plt.close()
 
     await update.message.reply_photo(photo=bio, caption=f"📈 {coin_id.capitalize()} Price Graph")
\ No newline at end of file
@@ -0,0 +1,39 @@
+# handlers/import_handlers.py
+
+from telegram._update import Update
+from telegram.ext import ContextTypes
+
+IMPORT_USAGE = (
+    "Send a CSV or JSON file (optionally .gz) with the caption /import, or reply /import to one.\n"
+    "Columns: kind, coin, amount, price, low, high, percent, currency, triggered, created_at\n"
+    "  lot,sol,100,140        → 100 SOL bought at 140 in your currency\n"
+    "  price,btc,,70000       → Price alert\n"
+    "  range,eth,,,3000,4000  → Range alert\n"
+    "Exports from /export_alerts and /export_portfolio can be imported as they are."
+)
+
+
+async def import_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    import asyncio
+    from config import IMPORT_MAX_BYTES
+    from services.bulk_io import BulkImportError, import_document
+
+    message = update.message
+    document = message.document or (message.reply_to_message.document if message.reply_to_message else None)
+    if document is None:
+        await message.reply_text(IMPORT_USAGE)
+        return
+    if document.file_size and document.file_size > IMPORT_MAX_BYTES:
+        await message.reply_text(f"That file is too large; imports are limited to {IMPORT_MAX_BYTES // 1_000_000} MB.")
+        return
+
+    user_id = str(update.effective_user.id)
+    telegram_file = await document.get_file()
+    data = await telegram_file.download_as_bytearray()
+    try:
+        lots, alerts = await asyncio.to_thread(import_document, user_id, data, document.file_name or "")
+    except BulkImportError as e:
+        await message.reply_text("❌ Nothing was imported:\n" + "\n".join(e.errors))
+        return
+
+    await message.reply_text(f"✅ Imported {lots} portfolio lots and {alerts} alerts.")
@@ -1,68 +1,92 @@
 # handlers/job_handlers.py
 
 import logging
-import sqlite3
 from datetime import datetime
 import time
 from telegram.ext import Application
 from services.crypto_service import get_crypto_price
 from utils.time_utils import format_time_ago
-from database.database import load_alerts
-from config import COIN_MAP
+from database.database import connect, load_alerts
+from services.coin_registry import coin_symbol
+from services.alert_engine import alert_coins, alert_currencies, alert_message, evaluate_alerts, mark_triggered
+from services.fx import with_currencies
 
-from utils.price_utils import price_history, MAX_HISTORY_ITEMS, last_known_prices
+from utils.price_utils import price_history, MAX_HISTORY_ITEMS
+from services.event_bus import event_bus
+from utils.metrics import (ALERT_EVAL_DURATION, ALERTS_SCANNED, ALERTS_SCANNED_TOTAL,
+                           ALERTS_TRIGGERED_TOTAL, SEND_QUEUE_DEPTH)
+
+
+send_queue_depth = 0
+
+
+async def dispatch_messages(app: Application, outbox):
+    """Send (chat_id, text) pairs in order, publishing the outstanding queue depth as it drains."""
+    global send_queue_depth
+    send_queue_depth += len(outbox)
+    SEND_QUEUE_DEPTH.set(send_queue_depth)
+    event_bus.publish("queue", {"depth": send_queue_depth})
+    for user_id, msg in outbox:
+        try:
+            await app.bot.send_message(chat_id=user_id, text=msg)
+            logging.info(f"Sent message to {user_id}")
+        except Exception as e:
+            logging.error(f"Failed to send to {user_id}: {e}")
+        finally:
+            send_queue_depth -= 1
+            SEND_QUEUE_DEPTH.set(send_queue_depth)
+            event_bus.publish("queue", {"depth": send_queue_depth})
 
 async def hourly_check(app: Application, override_price=None, override_coin="bitcoin"):
 
     global last_check_time
     logging.info("Running scheduled price check...")
 
+    started = time.perf_counter()
     alerts = load_alerts()
-    triggered = []
-
-    for user_id, targets in alerts.items():
-        for alert in targets:
-            coin_id = alert.get("coin_id", "bitcoin")
-            symbol = next(k for k, v in COIN_MAP.items() if v == coin_id).upper()
-
-            current_price = get_crypto_price(coin_id, symbol,force_price=override_price)
-
-            if current_price is None:
-                continue
-
-            if "price" in alert:
-                if not alert["triggered"] and current_price >= alert["price"]:
-                    logging.info(f"{coin_id} alert triggered for user {user_id}: ${alert['price']}")
-                    alert["triggered"] = True
-                    triggered.append((user_id, alert))
-            elif "low" in alert and "high" in alert:
-                if not alert["triggered"] and alert["low"] <= current_price <= alert["high"]:
-                    logging.info(f"{coin_id} range alert triggered for user {user_id}: ${alert['low']} - ${alert['high']}")
-                    alert["triggered"] = True
-                    triggered.append((user_id, alert))
-
-    # Mark alerts as triggered
-    conn = sqlite3.connect("alerts.db")
-    cur = conn.cursor()
+
+    # One price per coin per pass, however many alerts watch it
+    quotes = {}
+    for coin_id in alert_coins(alerts):
+        # A forced price only applies to the coin it was forced for
+        forced = override_price if coin_id == override_coin else None
+        current_price = get_crypto_price(coin_id, coin_symbol(coin_id), force_price=forced)
+        if current_price is not None:
+            quotes[coin_id] = {"price": current_price}
+
+    scanned = await check_quotes(app, alerts, quotes, started)
+
+    last_check_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())
+    return scanned
+
+
+async def check_quotes(app: Application, alerts, quotes, started):
+    """Evaluate `alerts` against fresh `quotes`, persist what fired and notify the owners. Returns alerts scanned."""
+    with_currencies(quotes, alert_currencies(alerts))
+    triggered, scanned = evaluate_alerts(alerts, quotes)
+
+    # Mark alerts as triggered; only the ones this process flipped get notified
+    if triggered:
+        conn = connect()
+        triggered = mark_triggered(conn, triggered)
+        conn.close()
     for user_id, alert in triggered:
-        cur.execute("UPDATE alerts SET triggered = 1 WHERE id = ?", (alert["id"],))
-    conn.commit()
-    conn.close()
+        logging.info(f"{alert['coin_id']} alert {alert['id']} triggered for user {user_id}")
+
+    ALERT_EVAL_DURATION.observe(time.perf_counter() - started)
+    ALERTS_SCANNED.set(scanned)
+    ALERTS_SCANNED_TOTAL.inc(scanned)
+    ALERTS_TRIGGERED_TOTAL.inc(len(triggered))
 
     # Send messages
+    outbox = []
     for user_id, alert in triggered:
-        coin_name = alert.get("coin_id", "BTC").capitalize()
-        if "price" in alert:
-            msg = f"🚨 {coin_name} has reached your target price: ${alert['price']:,.2f}!"
-        else:
-            msg = f"🔔 {coin_name} is in your target range: ${alert['low']:,.2f} - ${alert['high']:,.2f}"
-
-        try: 
-           await app.bot.send_message(chat_id=user_id, text=msg)
-        except Exception as e:
-            logging.error(f"Failed to send to {user_id}: {e}")
+        msg = alert_message(alert)
+        event_bus.publish("alert", {"user_id": user_id, **alert})
+        outbox.append((user_id, msg))
 
-    last_check_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())
+    await dispatch_messages(app, outbox)
+    return scanned
 
 
 async def send_periodic_prices(app: Application):
@@ -82,7 +106,7 @@ async def send_periodic_prices(app: Application):
         return
 
     # Get all subscribers
-    conn = sqlite3.connect("alerts.db")
+    conn = connect()
     cur = conn.cursor()
     cur.execute("SELECT user_id FROM subscribers")
     subscriber_rows = cur.fetchall()
@@ -96,10 +120,5 @@ async def send_periodic_prices(app: Application):
     msg += f"🔵 XRP (XRP): ${prices['xrp']:,.2f}"
 
     # Send to all subscribers
-    for row in subscriber_rows:
-        user_id = row[0]
-        try:
-            await app.bot.send_message(chat_id=user_id, text=msg)
-            logging.info(f"Sent market update to {user_id}")
-        except Exception as e:
-            logging.error(f"Failed to send to {user_id}: {e}")
\ No newline at end of file
+    await dispatch_messages(app, [(row[0], msg) for row in subscriber_rows])
+    return len(subscriber_rows)
@@ -1,16 +1,16 @@
 
 
 
-import sqlite3
 from telegram.ext import ContextTypes
 from telegram import Update
 
-from config import COIN_MAP
+from database.database import connect
+from services.coin_registry import coin_symbol, resolve_coin, unknown_coin_message
 
 
 async def subscribe(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = str(update.effective_user.id)
-    conn = sqlite3.connect("alerts.db")
+    conn = connect()
     cur = conn.cursor()
     cur.execute("INSERT OR IGNORE INTO subscribers (user_id) VALUES (?)", (user_id,))
     conn.commit()
@@ -20,7 +20,7 @@ async def subscribe(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def unsubscribe(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = str(update.effective_user.id)
-    conn = sqlite3.connect("alerts.db")
+    conn = connect()
     cur = conn.cursor()
     cur.execute("DELETE FROM subscribers WHERE user_id = ?", (user_id,))
     cur.execute("DELETE FROM sol_subscribers WHERE user_id = ?", (user_id,))
@@ -37,8 +37,9 @@ async def forcerun(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     coin_arg = context.args[0].lower()
-    if coin_arg not in COIN_MAP:
-        await update.message.reply_text(f"Unsupported coin: {coin_arg}. Supported: btc, eth, sol, xrp")
+    coin_id = resolve_coin(coin_arg)
+    if coin_id is None:
+        await update.message.reply_text(unknown_coin_message(coin_arg))
         return
 
     try:
@@ -48,8 +49,8 @@ async def forcerun(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     from handlers.job_handlers import hourly_check
-    await hourly_check(context.application, override_price=fake_price, override_coin=COIN_MAP[coin_arg])
-    await update.message.reply_text(f"Manual check done for {coin_arg.upper()} @ ${fake_price:,.2f}")
+    await hourly_check(context.application, override_price=fake_price, override_coin=coin_id)
+    await update.message.reply_text(f"Manual check done for {coin_symbol(coin_id)} @ ${fake_price:,.2f}")
 
 
 async def sendprices(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -64,24 +65,22 @@ async def history(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     coin_arg = context.args[0].lower()
-    from config import COIN_MAP
 
     if coin_arg == "all":
         msg = "📈 Full Price History\n\n"
-        from config import COIN_MAP
         from utils.price_utils import price_history
-        for coin_id in COIN_MAP.values():
+        for coin_id in price_history:
             if coin_id in price_history and price_history[coin_id]:
                 last_price, ts = price_history[coin_id][-1]
                 msg += f"{coin_id.capitalize()}: ${last_price:,.2f} (Last updated: {ts})\n"
         await update.message.reply_text(msg)
         return
 
-    if coin_arg not in COIN_MAP:
-        await update.message.reply_text(f"Unsupported coin: {coin_arg}. Supported: btc, eth, sol, xrp, all")
+    coin_id = resolve_coin(coin_arg)
+    if coin_id is None:
+        await update.message.reply_text(unknown_coin_message(coin_arg))
         return
 
-    coin_id = COIN_MAP[coin_arg]
     from utils.price_utils import price_history
 
     if coin_id not in price_history or not price_history[coin_id]:
@@ -2,6 +2,7 @@
 
 from telegram._update import Update
 from telegram.ext import ContextTypes
+from utils.render import escape_md
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text("Welcome to Price Pilot Bot!\n\n"
@@ -14,21 +15,30 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
                                     "  /subscribe - BTC/ETH/SOL/XRP every 30 mins")
 
 
-async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    msg = "*Available Commands*\n\n"
-    msg += "/start - Start the bot\n"
-    msg += "/price <coin> - Get current price\n"
-    msg += "/setalert <coin> <price> - Set price alert\n"
-    msg += "/setrangalert <coin> <low> <high> - Set range alert\n"
-    msg += "/listalerts - View active alerts\n"
-    msg += "/forcerun <coin> <price> - Manual check\n"
-    msg += "/sendprices - Send market update to subscribers\n"
-    msg += "/subscribe - Get price updates\n"
-    msg += "/history <coin> - Price history\n"
-    msg += "/viewportfolio - View your holdings\n"
-    msg += "/graph <coin> - Show price chart\n"
-    msg += "/news [coin] - Latest crypto news\n"
-    msg += "/buy <coin> <amount> [price] - Add to portfolio\n"
-    msg += "/sell <coin> <amount> - Remove from portfolio"
+HELP_LINES = (
+    "/start - Start the bot",
+    "/price <coin> - Get current price",
+    "/currency <code> - Show prices in USD, EUR, GBP, JPY or BTC",
+    "/setalert <coin> <price> - Set price alert",
+    "/setrangalert <coin> <low> <high> - Set range alert",
+    "/listalerts - View active alerts",
+    "/export_alerts [gz] - Download your alerts as CSV",
+    "/forcerun <coin> <price> - Manual check",
+    "/sendprices - Send market update to subscribers",
+    "/subscribe - Get price updates",
+    "/history <coin> - Price history",
+    "/viewportfolio - View your holdings",
+    "/performance - Returns, drawdown and contribution over 7d, 30d and 1y",
+    "/graph <coin> - Show price chart",
+    "/news [coin] - Latest crypto news",
+    "/news search <terms> - Search recent news",
+    "/buy <coin> <amount> [price] - Add to portfolio",
+    "/sell <coin> <amount> - Remove from portfolio",
+    "/export_portfolio [gz] - Download your portfolio lots as CSV",
+    "/import - Bulk add lots and alerts from a CSV or JSON file",
+)
+HELP_MESSAGE = "*Available Commands*\n\n" + "\n".join(escape_md(line) for line in HELP_LINES)
+
 
-    await update.message.reply_text(msg, parse_mode="MarkdownV2")
\ No newline at end of file
+async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await update.message.reply_text(HELP_MESSAGE, parse_mode="MarkdownV2")
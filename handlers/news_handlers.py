@@ -1,91 +1,68 @@
+import asyncio
 import logging
 from telegram._update import Update
 from telegram.ext import ContextTypes
-from services.news_service import get_crypto_news
-
-
+from utils.render import link_list_message
+from utils.time_utils import format_age
 
 
 async def news(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if context.args and context.args[0].lower() == "search":
+        await news_search(update, context)
+        return
+
     if len(context.args) > 1:
-        await update.message.reply_text("Usage: /news [coin]")
+        await update.message.reply_text("Usage: /news [coin] or /news search <terms>")
         return
 
     coin_arg = context.args[0].lower() if context.args else None
-    from config import COIN_MAP
-    coin_id = COIN_MAP.get(coin_arg, coin_arg) if coin_arg else None
-
-    from services.news_service import get_crypto_news
-    news_data = get_crypto_news(coin_id)
+    from services.coin_registry import resolve_coin
+    coin_id = (resolve_coin(coin_arg) or coin_arg) if coin_arg else None
+
+    from services.news_service import get_cached_news, news_category, refresh_news, refresh_news_in_background
+    from database.news_index import news_for_coin
+
+    # Everything tagged with this coin at ingest time, not only its own feed's latest page
+    indexed = news_for_coin(coin_id) if coin_id else []
+    news_data, age = get_cached_news(coin_id)
+    if age is None:
+        if indexed:
+            refresh_news_in_background(news_category(coin_id))
+        else:
+            # Cold cache and nothing indexed yet: fill it once off the event loop
+            await asyncio.to_thread(refresh_news, news_category(coin_id))
+            news_data, age = get_cached_news(coin_id)
+    news_data = indexed or news_data
 
     if not news_data:
         await update.message.reply_text("📰 No recent crypto news found at the moment.")
         return
 
-    msg = f"📰 Top 3 Crypto News{' for ' + coin_arg.upper() if coin_arg else ''}\n\n"
-
-    for item in news_data:
-        title = item.get("title", "Untitled Article")
-        summary = item.get("summary", "")
-        url = item.get("url", "#")
-
-        msg += f"🔹 *{title}*\n"
-        if summary:
-            msg += f"{summary[:150]}...\n"
-        msg += f"[Read more]({url})\n\n"
+    title = f"📰 Top {len(news_data)} Crypto News{' for ' + coin_arg.upper() if coin_arg else ''} (updated {format_age(age)})"
+    markdown_msg, plain_msg = link_list_message(title, news_data)
 
     try:
-        await update.message.reply_markdown_v2(msg)
+        await update.message.reply_markdown_v2(markdown_msg, disable_web_page_preview=True)
     except Exception as e:
         logging.error(f"MarkdownV2 failed: {e}")
-        plain_msg = ""
-        for item in news_data:
-            plain_msg += f"- {item['title']}\n  → {item.get('summary', '')[:100]}...\n\n"
-        await update.message.reply_text(plain_msg or "No news found.")
+        await update.message.reply_text(plain_msg, disable_web_page_preview=True)
 
-# handlers/command_handlers.py
 
-async def news(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    if len(context.args) > 1:
-        await update.message.reply_text("Usage: /news [coin]")
+async def news_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    terms = " ".join(context.args[1:])
+    if not terms.strip():
+        await update.message.reply_text("Usage: /news search <terms> (e.g., /news search etf approval)")
         return
 
-    coin_arg = context.args[0].lower() if context.args else None
-    from config import COIN_MAP
-    coin_id = COIN_MAP.get(coin_arg, coin_arg) if coin_arg else None
-
-    from services.news_service import get_crypto_news
-    news_data = get_crypto_news(coin_id)
-
-    if not news_data:
-        await update.message.reply_text("📰 No recent crypto news found at the moment.")
+    from database.news_index import NEWS_RETENTION_DAYS, search_news
+    results = search_news(terms)
+    if not results:
+        await update.message.reply_text(f"🔎 No news in the last {NEWS_RETENTION_DAYS} days matches \"{terms}\".")
         return
 
-    msg = f"📰 *Top 3 Crypto News{' for ' + coin_arg.upper() if coin_arg else ''}*\n\n"
-
-    for i, item in enumerate(news_data):
-        title = item.get("title", "Untitled Article")
-        summary = item.get("summary", "")
-        url = item.get("url", "#")
-
-        # Proper Markdown escaping
-        title_escaped = title.replace("-", "\\-").replace(".", "\\.").replace("(", "\\(")
-        summary_escaped = summary.replace("-", "\\-").replace(".", "\\.").replace("(", "\\(")
-        
-        msg += f"*{i+1}\\. {title_escaped}*\n"
-        if summary:
-            msg += f"_{summary_escaped}_\n"
-        msg += f"[Read more ↗]({url})\n\n"
-
+    markdown_msg, plain_msg = link_list_message(f"🔎 News matching \"{terms}\"", results)
     try:
-        await update.message.reply_markdown_v2(msg, disable_web_page_preview=True)
+        await update.message.reply_markdown_v2(markdown_msg, disable_web_page_preview=True)
     except Exception as e:
         logging.error(f"MarkdownV2 failed: {e}")
-        plain_msg = "📰 Top 3 Crypto News:\n\n"
-        for i, item in enumerate(news_data):
-            plain_msg += f"{i+1}. {item['title']}\n"
-            if item.get('summary'):
-                plain_msg += f"   {item['summary']}\n"
-            plain_msg += f"   {item['url']}\n\n"
-        await update.message.reply_text(plain_msg)
-
+        await update.message.reply_text(plain_msg, disable_web_page_preview=True)
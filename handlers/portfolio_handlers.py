@@ -1,13 +1,24 @@
 from telegram._update import Update
 from telegram.ext import ContextTypes
+import math
 import sqlite3
 from collections import defaultdict
-from config import COIN_MAP
+from services.coin_registry import coin_symbol, resolve_coin, unknown_coin_message
 from services.crypto_service import get_crypto_price
 from database.database import save_portfolio_data, load_portfolio
+from services.fx import format_money
 
+DUST = 1e-9   # Holdings below this after sales count as sold out
 
 
+def _user_fx(user_id):
+    """(quote currency, units per USD) for display; USD while the FX table lacks the user's currency."""
+    from database.database import get_user_currency
+    from services.fx import rate
+    currency = get_user_currency(user_id)
+    fx = rate(currency)
+    return (currency, fx) if fx else ("usd", 1.0)
+
 
 async def portfolio(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = str(update.effective_user.id)
@@ -21,8 +32,9 @@ async def portfolio(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     coin_arg = context.args[0].lower()
-    if coin_arg not in COIN_MAP:
-        await update.message.reply_text(f"Unsupported coin: {coin_arg}. Supported: btc, eth, sol, xrp")
+    coin_id = resolve_coin(coin_arg)
+    if coin_id is None:
+        await update.message.reply_text(unknown_coin_message(coin_arg))
         return
 
     try:
@@ -32,18 +44,20 @@ async def portfolio(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("Please enter valid numbers for amount and bought_at.")
         return
 
+    # Lots are stored in USD; the price the user typed is in their quote currency
+    currency, fx = _user_fx(user_id)
     from database.database import save_portfolio_data
-    coin_id = COIN_MAP[coin_arg]
-    save_portfolio_data(user_id, coin_id, amount, bought_at)
+    save_portfolio_data(user_id, coin_id, amount, bought_at / fx if bought_at else bought_at)
 
-    msg = f"✅ Added {amount} {coin_arg.upper()} to your portfolio."
+    symbol = coin_symbol(coin_id)
+    msg = f"✅ Added {amount} {symbol} to your portfolio."
     if bought_at:
-        msg += f" Bought at ${bought_at:,.2f}"
+        msg += f" Bought at {format_money(bought_at, currency)}"
     else:
         from services.crypto_service import get_crypto_price
-        current_price = get_crypto_price(coin_id, coin_arg.upper())
+        current_price = get_crypto_price(coin_id, symbol)
         if current_price:
-            msg += f" (Current Price: ${current_price:,.2f})"
+            msg += f" (Current Price: {format_money(current_price * fx, currency)})"
     await update.message.reply_text(msg)
 
 
@@ -58,36 +72,42 @@ async def viewportfolio(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     from collections import defaultdict
     from services.crypto_service import get_crypto_price
-    from config import COIN_MAP
 
     # Group by coin_id
     grouped = defaultdict(lambda: {"total_amount": 0, "avg_cost": 0})
+    current_prices = {}
     total_value = 0
 
     for item in portfolio_items:
         coin_id, amount, bought_at = item
-        symbol = next(k for k, v in COIN_MAP.items() if v == coin_id).upper()
-        current_price = get_crypto_price(coin_id, symbol)
-
-        if current_price is None:
-            await update.message.reply_text(f"Failed to fetch current price for {symbol}. Try again later.")
-            return
+        if coin_id not in current_prices:
+            symbol = coin_symbol(coin_id)
+            current_prices[coin_id] = get_crypto_price(coin_id, symbol)
+            if current_prices[coin_id] is None:
+                await update.message.reply_text(f"Failed to fetch current price for {symbol}. Try again later.")
+                return
+        current_price = current_prices[coin_id]
 
         # Grouped stats
         grouped[coin_id]["total_amount"] += amount
+        if abs(grouped[coin_id]["total_amount"]) < DUST:
+            continue  # Sold out; the next buy starts a fresh average
         grouped[coin_id]["avg_cost"] = (
             grouped[coin_id]["avg_cost"] * (grouped[coin_id]["total_amount"] - amount) + bought_at * amount
         ) / grouped[coin_id]["total_amount"]
-        total_value += amount * current_price
 
+    currency, fx = _user_fx(user_id)
     msg = "💼 Your Crypto Portfolio\n\n"
 
     for coin_id, data in grouped.items():
-        symbol = next(k for k, v in COIN_MAP.items() if v == coin_id).upper()
+        symbol = coin_symbol(coin_id)
         amount = data["total_amount"]
+        if abs(amount) < DUST:
+            continue
         avg_cost = data["avg_cost"]
-        current_price = get_crypto_price(coin_id, symbol)
+        current_price = current_prices[coin_id]
         value = amount * current_price
+        total_value += value
 
         gain_loss_msg = ""
         profit = value - (avg_cost * amount)
@@ -95,15 +115,16 @@ async def viewportfolio(update: Update, context: ContextTypes.DEFAULT_TYPE):
             change_percent = (profit / (avg_cost * amount)) * 100
             arrow = "🟢" if change_percent >= 0 else "🔴"
             sign = "+" if change_percent >= 0 else "-"
-            gain_loss_msg = f"{arrow} {sign}{abs(change_percent):.2f}% ({'Profit' if profit > 0 else 'Loss'}: ${abs(profit):,.2f})"
+            gain_loss_msg = (f"{arrow} {sign}{abs(change_percent):.2f}% "
+                             f"({'Profit' if profit > 0 else 'Loss'}: {format_money(abs(profit) * fx, currency)})")
 
         msg += f"{symbol}: {amount:.2f}\n"
-        msg += f"Price: ${current_price:,.2f} | Value: ${value:,.2f}\n"
+        msg += f"Price: {format_money(current_price * fx, currency)} | Value: {format_money(value * fx, currency)}\n"
         if avg_cost != 0:
             msg += f"Gain/Loss: {gain_loss_msg}\n"
         msg += "\n"
 
-    msg += f"💰 Total Portfolio Value: ${total_value:,.2f}"
+    msg += f"💰 Total Portfolio Value: {format_money(total_value * fx, currency)}"
 
     await update.message.reply_text(msg)
 
@@ -119,8 +140,9 @@ async def buy(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     coin_arg = context.args[0].lower()
-    if coin_arg not in COIN_MAP:
-        await update.message.reply_text(f"Unsupported coin: {coin_arg}. Supported: btc, eth, sol, xrp")
+    coin_id = resolve_coin(coin_arg)
+    if coin_id is None:
+        await update.message.reply_text(unknown_coin_message(coin_arg))
         return
 
     try:
@@ -130,18 +152,20 @@ async def buy(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("Please enter valid numbers for amount and bought_at.")
         return
 
+    # Lots are stored in USD; the price the user typed is in their quote currency
+    currency, fx = _user_fx(user_id)
     from database.database import save_portfolio_data
-    coin_id = COIN_MAP[coin_arg]
-    save_portfolio_data(user_id, coin_id, amount, bought_at)
+    save_portfolio_data(user_id, coin_id, amount, bought_at / fx if bought_at else bought_at)
 
-    msg = f"✅ Added {amount} {coin_arg.upper()} to your portfolio."
+    symbol = coin_symbol(coin_id)
+    msg = f"✅ Added {amount} {symbol} to your portfolio."
     if bought_at:
-        msg += f" Bought at ${bought_at:,.2f}"
+        msg += f" Bought at {format_money(bought_at, currency)}"
     else:
         from services.crypto_service import get_crypto_price
-        current_price = get_crypto_price(coin_id, coin_arg.upper())
+        current_price = get_crypto_price(coin_id, symbol)
         if current_price:
-            msg += f" (Current Price: ${current_price:,.2f})"
+            msg += f" (Current Price: {format_money(current_price * fx, currency)})"
     await update.message.reply_text(msg)
 
 async def sell(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -155,8 +179,9 @@ async def sell(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     coin_arg = context.args[0].lower()
-    if coin_arg not in COIN_MAP:
-        await update.message.reply_text(f"Unsupported coin: {coin_arg}. Supported: btc, eth, sol, xrp")
+    coin_id = resolve_coin(coin_arg)
+    if coin_id is None:
+        await update.message.reply_text(unknown_coin_message(coin_arg))
         return
 
     try:
@@ -164,9 +189,11 @@ async def sell(update: Update, context: ContextTypes.DEFAULT_TYPE):
     except ValueError:
         await update.message.reply_text("Please enter a valid number for amount.")
         return
+    if not math.isfinite(amount) or amount <= 0:
+        await update.message.reply_text("Amount to sell must be a positive number.")
+        return
 
     from database.database import load_portfolio, update_portfolio
-    coin_id = COIN_MAP[coin_arg]
 
     # Load current portfolio
     portfolio_items = load_portfolio(user_id)
@@ -180,7 +207,7 @@ async def sell(update: Update, context: ContextTypes.DEFAULT_TYPE):
             total_cost += item[1] * item[2]
 
     if total_amount < amount:
-        await update.message.reply_text(f"You don't have enough {coin_arg.upper()} in your portfolio.")
+        await update.message.reply_text(f"You don't have enough {coin_symbol(coin_id)} in your portfolio.")
         return
 
     # Update portfolio
@@ -189,11 +216,61 @@ async def sell(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Calculate sold value
     avg_cost = total_cost / total_amount
     sold_value = amount * avg_cost
+    currency, fx = _user_fx(user_id)
 
     await update.message.reply_text(
-        f"✅ Sold {amount} {coin_arg.upper()}.\n"
-        f"Sold at average cost: ${avg_cost:,.2f}\n"
-        f"Total sold value: ${sold_value:,.2f}"
+        f"✅ Sold {amount} {coin_symbol(coin_id)}.\n"
+        f"Sold at average cost: {format_money(avg_cost * fx, currency)}\n"
+        f"Total sold value: {format_money(sold_value * fx, currency)}"
     )
 
 
+
+def _percent(value):
+    return "n/a" if value is None else f"{value * 100:+.2f}%"
+
+
+async def performance(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    import asyncio
+    from services.performance import PERFORMANCE_WINDOWS, portfolio_performance
+
+    user_id = str(update.effective_user.id)
+    results = await asyncio.to_thread(portfolio_performance, user_id)
+    if not results:
+        await update.message.reply_text("Your portfolio is empty. Use `/buy <coin> <amount>` to add coins.")
+        return
+
+    currency, fx = _user_fx(user_id)
+    msg = "📊 Portfolio Performance (returns in USD, daily closes)\n"
+    for label, _ in PERFORMANCE_WINDOWS:
+        stats = results.get(label)
+        msg += f"\n{label}\n"
+        if stats is None:
+            msg += "Not enough history yet.\n"
+            continue
+        msg += f"Time-weighted: {_percent(stats['twr'])} | Money-weighted: {_percent(stats['mwr'])}\n"
+        msg += f"Max drawdown: {_percent(stats['max_drawdown'])} | From peak: {_percent(stats['drawdown'])}\n"
+        msg += (f"Value: {format_money(stats['start_value'] * fx, currency)} → "
+                f"{format_money(stats['end_value'] * fx, currency)} "
+                f"(net added: {format_money(stats['net_flows'] * fx, currency)})\n")
+        top = sorted(stats["contribution"].items(), key=lambda item: -abs(item[1]))[:5]
+        if top:
+            msg += "Contribution: " + ", ".join(f"{coin_symbol(coin)} {_percent(c)}" for coin, c in top) + "\n"
+
+    await update.message.reply_text(msg)
+
+
+async def export_portfolio(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    import asyncio
+    from services.bulk_io import export_portfolio as export_user_portfolio
+
+    user_id = str(update.effective_user.id)
+    compress = bool(context.args) and context.args[0].lower() in ("gz", "gzip")
+    document, count = await asyncio.to_thread(export_user_portfolio, user_id, compress)
+    with document:
+        if not count:
+            await update.message.reply_text("Your portfolio is empty. Use `/buy <coin> <amount>` to add coins.")
+            return
+        filename = f"{user_id}_portfolio.csv" + (".gz" if compress else "")
+        await update.message.reply_document(document=document, filename=filename,
+                                            caption=f"💼 Your {count} portfolio lots exported as CSV (prices in USD)")
@@ -2,11 +2,23 @@
 from telegram._update import Update
 from telegram.ext import ContextTypes
 from services.crypto_service import get_crypto_price
-from config import COIN_MAP, last_known_prices
+from utils.price_board import last_price
+from services.coin_registry import coin_symbol, resolve_coin, unknown_coin_message
 from utils.time_utils import format_time_ago
 
 
 
+def price_text(user_id, coin_id, symbol, usd_price):
+    """The /price reply, e.g. "BTC Price: €60,123.45 (Updated just now)", in the user's quote currency."""
+    from database.database import get_user_currency
+    from services.fx import convert, format_money
+    currency = get_user_currency(user_id)
+    amount = convert(usd_price, currency)
+    if amount is None:
+        currency, amount = "usd", usd_price
+    timestamp = (last_price(coin_id) or (None, "N/A"))[1]
+    return f"{symbol} Price: {format_money(amount, currency)} (Updated {format_time_ago(timestamp)})"
+
 
 async def price(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if len(context.args) != 1:
@@ -14,40 +26,33 @@ async def price(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     coin_arg = context.args[0].lower()
-    if coin_arg not in COIN_MAP:
-        await update.message.reply_text(f"Unsupported coin: {coin_arg}. Supported: btc, eth, sol, xrp")
+    coin_id = resolve_coin(coin_arg)
+    if coin_id is None:
+        await update.message.reply_text(unknown_coin_message(coin_arg))
         return
 
-    coin_id = COIN_MAP[coin_arg]
-    symbol = coin_arg.upper()
+    symbol = coin_symbol(coin_id)
     current_price = get_crypto_price(coin_id, symbol)
 
     if current_price is not None:
-        timestamp = last_known_prices.get(coin_id, (None, "N/A"))[1]
-        time_msg = f" (Updated {format_time_ago(timestamp)}"
-        await update.message.reply_text(f"{symbol} Price: ${current_price:,.2f}{time_msg}")
+        await update.message.reply_text(price_text(str(update.effective_user.id), coin_id, symbol, current_price))
     else:
         await update.message.reply_text(f"Failed to fetch {symbol} price.")
 
 
 async def price_coin(update: Update, context: ContextTypes.DEFAULT_TYPE, coin_arg: str):
-    from config import COIN_MAP
     from services.crypto_service import get_crypto_price
-    from utils.time_utils import format_time_ago
-    from config import last_known_prices
 
-    if coin_arg not in COIN_MAP:
-        await update.message.reply_text(f"Unsupported coin: {coin_arg}. Supported: btc, eth, sol, xrp")
+    coin_id = resolve_coin(coin_arg)
+    if coin_id is None:
+        await update.message.reply_text(unknown_coin_message(coin_arg))
         return
 
-    coin_id = COIN_MAP[coin_arg]
-    symbol = coin_arg.upper()
+    symbol = coin_symbol(coin_id)
     current_price = get_crypto_price(coin_id, symbol)
 
     if current_price is not None:
-        timestamp = last_known_prices.get(coin_id, (None, "N/A"))[1]
-        time_msg = f" (Updated {format_time_ago(timestamp)}"
-        await update.message.reply_text(f"{symbol} Price: ${current_price:,.2f}{time_msg}")
+        await update.message.reply_text(price_text(str(update.effective_user.id), coin_id, symbol, current_price))
     else:
         await update.message.reply_text(f"Failed to fetch {symbol} price.")
 
@@ -66,3 +71,22 @@ async def price_xrp(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def price_usdt(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await price_coin(update, context, "usdt")
 
+
+async def currency(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    from config import QUOTE_CURRENCIES
+    from database.database import get_user_currency, set_user_currency
+
+    user_id = str(update.effective_user.id)
+    supported = ", ".join(code.upper() for code in QUOTE_CURRENCIES)
+    if len(context.args) != 1:
+        await update.message.reply_text(f"Your quote currency is {get_user_currency(user_id).upper()}.\n"
+                                        f"Usage: /currency <code> ({supported})")
+        return
+
+    code = context.args[0].lower()
+    if code not in QUOTE_CURRENCIES:
+        await update.message.reply_text(f"Unsupported currency. Choose one of: {supported}")
+        return
+
+    set_user_currency(user_id, code)
+    await update.message.reply_text(f"✅ Prices, new alerts and portfolio values will be shown in {code.upper()}.")
@@ -8,34 +8,95 @@ import signal
 
 from telegram._update import Update
 from telegram.ext import ContextTypes, ApplicationBuilder
-from http.server import BaseHTTPRequestHandler, HTTPServer
 import threading
 from utils.price_utils import price_history, MAX_HISTORY_ITEMS
+from utils.price_board import price_board
 
 # Load config
-from config import TELEGRAM_BOT_TOKEN, COIN_MAP, HEADERS, last_known_prices
+from config import (TELEGRAM_BOT_TOKEN, TELEGRAM_API_URL, COIN_MAP, HEADERS, HEALTH_PORT, DASHBOARD_PORT,
+                    POLL_INTERVAL, UPDATE_QUEUE_SIZE, CONCURRENT_UPDATES, ALERT_WORKERS, WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_SECRET,
+                    ADAPTIVE_POLLING, POLL_FIXED_INTERVAL, PRICE_STREAM, FX_REFRESH_INTERVAL)
 
 # Load handlers
 from handlers.alert_handlers import register_alert_handlers
 from handlers.command_handlers import register_commands
 from handlers.job_handlers import hourly_check, send_periodic_prices
+from services.poll_scheduler import TICK_SECONDS, adaptive_check
+from utils.jobs import add_interval_job, watch_jobs
+from services.fx import refresh_rates, refresh_rates_in_background
 from handlers.error_handler import error_handler  # ✅ Now properly imported
+from services import command_bus, webhook
+from services.coin_registry import coin_registry
+from services.news_service import refresh_news_in_background, refresh_all_news
+from services.health_server import register_check, register_post_route, start_health_server
+from services.telegram_request import InstrumentedRequest
+from utils.loop_watchdog import monitor_loop_lag, start_loop_watchdog
 
 # Setup logging
 logging.basicConfig(format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO)
 
 # Global app reference
 app_instance = None
+_background_tasks = set()  # The loop only keeps weak references to tasks
+
+
+def _database_ready():
+    from database.database import connect
+    conn = connect(timeout=2)
+    try:
+        return conn.execute("SELECT 1").fetchone() == (1,)
+    finally:
+        conn.close()
+
+
+async def run_webhook(app):
+    """Take updates pushed to the health server instead of polling getUpdates."""
+    if not WEBHOOK_SECRET:
+        raise RuntimeError("WEBHOOK_SECRET is required when WEBHOOK_URL is set")
+    webhook.bind(asyncio.get_running_loop(), app, WEBHOOK_SECRET)
+    register_post_route(WEBHOOK_PATH, webhook.handle_update)
+
+    async with app:
+        await app.start()
+        # Pending updates are kept: Telegram redelivers whatever arrived while we were down
+        await app.bot.set_webhook(url=f"{WEBHOOK_URL.rstrip('/')}{WEBHOOK_PATH}", secret_token=WEBHOOK_SECRET,
+                                  allowed_updates=Update.ALL_TYPES)
+        print("Bot started (webhook)...")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await app.stop()
 
 
 async def main():
     global app_instance
 
     # Initialize bot
-    app = ApplicationBuilder().token(TELEGRAM_BOT_TOKEN).build()
+    app = (
+        ApplicationBuilder()
+        .token(TELEGRAM_BOT_TOKEN)
+        .base_url(f"{TELEGRAM_API_URL}/bot")
+        .base_file_url(f"{TELEGRAM_API_URL}/file/bot")
+        # One connection per concurrent handler and then some; a bare HTTPXRequest has a pool of 1
+        .request(InstrumentedRequest(connection_pool_size=max(CONCURRENT_UPDATES * 2, 32), pool_timeout=5.0))
+        .update_queue(asyncio.Queue(maxsize=UPDATE_QUEUE_SIZE))
+        .concurrent_updates(CONCURRENT_UPDATES)
+        .build()
+    )
     app.add_error_handler(error_handler)  # ✅ Now works!
     app_instance = app
 
+    # Create the shared price board before the dashboard and cluster processes attach to it
+    price_board()
+
+    # Let the dashboard thread run admin actions on this loop
+    command_bus.bind(asyncio.get_running_loop(), app)
+    _background_tasks.add(asyncio.create_task(monitor_loop_lag()))
+    if PRICE_STREAM:
+        from services.price_stream import run_price_stream
+        _background_tasks.add(asyncio.create_task(run_price_stream()))
+    start_loop_watchdog()
+
     # Register all command handlers
     register_commands(app)
     register_alert_handlers(app)
@@ -43,44 +104,61 @@ async def main():
     # Start scheduler inside async context
     from apscheduler.schedulers.asyncio import AsyncIOScheduler
     scheduler = AsyncIOScheduler()
-    scheduler.add_job(hourly_check, 'interval', minutes=10, args=[app])
-    scheduler.add_job(send_periodic_prices, 'interval', minutes=30, args=[app])
+    watch_jobs(scheduler)
+    if not ALERT_WORKERS:  # Otherwise the cluster's alert workers evaluate alerts
+        if ADAPTIVE_POLLING:
+            add_interval_job(scheduler, adaptive_check, TICK_SECONDS, args=[app])
+        else:
+            add_interval_job(scheduler, hourly_check, POLL_FIXED_INTERVAL, args=[app])
+    add_interval_job(scheduler, send_periodic_prices, 30 * 60, args=[app])
+    add_interval_job(scheduler, coin_registry.refresh, 12 * 3600, name="coin_registry_refresh")
+    add_interval_job(scheduler, refresh_all_news, 5 * 60)
+    add_interval_job(scheduler, refresh_rates, FX_REFRESH_INTERVAL)
     scheduler.start()
 
-    print("Bot started...")
+    register_check("event_loop", command_bus.is_bound)
+    register_check("database", _database_ready)
+    register_check("scheduler", lambda: scheduler.running)
+    register_check("coin_registry", lambda: len(coin_registry) > 0)
 
     # Run the bot
-    await app.run_polling(drop_pending_updates=True,poll_interval=30)
+    if WEBHOOK_URL:
+        await run_webhook(app)
+    else:
+        print("Bot started...")
+        await app.run_polling(drop_pending_updates=True, poll_interval=POLL_INTERVAL)
 
 
 if __name__ == "__main__":
     # Initialize SQLite DB
     from database.database import init_db
+    from database.news_index import init_news_index
     init_db()
+    init_news_index()
+
+    # Multi-process mode: a price-feed producer and partitioned alert workers replace hourly_check
+    if ALERT_WORKERS:
+        from services.cluster import start_cluster
+        start_cluster(ALERT_WORKERS)
 
-    # Start dummy HTTP server (for Render.com)
-    class Handler(BaseHTTPRequestHandler):
-        def do_GET(self):
-            self.send_response(200)
-            self.end_headers()
-            self.wfile.write(b"Bot is active")
+    # Load the coin universe from disk; fetch it in the background if missing or old
+    coin_registry.load()
+    if coin_registry.is_stale():
+        coin_registry.refresh_in_background()
 
-        def do_HEAD(self):
-            self.send_response(200)
-            self.end_headers()
+    # Warm the news cache so the first /news answers from memory
+    refresh_news_in_background()
 
-        def log_message(self, format, *args):
-            return  # Suppress logs
+    # Exchange rates for users who quote in something other than USD
+    refresh_rates_in_background()
 
-    server = HTTPServer(('0.0.0.0', 8080), Handler)
-    server_thread = threading.Thread(target=server.serve_forever)
-    server_thread.daemon = True
-    server_thread.start()
+    # Health, readiness and metrics server (also keeps Render.com happy)
+    server = start_health_server(HEALTH_PORT)
 
     # Start dashboard in separate thread
     try:
         from dashboard.app import dashboard_app
-        dashboard_thread = threading.Thread(target=lambda: dashboard_app.run(port=5001))
+        dashboard_thread = threading.Thread(target=lambda: dashboard_app.run(port=DASHBOARD_PORT))
         dashboard_thread.daemon = True
         dashboard_thread.start()
     except Exception as e:
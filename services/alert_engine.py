@@ -0,0 +1,96 @@
+# services/alert_engine.py
+#
+# Pure alert evaluation, shared by hourly_check and benchmarks/bench_alert_engine.py.
+# Alerts come in the shape load_alerts() returns: {user_id: [alert, ...]} where an
+# alert carries "price", "low"/"high", "change" or "volume" plus "id", "coin_id",
+# "triggered" and the "currency" its thresholds are in (USD when absent).
+
+
+def alert_coins(alerts):
+    """Every coin referenced by an untriggered alert, so each price is fetched once per pass."""
+    return {
+        alert.get("coin_id", "bitcoin")
+        for targets in alerts.values()
+        for alert in targets
+        if not alert["triggered"]
+    }
+
+
+def alert_currencies(alerts):
+    """Non-USD currencies that untriggered alerts are set in; quotes need a price in each."""
+    return {
+        alert["currency"]
+        for targets in alerts.values()
+        for alert in targets
+        if not alert["triggered"] and alert.get("currency", "usd") != "usd"
+    }
+
+
+def evaluate_alerts(alerts, quotes):
+    """Check alerts against quotes ({coin_id: {"price", "prices", "change_24h", "volume_change_24h"}}).
+
+    "price" is USD; "prices" maps other currencies to the same price already converted
+    (fx.with_currencies), so each alert compares in its own currency with a lookup.
+    Triggered alerts are flagged in place. Returns (triggered [(user_id, alert)], scanned).
+    Change and volume alerts are skipped when the quote doesn't carry those fields,
+    currency alerts when there is no rate for their currency yet, and alerts whose
+    threshold is NULL in the database, so one bad row can't stop the whole pass.
+    """
+    triggered = []
+    scanned = 0
+    for user_id, targets in alerts.items():
+        for alert in targets:
+            if alert["triggered"]:
+                continue
+            quote = quotes.get(alert.get("coin_id", "bitcoin"))
+            if quote is None:
+                continue
+            currency = alert.get("currency", "usd")
+            price = quote["price"] if currency == "usd" else quote.get("prices", {}).get(currency)
+            if price is None:
+                continue
+            scanned += 1
+
+            if "price" in alert:
+                hit = alert["price"] is not None and price >= alert["price"]
+            elif "low" in alert and "high" in alert:
+                hit = alert["low"] is not None and alert["high"] is not None and alert["low"] <= price <= alert["high"]
+            elif "change" in alert:
+                change = quote.get("change_24h")
+                hit = change is not None and alert["change"] is not None and abs(change) >= alert["change"]
+            elif "volume" in alert:
+                volume_change = quote.get("volume_change_24h")
+                hit = volume_change is not None and alert["volume"] is not None and volume_change >= alert["volume"]
+            else:
+                hit = False
+
+            if hit:
+                alert["triggered"] = True
+                triggered.append((user_id, alert))
+    return triggered, scanned
+
+
+def alert_message(alert):
+    from services.fx import format_money
+    coin_name = alert.get("coin_id", "BTC").capitalize()
+    currency = alert.get("currency", "usd")
+    if "price" in alert:
+        return f"🚨 {coin_name} has reached your target price: {format_money(alert['price'], currency)}!"
+    if "low" in alert and "high" in alert:
+        return (f"🔔 {coin_name} is in your target range: "
+                f"{format_money(alert['low'], currency)} - {format_money(alert['high'], currency)}")
+    if "change" in alert:
+        return f"🔔 {coin_name} moved by ≥{alert['change']:.2f}% in 24h"
+    return f"📈 {coin_name} trading volume rose by ≥{alert['volume']:.2f}% in 24h"
+
+
+def mark_triggered(conn, triggered):
+    """Persist triggered flags in one transaction. Returns the (user_id, alert) pairs this call
+    flipped; an alert another process already marked is left out, so it is notified only once."""
+    claimed = []
+    with conn:
+        for user_id, alert in triggered:
+            cur = conn.execute("UPDATE alerts SET triggered = 1 WHERE id = ? AND triggered = 0", (alert["id"],))
+            if cur.rowcount == 1:
+                claimed.append((user_id, alert))
+    return claimed
@@ -0,0 +1,107 @@
+# services/alert_worker.py
+#
+# One alert worker process: owns a leased set of user partitions, evaluates their
+# alerts on every price-feed tick and sends the resulting notifications itself.
+
+import asyncio
+import logging
+import os
+import socket
+import threading
+import time
+from config import ALERT_LEASE_TTL, ALERT_PARTITIONS, TELEGRAM_API_URL, TELEGRAM_BOT_TOKEN
+
+
+class _Leases:
+    """Keeps this worker's partitions rebalanced in a background thread."""
+
+    def __init__(self, owner, ttl=ALERT_LEASE_TTL):
+        self.owner = owner
+        self.ttl = ttl
+        self.partitions = []
+        self.renewed_at = 0.0   # monotonic time of the last successful rebalance
+        self._stopped = threading.Event()
+
+    def refresh(self):
+        from database.leases import rebalance
+        renewed = time.monotonic()
+        owned = rebalance(self.owner, self.ttl)
+        if owned != self.partitions:
+            logging.info(f"{self.owner} now owns {len(owned)} partitions")
+        self.partitions = owned
+        self.renewed_at = renewed
+
+    def valid(self):
+        """False once the leases may have expired and been taken over by another worker."""
+        return time.monotonic() - self.renewed_at < self.ttl
+
+    def run(self):
+        while not self._stopped.wait(self.ttl / 3):
+            try:
+                self.refresh()
+            except Exception as e:
+                logging.error(f"{self.owner} lease refresh failed: {e}")
+
+    def stop(self):
+        self._stopped.set()
+
+
+async def _handle_tick(bot, leases, tick):
+    from database.database import connect
+    from database.leases import load_partition_alerts
+    from services.alert_engine import alert_currencies, alert_message, evaluate_alerts, mark_triggered
+    from services.fx import with_currencies
+
+    if not leases.valid():
+        logging.warning(f"{leases.owner} leases not renewed for {ALERT_LEASE_TTL:.0f}s; skipping tick {tick['seq']}")
+        return
+    partitions = list(leases.partitions)
+    started = time.perf_counter()
+    alerts = load_partition_alerts(partitions, ALERT_PARTITIONS)
+    quotes = with_currencies(tick["quotes"], alert_currencies(alerts))
+    triggered, scanned = evaluate_alerts(alerts, quotes)
+    if triggered:
+        conn = connect()
+        triggered = mark_triggered(conn, triggered)  # Another worker may have sent some already
+        conn.close()
+    evaluated = time.perf_counter() - started
+
+    for user_id, alert in triggered:
+        try:
+            await bot.send_message(chat_id=user_id, text=alert_message(alert))
+        except Exception as e:
+            logging.error(f"Failed to send to {user_id}: {e}")
+    logging.info(f"Tick {tick['seq']}: {scanned} alerts in {len(partitions)} partitions evaluated in "
+                 f"{evaluated * 1000:.0f}ms, {len(triggered)} triggered")
+
+
+async def _worker_loop(owner):
+    from telegram import Bot
+    from services.price_feed import connect_to_feed
+
+    leases = _Leases(owner)
+    leases.refresh()
+    threading.Thread(target=leases.run, name="lease-refresh", daemon=True).start()
+
+    async with Bot(TELEGRAM_BOT_TOKEN, base_url=f"{TELEGRAM_API_URL}/bot") as bot:
+        while True:
+            feed = await asyncio.to_thread(connect_to_feed)
+            try:
+                while True:
+                    tick = await asyncio.to_thread(feed.recv)
+                    await _handle_tick(bot, leases, tick)
+            except (EOFError, OSError):
+                logging.warning(f"{owner} lost the price feed; reconnecting")
+            finally:
+                feed.close()
+
+
+def run_alert_worker(owner=None):
+    """Process entry point."""
+    owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+    logging.basicConfig(format=f'%(asctime)s - {owner} - %(levelname)s - %(message)s', level=logging.INFO)
+    try:
+        asyncio.run(_worker_loop(owner))
+    finally:
+        from database.leases import release_all
+        release_all(owner)
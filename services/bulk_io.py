@@ -0,0 +1,217 @@
+# services/bulk_io.py
+#
+# Bulk import and export of a user's portfolio lots and alerts. Both directions use
+# one flat record layout (EXPORT_COLUMNS), so an export can be edited and imported back:
+#
+#   kind    lot | price | range | change | volume
+#   coin    ticker or CoinGecko id
+#   amount  lot size (negative for a sale)             price   lot cost or price target
+#   low/high  range alert bounds                       percent change/volume alert threshold
+#   currency  defaults to the user's quote currency    triggered, created_at (optional)
+#
+# Imports are CSV or JSON (a list of records, or {"lots": [...], "alerts": [...]}),
+# optionally gzipped. Every record is validated before anything is written, then all
+# rows go in one transaction. Exports stream the user's rows off their per-user index
+# into a spooled temporary file, so a large account never sits in memory at once.
+
+import csv
+import gzip
+import io
+import json
+import math
+import tempfile
+from datetime import datetime, timezone
+from config import EXPORT_SPOOL_BYTES, IMPORT_MAX_BYTES, IMPORT_MAX_ROWS, QUOTE_CURRENCIES
+
+EXPORT_COLUMNS = ("kind", "coin", "amount", "price", "low", "high", "percent", "currency", "triggered", "created_at")
+ALERT_KINDS = ("price", "range", "change", "volume")
+MAX_REPORTED_ERRORS = 10
+
+
+class BulkImportError(ValueError):
+    """The document can't be imported; `errors` lists what was wrong, by row."""
+
+    def __init__(self, errors):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+def _open(data):
+    """A binary stream over `data`, transparently gunzipped, and its first non-blank byte."""
+    if data[:2] == b"\x1f\x8b":
+        stream = gzip.GzipFile(fileobj=io.BytesIO(data))
+        head = stream.peek(64)
+    else:
+        stream = io.BytesIO(data)
+        head = data[:64]
+    return stream, head.lstrip(b"\xef\xbb\xbf \t\r\n")[:1]
+
+
+def parse_document(data, filename=""):
+    """Yield (row number, record dict) from CSV or JSON bytes, gzipped or not. CSV is read row by row."""
+    stream, first = _open(bytes(data))
+    name = filename.lower().removesuffix(".gz")
+    if name.endswith(".json") or (not name.endswith(".csv") and first in (b"[", b"{")):
+        text = stream.read(IMPORT_MAX_BYTES + 1)
+        if len(text) > IMPORT_MAX_BYTES:
+            raise BulkImportError([f"JSON documents are limited to {IMPORT_MAX_BYTES // 1_000_000} MB uncompressed"])
+        document = json.loads(text.decode("utf-8-sig"))
+        if isinstance(document, dict):
+            records = [{"kind": "lot", **lot} for lot in document.get("lots", [])] + list(document.get("alerts", []))
+        elif isinstance(document, list):
+            records = document
+        else:
+            raise BulkImportError(["expected a list of records or {\"lots\": [...], \"alerts\": [...]}"])
+        for number, record in enumerate(records, 1):
+            yield number, record
+        return
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    for record in reader:
+        yield reader.line_num, {key.strip().lower(): value for key, value in record.items() if key}
+
+
+def _number(record, field, required=True):
+    value = record.get(field)
+    if value is None or (isinstance(value, str) and not value.strip()):
+        if required:
+            raise ValueError(f"missing {field}")
+        return None
+    try:
+        number = float(str(value).strip().rstrip("%"))
+    except ValueError:
+        raise ValueError(f"{field} is not a number: {value!r}") from None
+    if not math.isfinite(number):
+        raise ValueError(f"{field} is not a finite number: {value!r}")  # SQLite would store NaN as NULL
+    return number
+
+
+def _flag(value):
+    return str(value).strip().lower() in ("1", "true", "yes")
+
+
+def _timestamp(value):
+    if value is None or not str(value).strip():
+        return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    try:
+        parsed = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"created_at is not a date: {value!r}") from None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def validate_record(record, default_currency):
+    """("lot", row) or ("alert", row) in import_user_rows' shape; raises ValueError with the reason."""
+    from services.coin_registry import resolve_coin
+    from services.fx import to_usd
+
+    if not isinstance(record, dict):
+        raise ValueError("not an object")
+    kind = str(record.get("kind") or record.get("type") or "").strip().lower()
+    coin = str(record.get("coin") or record.get("coin_id") or "").strip().lower()
+    coin_id = resolve_coin(coin) if coin else None
+    if coin_id is None:
+        raise ValueError(f"unknown coin {coin!r}")
+    currency = str(record.get("currency") or default_currency).strip().lower()
+    if currency not in QUOTE_CURRENCIES:
+        raise ValueError(f"unsupported currency {currency!r}")
+
+    if kind == "lot":
+        amount = _number(record, "amount")
+        if amount == 0:
+            raise ValueError("amount is zero")
+        price = _number(record, "price")
+        if price <= 0:
+            raise ValueError("price must be positive")
+        bought_at = to_usd(price, currency)  # Lots are stored in USD
+        if bought_at is None:
+            raise ValueError(f"no exchange rate for {currency.upper()} yet")
+        return "lot", (coin_id, amount, bought_at, _timestamp(record.get("created_at")))
+
+    if kind not in ALERT_KINDS:
+        raise ValueError(f"unknown kind {kind!r} (lot, {', '.join(ALERT_KINDS)})")
+    triggered = int(_flag(record.get("triggered", "")))
+    if kind == "price":
+        price = _number(record, "price")
+        if price <= 0:
+            raise ValueError("price must be positive")
+        return "alert", (coin_id, kind, price, None, None, triggered, currency)
+    if kind == "range":
+        low, high = _number(record, "low"), _number(record, "high")
+        if low <= 0:
+            raise ValueError("low must be positive")
+        if low >= high:
+            raise ValueError("low must be less than high")
+        return "alert", (coin_id, kind, None, low, high, triggered, currency)
+    percent = _number(record, "percent")
+    if percent <= 0:
+        raise ValueError("percent must be positive")
+    return "alert", (coin_id, kind, percent, None, None, triggered, "usd")
+
+
+def import_document(user_id, data, filename=""):
+    """Validate every record, then insert them all in one transaction. Returns (lots, alerts) imported."""
+    from database.database import get_user_currency, import_user_rows
+
+    default_currency = get_user_currency(user_id)
+    lots, alerts, errors = [], [], []
+    try:
+        for number, record in parse_document(data, filename):
+            if len(lots) + len(alerts) >= IMPORT_MAX_ROWS:
+                raise BulkImportError([f"more than {IMPORT_MAX_ROWS} rows"])
+            try:
+                kind, row = validate_record(record, default_currency)
+            except ValueError as e:
+                errors.append(f"row {number}: {e}")
+                if len(errors) >= MAX_REPORTED_ERRORS:
+                    break
+                continue
+            (lots if kind == "lot" else alerts).append(row)
+    except (UnicodeDecodeError, json.JSONDecodeError, csv.Error, OSError, EOFError, TypeError) as e:
+        raise BulkImportError([f"unreadable document: {e}"]) from None
+    if errors:
+        raise BulkImportError(errors)
+    if not lots and not alerts:
+        raise BulkImportError(["no rows"])
+    return import_user_rows(user_id, lots, alerts)
+
+
+def _export(rows, compress):
+    """Write `rows` as CSV with EXPORT_COLUMNS into a spooled file, rewound. Returns (file, row count)."""
+    spool = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES)
+    raw = gzip.GzipFile(fileobj=spool, mode="wb") if compress else spool
+    text = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+    writer = csv.writer(text)
+    writer.writerow(EXPORT_COLUMNS)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    text.flush()
+    text.detach()
+    if compress:
+        raw.close()  # Writes the gzip trailer; the spool stays open
+    spool.seek(0)
+    return spool, count
+
+
+def export_alerts(user_id, compress=False):
+    from database.database import iter_user_alerts
+
+    def rows():
+        for coin_id, kind, target, low, high, triggered, currency in iter_user_alerts(user_id):
+            price = target if kind == "price" else ""
+            percent = target if kind in ("change", "volume") else ""
+            yield (kind, coin_id, "", price, "" if low is None else low, "" if high is None else high,
+                   percent, currency or "usd", int(bool(triggered)), "")
+    return _export(rows(), compress)
+
+
+def export_portfolio(user_id, compress=False):
+    from database.database import iter_user_lots
+
+    def rows():
+        for coin_id, amount, bought_at, created_at in iter_user_lots(user_id):
+            yield "lot", coin_id, amount, bought_at, "", "", "", "usd", "", created_at or ""
+    return _export(rows(), compress)
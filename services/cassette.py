@@ -0,0 +1,157 @@
+# services/cassette.py
+#
+# Record-and-replay for upstream HTTP calls made through services.http_client.
+# A cassette is a gzip-compressed JSON-lines file, one interaction per line:
+#   {"key", "provider", "url", "status", "headers", "body", "elapsed"}
+# Keys are the method plus the URL with its query sorted and credentials removed, so
+# cassettes recorded with a real API key replay without one and never contain it.
+#
+# Environment:
+#   HTTP_CASSETTE_MODE   off (default) | record | replay
+#   HTTP_CASSETTE        cassette path, e.g. fixtures/providers.jsonl.gz
+#   HTTP_REPLAY_TIMING   none (default) | original | scale factor such as 0.25
+#   HTTP_FAULT_RATE      fraction of calls answered with HTTP_FAULT_STATUS (default 503)
+#   HTTP_FAULT_LATENCY_MS extra latency added to every call
+#   HTTP_FAULT_SEED      makes injected faults reproducible
+
+import atexit
+import gzip
+import json
+import logging
+import random
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import requests
+from requests.structures import CaseInsensitiveDict
+
+SENSITIVE_PARAMS = {"api_key", "apikey", "x_cg_pro_api_key", "key", "token"}
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+class CassetteMiss(requests.ConnectionError):
+    """Replay found no recorded interaction for a request."""
+
+
+def request_key(method, url, params=None):
+    prepared = requests.Request(method, url, params=params).prepare()
+    parts = urlsplit(prepared.url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if k.lower() not in SENSITIVE_PARAMS)
+    return f"{method} " + urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+
+class Cassette:
+    def __init__(self, path, mode, speed=0.0, fault_rate=0.0, fault_latency=0.0, fault_status=503, seed=None):
+        self.path = path
+        self.mode = mode                  # "off" (faults only) | "record" | "replay"
+        self.speed = speed                # replay delay = recorded elapsed * speed (0 = no delay)
+        self.fault_rate = fault_rate
+        self.fault_latency = fault_latency
+        self.fault_status = fault_status
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._recorded = {}               # key -> [interaction]
+        self._cursor = {}                 # key -> next index (replay cycles through repeats)
+        self._file = None
+        if mode == "replay":
+            self._load()
+
+    def _load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    interaction = json.loads(line)
+                    self._recorded.setdefault(interaction["key"], []).append(interaction)
+        logging.info(f"Replaying {sum(map(len, self._recorded.values()))} interactions from {self.path}")
+
+    # -- fault injection ------------------------------------------------------
+
+    def inject(self, provider, url):
+        """Apply configured latency and, sometimes, a synthetic error response. Returns it or None."""
+        if self.fault_latency:
+            time.sleep(self.fault_latency)
+        if self.fault_rate and self._rng.random() < self.fault_rate:
+            return _build_response(url, self.fault_status, {"Content-Type": "application/json"},
+                                   json.dumps({"error": "injected fault"}))
+        return None
+
+    # -- record ---------------------------------------------------------------
+
+    def record(self, provider, method, url, params, response, elapsed):
+        key = request_key(method, url, params)
+        interaction = {
+            "key": key,
+            "provider": provider,
+            "url": key.split(" ", 1)[1],
+            "status": response.status_code,
+            "headers": {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers},
+            "body": response.text,
+            "elapsed": round(elapsed, 4),
+        }
+        line = json.dumps(interaction, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = gzip.open(self.path, "at", encoding="utf-8")
+                atexit.register(self.close)
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # -- replay ---------------------------------------------------------------
+
+    def replay(self, method, url, params):
+        key = request_key(method, url, params)
+        with self._lock:
+            interactions = self._recorded.get(key)
+            if not interactions:
+                raise CassetteMiss(f"No recorded response for {key}")
+            index = self._cursor.get(key, 0)
+            self._cursor[key] = (index + 1) % len(interactions)
+            interaction = interactions[index]
+        if self.speed:
+            time.sleep(interaction["elapsed"] * self.speed)
+        return _build_response(url, interaction["status"], interaction["headers"], interaction["body"])
+
+
+def _build_response(url, status, headers, body):
+    response = requests.Response()
+    response.status_code = status
+    response.url = url
+    response.headers = CaseInsensitiveDict(headers)
+    response.encoding = "utf-8"
+    response._content = body.encode("utf-8")
+    return response
+
+
+def _parse_speed(value):
+    """HTTP_REPLAY_TIMING: "none" (default), "original", or a scale factor such as 0.5."""
+    if value in ("", "none"):
+        return 0.0
+    if value == "original":
+        return 1.0
+    return float(value)
+
+
+def cassette_from_env(env):
+    mode = env.get("HTTP_CASSETTE_MODE", "off").lower()
+    fault_rate = float(env.get("HTTP_FAULT_RATE", "0"))
+    fault_latency = float(env.get("HTTP_FAULT_LATENCY_MS", "0")) / 1000
+    if mode == "off" and not (fault_rate or fault_latency):
+        return None
+    if mode in ("record", "replay") and not env.get("HTTP_CASSETTE"):
+        raise ValueError("HTTP_CASSETTE must name a cassette file when HTTP_CASSETTE_MODE is set")
+    return Cassette(
+        env.get("HTTP_CASSETTE"),
+        mode,
+        speed=_parse_speed(env.get("HTTP_REPLAY_TIMING", "none").lower()),
+        fault_rate=fault_rate,
+        fault_latency=fault_latency,
+        fault_status=int(env.get("HTTP_FAULT_STATUS", "503")),
+        seed=int(env["HTTP_FAULT_SEED"]) if env.get("HTTP_FAULT_SEED") else None,
+    )
@@ -0,0 +1,79 @@
+# services/cluster.py
+#
+# Multi-process alert evaluation: one price-feed producer plus N alert workers, each
+# owning a leased hash partition of users. Started from main.py when ALERT_WORKERS > 0,
+# or on its own:  python -m services.cluster --workers 4
+
+import argparse
+import logging
+import multiprocessing
+import socket
+import threading
+import time
+from config import ALERT_PARTITIONS, ALERT_WORKERS
+
+SUPERVISE_INTERVAL = 5
+
+_ctx = multiprocessing.get_context("spawn")  # Children never inherit the bot's threads or loop
+
+
+def _spawn(name, target, args=()):
+    process = _ctx.Process(target=target, args=args, name=name, daemon=True)
+    process.start()
+    return process
+
+
+class Cluster:
+    def __init__(self, workers=ALERT_WORKERS):
+        from services.alert_worker import run_alert_worker
+        from services.price_feed import run_price_feed
+        host = socket.gethostname()
+        # Stable owner names let a restarted worker pick its unexpired leases back up
+        self.specs = {"price-feed": (run_price_feed, ())}
+        for i in range(workers):
+            owner = f"{host}:alert-worker-{i}"
+            self.specs[owner] = (run_alert_worker, (owner,))
+        self.processes = {}
+        self._stopped = threading.Event()
+
+    def start(self):
+        from database.leases import init_leases
+        init_leases(ALERT_PARTITIONS)
+        for name, (target, args) in self.specs.items():
+            self.processes[name] = _spawn(name, target, args)
+        threading.Thread(target=self._supervise, name="cluster-supervisor", daemon=True).start()
+        logging.info(f"Started price feed and {len(self.specs) - 1} alert workers over {ALERT_PARTITIONS} partitions")
+        return self
+
+    def _supervise(self):
+        while not self._stopped.wait(SUPERVISE_INTERVAL):
+            for name, process in list(self.processes.items()):
+                if not process.is_alive():
+                    logging.warning(f"{name} exited with {process.exitcode}; restarting")
+                    target, args = self.specs[name]
+                    self.processes[name] = _spawn(name, target, args)
+
+    def stop(self):
+        self._stopped.set()
+        for process in self.processes.values():
+            process.terminate()
+        for process in self.processes.values():
+            process.join(timeout=5)
+
+
+def start_cluster(workers=ALERT_WORKERS):
+    return Cluster(workers).start()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the price feed and partitioned alert workers")
+    parser.add_argument("--workers", type=int, default=ALERT_WORKERS or multiprocessing.cpu_count())
+    args = parser.parse_args()
+
+    logging.basicConfig(format='%(asctime)s - cluster - %(levelname)s - %(message)s', level=logging.INFO)
+    cluster = start_cluster(args.workers)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        cluster.stop()
@@ -1,21 +1,19 @@
 # services/coin_list_service.py
 
 import re
-import requests
+from services import http_client
 from datetime import datetime
+from config import COINGECKO_API_URL
+from utils.render import escape_md
 
 
 def escape_markdown(text):
     """Escape all MarkdownV2 reserved characters"""
-    if not isinstance(text, str):
-        text = str(text)
-    
-    reserved_chars = '_*[]()~`>#+-=|{}.!'
-    return ''.join(f'\\{char}' if char in reserved_chars else char for char in text)
+    return escape_md(text)
 
 
 def get_top_coins(limit=10):
-    url = "https://api.coingecko.com/api/v3/coins/markets" 
+    url = f"{COINGECKO_API_URL}/coins/markets"
     params = {
         "vs_currency": "usd",
         "order": "market_cap_desc",
@@ -25,7 +23,7 @@ def get_top_coins(limit=10):
     }
 
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = http_client.get("coingecko", url, params=params, timeout=10)
         if response.status_code == 200:
             return response.json()
         else:
@@ -41,9 +39,9 @@ def get_top_coins(limit=10):
 
 def format_coin_data(coin_data):
     symbol = coin_data["symbol"].upper()
-    price = coin_data["current_price"]
-    change_24h = coin_data["price_change_percentage_24h"]
-    sparkline = coin_data.get("sparkline_in_7d", {}).get("price") or []
+    price = coin_data["current_price"] or 0
+    change_24h = coin_data.get("price_change_percentage_24h") or 0
+    sparkline = (coin_data.get("sparkline_in_7d") or {}).get("price") or []
 
     # Format change with color indicator
     if change_24h >= 0:
@@ -59,15 +57,8 @@ def format_coin_data(coin_data):
     else:
         range_str = "N/A"
 
-    # Escape all fields for MarkdownV2
-    symbol_escaped = escape_markdown(symbol)
-    price_escaped = escape_markdown(f"{price:,.2f}")
-    range_escaped = escape_markdown(range_str)
-    change_escaped = escape_markdown(change_str)
-
     return {
-        "markdown_row": f" | {symbol_escaped} | ${price_escaped} | {change_escaped} | {range_escaped} |",
-        "plain_row": f" | {symbol:<6} | ${price:>11,.2f} | {change_str:<12} | {range_str:<20} |",
+        "cells": (symbol, f"${price:,.2f}", change_str, range_str),
         "change_24h": change_24h
     }
 
@@ -76,7 +67,7 @@ def get_top_gainers(limit=10):
     raw = get_top_coins(limit * 2)
     if not raw:
         return []
-    sorted_data = sorted(raw, key=lambda x: x["price_change_percentage_24h"], reverse=True)
+    sorted_data = sorted(raw, key=lambda x: x.get("price_change_percentage_24h") or 0, reverse=True)
     return sorted_data[:limit]
 
 
@@ -84,5 +75,5 @@ def get_top_losers(limit=10):
     raw = get_top_coins(limit * 2)
     if not raw:
         return []
-    sorted_data = sorted(raw, key=lambda x: x["price_change_percentage_24h"])
+    sorted_data = sorted(raw, key=lambda x: x.get("price_change_percentage_24h") or 0)
     return sorted_data[:limit]
\ No newline at end of file
@@ -0,0 +1,214 @@
+# services/coin_registry.py
+
+import bisect
+import difflib
+import json
+import logging
+import os
+import threading
+import time
+from services import http_client
+from config import COIN_MAP, COINGECKO_API_URL, HEADERS
+from utils.tracing import span
+
+COIN_LIST_URL = f"{COINGECKO_API_URL}/coins/list"
+COIN_LIST_CACHE = os.path.join("data", "coin_list.json")
+COIN_LIST_MAX_AGE = 24 * 3600
+
+# Ids that usually shadow the "real" coin behind a popular ticker
+_DERIVATIVE_MARKERS = ("wrapped", "bridged", "peg", "-wormhole", "-iou", "bsc-", "-bsc")
+
+
+class _Index:
+    """Immutable lookup tables; swapped in one assignment so readers never lock."""
+
+    def __init__(self, coins, pinned):
+        self.by_id = {}          # coin_id -> (symbol, name)
+        self.by_symbol = {}      # symbol -> preferred coin_id
+        self.candidates = {}     # symbol -> all coin_ids, preferred first
+        self.by_name = {}        # lower-case name -> coin_id
+
+        for coin in coins:
+            coin_id = (coin.get("id") or "").strip().lower()
+            symbol = (coin.get("symbol") or "").strip().lower()
+            name = (coin.get("name") or coin_id).strip()
+            if not coin_id or not symbol:
+                continue
+            self.by_id[coin_id] = (symbol, name)
+            self.candidates.setdefault(symbol, []).append(coin_id)
+
+        # Pinned entries (config.COIN_MAP) always exist and always win their symbol
+        for symbol, coin_id in pinned.items():
+            self.by_id.setdefault(coin_id, (symbol, coin_id.capitalize()))
+            ids = self.candidates.setdefault(symbol, [])
+            if coin_id not in ids:
+                ids.append(coin_id)
+
+        pinned_ids = set(pinned.values())
+        for symbol, ids in self.candidates.items():
+            ids.sort(key=lambda cid: _rank(cid, self.by_id[cid][1], pinned_ids))
+            self.candidates[symbol] = tuple(ids)
+            self.by_symbol[symbol] = ids[0]
+
+        for coin_id, (symbol, name) in self.by_id.items():
+            key = name.lower()
+            current = self.by_name.get(key)
+            if current is None or _rank(coin_id, name, pinned_ids) < _rank(current, name, pinned_ids):
+                self.by_name[key] = coin_id
+
+        # Sorted keys for prefix search: (key, coin_id)
+        keys = {(symbol, self.by_symbol[symbol]) for symbol in self.by_symbol}
+        keys.update((name, coin_id) for name, coin_id in self.by_name.items())
+        self.sorted_keys = sorted(keys)
+        self.fuzzy_pool = sorted(set(self.by_symbol) | set(self.by_name))
+
+
+def _rank(coin_id, name, pinned_ids):
+    """Deterministic preference order when several coins share a symbol or name."""
+    canonical = name.lower().replace(" ", "-")
+    return (
+        coin_id not in pinned_ids,
+        any(marker in coin_id for marker in _DERIVATIVE_MARKERS),
+        coin_id != canonical,
+        len(coin_id),
+        coin_id,
+    )
+
+
+class CoinRegistry:
+    def __init__(self, pinned=None, cache_path=COIN_LIST_CACHE):
+        self.pinned = dict(pinned or {})
+        self.cache_path = cache_path
+        self.loaded_at = 0
+        self._index = _Index([], self.pinned)
+        self._refresh_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._index.by_id)
+
+    # -- loading ----------------------------------------------------------
+
+    def load(self):
+        """Load the on-disk coin list, if any. Returns True when a cache was found."""
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable coin list cache {self.cache_path}: {e}")
+            return False
+
+        self._index = _Index(payload.get("coins", []), self.pinned)
+        self.loaded_at = payload.get("fetched_at", 0)
+        logging.info(f"Loaded {len(self)} coins from {self.cache_path}")
+        return True
+
+    def is_stale(self, max_age=COIN_LIST_MAX_AGE):
+        return time.time() - self.loaded_at > max_age
+
+    def refresh(self):
+        """Fetch the full coin list from CoinGecko and persist it. Safe to call from any thread."""
+        if not self._refresh_lock.acquire(blocking=False):
+            return False  # A refresh is already running
+        try:
+            response = http_client.get("coingecko", COIN_LIST_URL, headers=HEADERS, timeout=30)
+            if response.status_code != 200:
+                logging.warning(f"Coin list refresh failed: status {response.status_code}")
+                return False
+            coins = response.json()
+            fetched_at = time.time()
+
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"fetched_at": fetched_at, "coins": coins}, f, separators=(",", ":"))
+            os.replace(tmp_path, self.cache_path)
+
+            self._index = _Index(coins, self.pinned)
+            self.loaded_at = fetched_at
+            logging.info(f"Coin list refreshed: {len(self)} coins")
+            return True
+        except Exception as e:
+            logging.error(f"Coin list refresh failed: {e}")
+            return False
+        finally:
+            self._refresh_lock.release()
+
+    def refresh_in_background(self):
+        thread = threading.Thread(target=self.refresh, name="coin-registry-refresh", daemon=True)
+        thread.start()
+        return thread
+
+    # -- lookups ----------------------------------------------------------
+
+    def resolve(self, text):
+        """Map a symbol, CoinGecko id or coin name to a coin id in O(1). None if unknown."""
+        if not text:
+            return None
+        key = text.strip().lower()
+        index = self._index
+        return index.by_symbol.get(key) or (key if key in index.by_id else None) or index.by_name.get(key)
+
+    def symbol_for(self, coin_id):
+        entry = self._index.by_id.get(coin_id)
+        return entry[0].upper() if entry else coin_id.upper()
+
+    def name_for(self, coin_id):
+        entry = self._index.by_id.get(coin_id)
+        return entry[1] if entry else coin_id.capitalize()
+
+    def candidates(self, symbol):
+        """All coin ids sharing a symbol, preferred one first."""
+        return self._index.candidates.get(symbol.strip().lower(), ())
+
+    def complete(self, prefix, limit=10):
+        """Coin ids whose symbol or name starts with the prefix, for autocompletion."""
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        index = self._index
+        keys = index.sorted_keys
+        matches = []
+        seen = set()
+        for i in range(bisect.bisect_left(keys, (prefix,)), len(keys)):
+            key, coin_id = keys[i]
+            if not key.startswith(prefix):
+                break
+            if coin_id not in seen:
+                seen.add(coin_id)
+                matches.append(coin_id)
+        matches.sort(key=lambda cid: (index.by_symbol.get(index.by_id[cid][0]) != cid, len(index.by_id[cid][0]), cid))
+        return matches[:limit]
+
+    def suggest(self, text, limit=5):
+        """Best-effort suggestions for an unknown coin: prefix matches, then fuzzy matches."""
+        key = text.strip().lower()
+        suggestions = self.complete(key, limit)
+        if len(suggestions) < limit:
+            for match in difflib.get_close_matches(key, self._index.fuzzy_pool, n=limit, cutoff=0.75):
+                coin_id = self.resolve(match)
+                if coin_id and coin_id not in suggestions:
+                    suggestions.append(coin_id)
+        return suggestions[:limit]
+
+
+coin_registry = CoinRegistry(pinned=COIN_MAP)
+
+
+@span("parse")
+def resolve_coin(text):
+    return coin_registry.resolve(text)
+
+
+def coin_symbol(coin_id):
+    return coin_registry.symbol_for(coin_id)
+
+
+@span("parse")
+def unknown_coin_message(text):
+    suggestions = coin_registry.suggest(text)
+    if not suggestions:
+        return f"Unsupported coin: {text}."
+    hints = ", ".join(f"{coin_registry.symbol_for(cid).lower()} ({coin_registry.name_for(cid)})" for cid in suggestions)
+    return f"Unsupported coin: {text}. Did you mean: {hints}?"
@@ -0,0 +1,90 @@
+# services/command_bus.py
+
+import asyncio
+import concurrent.futures
+import logging
+
+DEFAULT_TIMEOUT = 60
+
+_loop = None
+_app = None
+_actions = {}
+
+
+def bind(loop, app):
+    """Called once from inside the bot's running loop; later submissions run there."""
+    global _loop, _app
+    _loop = loop
+    _app = app
+
+
+def is_bound():
+    return _loop is not None and _loop.is_running()
+
+
+def action(name):
+    """Register an admin action: an async function taking (app, **kwargs)."""
+    def decorator(func):
+        _actions[name] = func
+        return func
+    return decorator
+
+
+def submit(name, **kwargs):
+    """Schedule an action on the bot loop from any thread. Returns a concurrent.futures.Future."""
+    if name not in _actions:
+        raise KeyError(f"Unknown admin action: {name}")
+    if not is_bound():
+        raise RuntimeError("Bot event loop is not running")
+    return asyncio.run_coroutine_threadsafe(_actions[name](_app, **kwargs), _loop)
+
+
+def call(name, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """Run an action on the bot loop and wait for its result. Raises TimeoutError on timeout."""
+    future = submit(name, **kwargs)
+    try:
+        return future.result(timeout=timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        logging.warning(f"Admin action {name} timed out after {timeout}s and was cancelled")
+        raise TimeoutError(f"{name} did not finish within {timeout}s")
+
+
+@action("force_check")
+async def force_check(app, price=None, coin="bitcoin"):
+    from handlers.job_handlers import hourly_check
+    await hourly_check(app, override_price=price, override_coin=coin)
+    return {"coin": coin, "price": price}
+
+
+@action("broadcast")
+async def broadcast(app, text):
+    from database.database import connect
+    from handlers.job_handlers import dispatch_messages
+
+    conn = connect()
+    cur = conn.cursor()
+    cur.execute("SELECT user_id FROM subscribers")
+    rows = cur.fetchall()
+    conn.close()
+
+    await dispatch_messages(app, [(row[0], text) for row in rows])
+    return {"recipients": len(rows)}
+
+
+@action("flush_cache")
+async def flush_cache(app, target="all"):
+    flushed = []
+    if target in ("prices", "all"):
+        from utils.price_board import price_board
+        price_board().clear()
+        flushed.append("prices")
+    if target in ("news", "all"):
+        from services.news_service import clear_news_cache
+        clear_news_cache()
+        flushed.append("news")
+    if target in ("coins", "all"):
+        from services.coin_registry import coin_registry
+        coin_registry.refresh_in_background()
+        flushed.append("coins")
+    return {"flushed": flushed}
@@ -3,27 +3,25 @@
 import logging
 import os
 import time
-import requests
-from config import COIN_MAP, HEADERS, COINMARKETCAP_API_KEY
+from services import http_client
+from config import COIN_MAP, HEADERS, COINMARKETCAP_API_KEY, COINGECKO_API_URL, COINPAPRIKA_API_URL, COINMARKETCAP_API_URL
 from datetime import datetime, timedelta
 from utils.time_utils import format_time_ago
-from utils.price_utils import last_known_prices, price_history, MAX_HISTORY_ITEMS
+from utils.price_utils import record_price
+from utils.price_board import last_price
+from services.price_stream import fresh_price
+from utils.metrics import CACHE_REQUESTS
 
 def get_crypto_price(coin_id, symbol, force_price=None):
-    global last_known_prices, price_history
-
     if force_price is not None:
-        timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())
-        last_known_prices[coin_id] = (force_price, timestamp)
-
-        if coin_id not in price_history:
-            price_history[coin_id] = []
-        price_history[coin_id].append((force_price, timestamp))
-        if len(price_history[coin_id]) > MAX_HISTORY_ITEMS:
-            price_history[coin_id].pop(0)
-
+        record_price(coin_id, force_price)
         return force_price
 
+    # A live exchange stream beats any REST provider while it keeps ticking
+    streamed = fresh_price(coin_id)
+    if streamed is not None:
+        return streamed
+
     coin_name = coin_id.capitalize()
     symbol_upper = symbol.upper()
 
@@ -31,38 +29,31 @@ def get_crypto_price(coin_id, symbol, force_price=None):
     apis = [
         {
             "name": "CoinGecko",
-            "url": f"https://api.coingecko.com/api/v3/simple/price?ids={coin_id}&vs_currencies=usd"
+            "url": f"{COINGECKO_API_URL}/simple/price?ids={coin_id}&vs_currencies=usd&include_24hr_vol=true"
         },
         {
             "name": "CoinPaprika",
-            "url": f"https://api.coinpaprika.com/v1/tickers/{symbol.lower()}-{coin_id}"
+            "url": f"{COINPAPRIKA_API_URL}/tickers/{symbol.lower()}-{coin_id}"
         }
     ]
 
     for api in apis:
         try:
             logging.info(f"Trying {api['name']} API for {symbol_upper}...")
-            response = requests.get(api["url"], timeout=10, headers=HEADERS)
+            response = http_client.get(api["name"].lower(), api["url"], timeout=10, headers=HEADERS)
 
             if response.status_code == 200:
                 data = response.json()
 
                 if api["name"] == "CoinGecko":
                     price = data.get(coin_id, {}).get("usd")
+                    volume = data.get(coin_id, {}).get("usd_24h_vol")
                 elif api["name"] == "CoinPaprika":
                     price = data.get("quotes", {}).get("USD", {}).get("price")
+                    volume = data.get("quotes", {}).get("USD", {}).get("volume_24h")
 
                 if price:
-                    timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())
-                    last_known_prices[coin_id] = (price, timestamp)
-
-                    # Update history 
-                    if coin_id not in price_history:
-                        price_history[coin_id] = []
-                    price_history[coin_id].append((price, timestamp))
-                    if len(price_history[coin_id]) > MAX_HISTORY_ITEMS:
-                        price_history[coin_id].pop(0)
-
+                    record_price(coin_id, price, volume)
                     return price
                 else:
                     logging.warning(f"{api['name']} returned no usable price for {symbol_upper}")
@@ -73,55 +64,90 @@ def get_crypto_price(coin_id, symbol, force_price=None):
     # Fallback to CoinMarketCap (requires API key)
     if COINMARKETCAP_API_KEY:
         try:
-            url = "https://pro-api.coinmarketcap.com/v1/cryptocurrency/quotes/latest" 
+            url = f"{COINMARKETCAP_API_URL}/cryptocurrency/quotes/latest"
             params = {"symbol": symbol_upper, "convert": "USD"}
             headers = {"X-CMC_PRO_API_KEY": COINMARKETCAP_API_KEY}
 
-            response = requests.get(url, headers=headers, params=params, timeout=10)
+            response = http_client.get("coinmarketcap", url, headers=headers, params=params, timeout=10)
+            price = volume = None
             if response.status_code == 200:
                 data = response.json()
-                
-                    # ✅ Safe handling of CMC response (list or single object)
-            usd_data = data.get("data", {}).get(symbol_upper, {})
-
-            if isinstance(usd_data, dict):
-                        # If it's a dict (e.g., USDT), extract directly
-                        price = usd_data.get("quote", {}).get("USD", {}).get("price")
-            elif isinstance(usd_data, list) and len(usd_data) > 0:
-                        # If it's a list, use index [0]
-                        price = usd_data[0].get("quote", {}).get("USD", {}).get("price")
-            else:
-                        price = None
 
-            if price:
-                        timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())
-                        last_known_prices[coin_id] = (price, timestamp)
+                # ✅ Safe handling of CMC response (list or single object)
+                usd_data = data.get("data", {}).get(symbol_upper, {})
 
-                        # Add to history
-                        if coin_id not in price_history:
-                            price_history[coin_id] = []
-                        price_history[coin_id].append((price, timestamp))
-                        if len(price_history[coin_id]) > MAX_HISTORY_ITEMS:
-                            price_history[coin_id].pop(0)
+                if isinstance(usd_data, dict):
+                    # If it's a dict (e.g., USDT), extract directly
+                    price = usd_data.get("quote", {}).get("USD", {}).get("price")
+                    volume = usd_data.get("quote", {}).get("USD", {}).get("volume_24h")
+                elif isinstance(usd_data, list) and len(usd_data) > 0:
+                    # If it's a list, use index [0]
+                    price = usd_data[0].get("quote", {}).get("USD", {}).get("price")
+                    volume = usd_data[0].get("quote", {}).get("USD", {}).get("volume_24h")
 
-                        return price
+            if price:
+                record_price(coin_id, price, volume)
+                return price
             else:
-                        logging.warning(f"CMC returned no usable price for {symbol_upper}")
+                logging.warning(f"CMC returned no usable price for {symbol_upper}")
         except Exception as e:
             logging.error(f"Error from CMC for {symbol_upper}: {e}", exc_info=True)
 
-    # Fallback to cached price
-    if coin_id in last_known_prices:
-        price, timestamp = last_known_prices[coin_id]
+    # Fallback to the last price any process published to the board
+    cached = last_price(coin_id)
+    if cached is not None:
+        price, timestamp = cached
+        CACHE_REQUESTS.inc(cache="price_fallback", result="hit")
         logging.warning(f"Returning cached {symbol_upper} price: ${price:,.2f} | Last updated: {timestamp}")
         return price
     else:
+        CACHE_REQUESTS.inc(cache="price_fallback", result="miss")
         logging.critical(f"All APIs failed and no cached price available for {symbol_upper}.")
         return None
     
 
+def get_crypto_prices(coin_ids):
+    """Quotes for many coins in one CoinGecko call: {coin_id: {"price", "change_24h"}}.
+
+    Coins with a fresh streamed price skip the request; coins CoinGecko doesn't return are
+    left out and callers fall back to get_crypto_price.
+    """
+    quotes = {}
+    for coin_id in coin_ids:
+        streamed = fresh_price(coin_id)
+        if streamed is not None:
+            quotes[coin_id] = {"price": streamed}
+    coin_ids = [coin_id for coin_id in coin_ids if coin_id not in quotes]
+    if not coin_ids:
+        return quotes
+    params = {
+        "ids": ",".join(sorted(coin_ids)),
+        "vs_currencies": "usd",
+        "include_24hr_vol": "true",
+        "include_24hr_change": "true",
+    }
+    try:
+        response = http_client.get("coingecko", f"{COINGECKO_API_URL}/simple/price", params=params,
+                                   timeout=10, headers=HEADERS)
+    except Exception as e:
+        logging.error(f"Batched CoinGecko price request failed: {e}")
+        return quotes
+    if response.status_code != 200:
+        logging.warning(f"Batched CoinGecko price request returned {response.status_code}")
+        return quotes
+
+    data = response.json()
+    for coin_id in coin_ids:
+        entry = data.get(coin_id) or {}
+        price = entry.get("usd")
+        if price:
+            record_price(coin_id, price, entry.get("usd_24h_vol"))
+            quotes[coin_id] = {"price": price, "change_24h": entry.get("usd_24h_change")}
+    return quotes
+
+
 def get_historical_prices(coin_id, days=7):
-    url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart" 
+    url = f"{COINGECKO_API_URL}/coins/{coin_id}/market_chart"
     params = {
         "vs_currency": "usd",
         "days": days,
@@ -129,7 +155,7 @@ def get_historical_prices(coin_id, days=7):
     }
 
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = http_client.get("coingecko", url, params=params, timeout=10)
         if response.status_code == 200:
             data = response.json()
             return data["prices"]
@@ -0,0 +1,88 @@
+# services/event_bus.py
+
+import itertools
+import logging
+import queue
+import threading
+
+SUBSCRIBER_QUEUE_SIZE = 256
+# A viewer that lets this many events drop without reading is disconnected
+MAX_DROPPED_EVENTS = 1024
+
+
+class Subscription:
+    def __init__(self, topics, maxsize):
+        self.id = None
+        self.topics = set(topics) if topics else None
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.closed = False
+
+    def wants(self, topic):
+        return self.topics is None or topic in self.topics
+
+    def get(self, timeout=None):
+        """Next (topic, data) or None on timeout. Reading resets the drop counter."""
+        try:
+            event = self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        self.dropped = 0
+        return event
+
+
+class EventBus:
+    """In-process fan-out. Publishing never blocks: each subscriber has a bounded queue
+    that drops its oldest events when full, and persistently slow subscribers are closed."""
+
+    def __init__(self, maxsize=SUBSCRIBER_QUEUE_SIZE, max_dropped=MAX_DROPPED_EVENTS):
+        self.maxsize = maxsize
+        self.max_dropped = max_dropped
+        self._subscribers = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def subscribe(self, topics=None):
+        sub = Subscription(topics, self.maxsize)
+        with self._lock:
+            sub.id = next(self._ids)
+            self._subscribers[sub.id] = sub
+        return sub
+
+    def unsubscribe(self, sub):
+        sub.closed = True
+        with self._lock:
+            self._subscribers.pop(sub.id, None)
+
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def publish(self, topic, data):
+        # Copy-on-read keeps the lock out of the per-subscriber work
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+        for sub in subscribers:
+            if not sub.wants(topic):
+                continue
+            try:
+                sub.queue.put_nowait((topic, data))
+            except queue.Full:
+                self._shed(sub, topic, data)
+
+    def _shed(self, sub, topic, data):
+        sub.dropped += 1
+        if sub.dropped > self.max_dropped:
+            logging.warning(f"Disconnecting slow event subscriber {sub.id} after {sub.dropped} dropped events")
+            self.unsubscribe(sub)
+            return
+        try:
+            sub.queue.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            sub.queue.put_nowait((topic, data))
+        except queue.Full:
+            pass
+
+
+event_bus = EventBus()
@@ -0,0 +1,89 @@
+# services/fx.py
+#
+# Quote currencies. Prices are fetched and stored in USD only; every other currency is
+# derived from one cached FX table (CoinGecko /exchange_rates, a single request for all
+# fiat and crypto rates) refreshed on its own schedule, so supporting more currencies
+# never adds per-coin upstream requests.
+
+import logging
+import threading
+import time
+from services import http_client
+from config import COINGECKO_API_URL, FX_REFRESH_INTERVAL, FX_RETRY_INTERVAL, HEADERS, QUOTE_CURRENCIES
+
+BASE_CURRENCY = "usd"
+CURRENCY_SIGNS = {"usd": "$", "eur": "€", "gbp": "£", "jpy": "¥", "btc": "₿", "eth": "Ξ"}
+CURRENCY_DECIMALS = {"jpy": 0, "btc": 8, "eth": 6}
+
+_rates = {BASE_CURRENCY: 1.0}   # currency -> units per 1 USD; replaced in one assignment
+_fetched_at = 0.0
+_attempted_at = 0.0            # Last refresh attempt, successful or not
+_refresh_lock = threading.Lock()
+
+
+def refresh_rates():
+    """Fetch the FX table. Returns how many supported currencies it priced (a scheduled job)."""
+    global _rates, _fetched_at, _attempted_at
+    if not _refresh_lock.acquire(blocking=False):
+        return 0  # Another thread is already refreshing
+    _attempted_at = time.time()
+    try:
+        response = http_client.get("coingecko", f"{COINGECKO_API_URL}/exchange_rates", headers=HEADERS, timeout=10)
+        if response.status_code != 200:
+            logging.warning(f"FX refresh failed: status {response.status_code}")
+            return 0
+        btc_rates = {code: entry["value"] for code, entry in response.json()["rates"].items()}
+        usd = btc_rates[BASE_CURRENCY]
+        _rates = {code: btc_rates[code] / usd for code in QUOTE_CURRENCIES if code in btc_rates}
+        _rates[BASE_CURRENCY] = 1.0
+        _fetched_at = time.time()
+        return len(_rates)
+    except Exception as e:
+        logging.error(f"FX refresh failed: {e}")
+        return 0
+    finally:
+        _refresh_lock.release()
+
+
+def refresh_rates_in_background():
+    threading.Thread(target=refresh_rates, name="fx-refresh", daemon=True).start()
+
+
+def rate(currency):
+    """Units of `currency` per USD, or None until the FX table has it. Kicks a refresh when stale."""
+    if currency == BASE_CURRENCY:
+        return 1.0
+    now = time.time()
+    # After a failed refresh the table stays stale; wait FX_RETRY_INTERVAL before trying again
+    # rather than starting a new thread and upstream request on every call
+    if (now - _fetched_at > FX_REFRESH_INTERVAL and now - _attempted_at > FX_RETRY_INTERVAL
+            and not _refresh_lock.locked()):
+        refresh_rates_in_background()
+    return _rates.get(currency)
+
+
+def convert(usd_amount, currency):
+    """`usd_amount` in `currency`, or None if there is no rate yet."""
+    fx = rate(currency)
+    return None if fx is None or usd_amount is None else usd_amount * fx
+
+
+def to_usd(amount, currency):
+    fx = rate(currency)
+    return None if not fx else amount / fx
+
+
+def with_currencies(quotes, currencies):
+    """Add {"prices": {currency: price}} to each USD quote, once per coin and currency (not per alert)."""
+    fx = {currency: rate(currency) for currency in currencies}
+    for quote in quotes.values():
+        quote["prices"] = {currency: quote["price"] * r for currency, r in fx.items() if r is not None}
+    return quotes
+
+
+def format_money(amount, currency=BASE_CURRENCY):
+    decimals = CURRENCY_DECIMALS.get(currency, 2)
+    sign = CURRENCY_SIGNS.get(currency)
+    if sign:
+        return f"{'-' if amount < 0 else ''}{sign}{abs(amount):,.{decimals}f}"
+    return f"{amount:,.{decimals}f} {currency.upper()}"
@@ -0,0 +1,83 @@
+# services/health_server.py
+
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utils.metrics import render_metrics
+
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+MAX_POST_BYTES = 1024 * 1024
+
+_checks = {}
+_post_routes = {}
+
+
+def register_check(name, check):
+    """Add a readiness check: a callable returning truthy when healthy (raising counts as failure)."""
+    _checks[name] = check
+
+
+def register_post_route(path, handler):
+    """Serve POSTs to `path` with handler(headers, body) -> (status, content_type, body)."""
+    _post_routes[path] = handler
+
+
+def run_checks():
+    results = {}
+    for name, check in list(_checks.items()):
+        try:
+            results[name] = bool(check())
+        except Exception as e:
+            logging.warning(f"Readiness check {name} failed: {e}")
+            results[name] = False
+    return results
+
+
+class HealthHandler(BaseHTTPRequestHandler):
+    def _reply(self, status, body, content_type="text/plain; charset=utf-8"):
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(payload)
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            self._reply(200, render_metrics(), METRICS_CONTENT_TYPE)
+        elif path == "/ready":
+            results = run_checks()
+            ready = all(results.values())
+            self._reply(200 if ready else 503, json.dumps({"ready": ready, "checks": results}),
+                        "application/json")
+        else:
+            # Liveness: the process is up and serving
+            self._reply(200, "Bot is active")
+
+    do_HEAD = do_GET
+
+    def do_POST(self):
+        handler = _post_routes.get(self.path.split("?", 1)[0])
+        if handler is None:
+            self._reply(404, "not found")
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_POST_BYTES:
+            self._reply(413, "too large")
+            return
+        status, content_type, body = handler(self.headers, self.rfile.read(length))
+        self._reply(status, body, content_type)
+
+    def log_message(self, format, *args):
+        return  # Suppress logs
+
+
+def start_health_server(port, host="0.0.0.0"):
+    server = ThreadingHTTPServer((host, port), HealthHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="health-server", daemon=True)
+    thread.start()
+    return server
@@ -0,0 +1,105 @@
+# services/http_client.py
+
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+import requests
+from requests.adapters import HTTPAdapter
+from config import HEADERS, UPSTREAM_BUDGET_PER_MINUTE
+from utils.metrics import PROVIDER_ERRORS, PROVIDER_LATENCY
+from utils.tracing import add_span
+from services.cassette import cassette_from_env
+
+# One pooled session for every upstream API, shared by the loop and worker threads
+_session = requests.Session()
+_session.headers.update(HEADERS)
+_session.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=16))
+_session.mount("http://", HTTPAdapter(pool_connections=8, pool_maxsize=16))
+
+# Optional record/replay and fault injection, selected by HTTP_CASSETTE_* / HTTP_FAULT_* env vars
+_cassette = cassette_from_env(os.environ)
+
+
+class RequestBudget:
+    """Token bucket over every upstream request. get() always spends, so user commands never
+    wait; background pollers check available() first and back off when the budget is used up,
+    passing a `reserve` so some headroom is always left for interactive calls."""
+
+    def __init__(self, per_minute):
+        self.per_minute = per_minute
+        self._tokens = per_minute
+        self._refilled = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.per_minute, self._tokens + (now - self._refilled) * self.per_minute / 60)
+        self._refilled = now
+
+    def spend(self, requests=1):
+        with self._lock:
+            self._refill()
+            self._tokens -= requests
+
+    def available(self, reserve=0):
+        with self._lock:
+            self._refill()
+            return max(0, int(self._tokens - reserve))
+
+
+budget = RequestBudget(UPSTREAM_BUDGET_PER_MINUTE)
+
+_request_count = contextvars.ContextVar("request_count", default=None)
+
+
+@contextmanager
+def counting_requests():
+    """Count the upstream requests made inside the block: `with counting_requests() as made: ...; made[0]`."""
+    made = [0]
+    token = _request_count.set(made)
+    try:
+        yield made
+    finally:
+        _request_count.reset(token)
+
+
+def _send(provider, url, kwargs):
+    if _cassette is None:
+        return _session.get(url, **kwargs)
+
+    injected = _cassette.inject(provider, url)
+    if injected is not None:
+        return injected
+    if _cassette.mode == "replay":
+        return _cassette.replay("GET", url, kwargs.get("params"))
+
+    start = time.perf_counter()
+    response = _session.get(url, **kwargs)
+    if _cassette.mode == "record":
+        _cassette.record(provider, "GET", url, kwargs.get("params"), response, time.perf_counter() - start)
+    return response
+
+
+def get(provider, url, **kwargs):
+    """GET through the shared session, recording latency and failures per provider."""
+    kwargs.setdefault("timeout", 10)
+    budget.spend()
+    made = _request_count.get()
+    if made is not None:
+        made[0] += 1
+    start = time.perf_counter()
+    try:
+        response = _send(provider, url, kwargs)
+    except Exception as e:
+        PROVIDER_ERRORS.inc(provider=provider, reason=type(e).__name__)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        PROVIDER_LATENCY.observe(elapsed, provider=provider)
+        add_span("upstream", elapsed)
+
+    if response.status_code >= 400:
+        PROVIDER_ERRORS.inc(provider=provider, reason=str(response.status_code))
+    return response
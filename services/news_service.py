@@ -1,54 +1,235 @@
 # services/news_service.py
 
-import requests
+import hashlib
+import re
+import threading
+import time
+from services import http_client
 import logging
-from config import NEWS_API_KEY  # Add to config.py
+from urllib.parse import urlsplit, urlunsplit
+from config import NEWS_API_KEY, HEADERS, COINGECKO_API_URL, CRYPTOCOMPARE_API_URL
+from utils.metrics import CACHE_REQUESTS
 
 logging.basicConfig(level=logging.INFO)
 
-def get_crypto_news(coin_id=None):
-    """Fetch top 3 crypto news from reliable APIs"""
-    # Use CryptoCompare API (free tier available)
-    base_url = "https://min-api.cryptocompare.com/data/v2/news/"
-    params = {
-        "lang": "EN",
-        "api_key": NEWS_API_KEY,
-        "categories": "BTC,ETH,ALTCOINS" if not coin_id else None
+NEWS_TTL = 5 * 60               # Serve without revalidating for this long
+NEWS_MAX_ARTICLES = 50          # Kept per category after deduplication
+NEWS_CATEGORY_IDLE = 60 * 60    # Stop refreshing categories nobody asked for
+GENERAL = "general"
+
+CRYPTOCOMPARE_URL = f"{CRYPTOCOMPARE_API_URL}/v2/news/"
+COINGECKO_NEWS_URL = f"{COINGECKO_API_URL}/news"
+
+# category -> {"articles", "fetched_at", "requested_at", "providers": {name: {"articles", "etag", "last_modified"}}}
+_news_cache = {}
+_cache_lock = threading.Lock()
+_refreshing = set()
+
+
+def news_category(coin_id=None):
+    """Cache key for a coin: its ticker (CryptoCompare's category), or the general feed."""
+    if not coin_id:
+        return GENERAL
+    from services.coin_registry import coin_symbol
+    return coin_symbol(coin_id)
+
+
+def _providers(category):
+    if category == GENERAL:
+        params = {"lang": "EN", "api_key": NEWS_API_KEY, "categories": "BTC,ETH,ALTCOINS"}
+        return [("CryptoCompare", CRYPTOCOMPARE_URL, params, "Data"), ("CoinGecko", COINGECKO_NEWS_URL, None, "news")]
+    params = {"lang": "EN", "api_key": NEWS_API_KEY, "categories": category}
+    return [("CryptoCompare", CRYPTOCOMPARE_URL, params, "Data")]
+
+
+def _fetch_provider(name, url, params, data_key, previous):
+    """Conditional GET. Returns the provider state to keep, or None if the request failed."""
+    headers = dict(HEADERS)
+    if previous.get("etag"):
+        headers["If-None-Match"] = previous["etag"]
+    if previous.get("last_modified"):
+        headers["If-Modified-Since"] = previous["last_modified"]
+
+    try:
+        response = http_client.get(name.lower(), url, params=params, headers=headers, timeout=10)
+    except Exception as e:
+        logging.error(f"Error fetching news from {name}: {e}")
+        return None
+
+    if response.status_code == 304:
+        return previous
+    if response.status_code != 200:
+        logging.warning(f"{name} news returned status {response.status_code}")
+        return None
+
+    try:
+        items = response.json().get(data_key, []) or []
+    except ValueError:
+        logging.warning(f"{name} news returned invalid JSON")
+        return None
+
+    return {
+        "articles": format_news_items(items, provider=name),
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
     }
-    
-    # Add coin-specific filtering
-    if coin_id:
-        params["categories"] = coin_id.upper()
 
+
+def refresh_news(category=GENERAL):
+    """Revalidate one category against every provider and swap the merged result in."""
+    with _cache_lock:
+        if category in _refreshing:
+            return False
+        _refreshing.add(category)
+        entry = _news_cache.get(category, {})
+
+    try:
+        logging.info(f"Refreshing crypto news for {category}")
+        previous_providers = entry.get("providers", {})
+        providers = {}
+        fresh = False
+        changed = []
+        for name, url, params, data_key in _providers(category):
+            state = _fetch_provider(name, url, params, data_key, previous_providers.get(name, {}))
+            if state is not None:
+                providers[name] = state
+                fresh = True
+                if state is not previous_providers.get(name):
+                    changed.append(state)
+            elif name in previous_providers:
+                providers[name] = previous_providers[name]  # Keep serving what we had
+
+        articles = dedupe_articles(a for state in providers.values() for a in state["articles"])
+
+        with _cache_lock:
+            current = _news_cache.get(category, {})
+            _news_cache[category] = {
+                "articles": articles[:NEWS_MAX_ARTICLES],
+                "fetched_at": time.time() if fresh else current.get("fetched_at"),
+                "requested_at": current.get("requested_at", time.time()),
+                "providers": providers,
+            }
+        if not fresh:
+            logging.warning(f"All news providers failed for {category}; keeping cached articles")
+        if changed:
+            _index_articles(category, (a for state in changed for a in state["articles"]))
+        return fresh
+    finally:
+        with _cache_lock:
+            _refreshing.discard(category)
+
+
+def _index_articles(category, articles):
+    from database.news_index import ingest_articles
+    from services.coin_registry import resolve_coin
+
+    coin_hint = resolve_coin(category) if category != GENERAL else None
     try:
-        logging.info(f"Fetching crypto news for {coin_id or 'general'}")
-        response = requests.get(base_url, params=params, timeout=10)
-        if response.status_code == 200:
-            data = response.json().get("Data", [])
-            return format_news_items(data[:5])  # Get top 3
+        inserted = ingest_articles(articles, coin_hint=coin_hint)
+        if inserted:
+            logging.info(f"Indexed {inserted} new {category} news articles")
     except Exception as e:
-        logging.error(f"Error fetching news: {e}")
+        logging.error(f"News indexing failed for {category}: {e}")
 
-    # Fallback to CoinGecko if primary fails
+
+def refresh_news_in_background(category=GENERAL):
+    thread = threading.Thread(target=refresh_news, args=(category,), name=f"news-refresh-{category}", daemon=True)
+    thread.start()
+    return thread
+
+
+def refresh_all_news():
+    """Scheduled job: revalidate the general feed and every recently requested category. Returns categories refreshed."""
+    now = time.time()
+    with _cache_lock:
+        categories = [c for c, e in _news_cache.items()
+                      if c == GENERAL or now - e.get("requested_at", 0) < NEWS_CATEGORY_IDLE]
+        for category in set(_news_cache) - set(categories):
+            del _news_cache[category]
+    categories = categories or [GENERAL]
+    for category in categories:
+        refresh_news(category)
+
+    from database.news_index import purge_old_articles
     try:
-        logging.info("Trying CoinGecko fallback")
-        url = "https://api.coingecko.com/api/v3/news" 
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            data = response.json().get("news", [])
-            return format_news_items(data[:5])
+        purge_old_articles()
     except Exception as e:
-        logging.error(f"CoinGecko fallback failed: {e}")
+        logging.error(f"News retention purge failed: {e}")
+    return len(categories)
+
+
+def clear_news_cache():
+    with _cache_lock:
+        _news_cache.clear()
 
-    # Final fallback
-    logging.warning("All APIs failed. Using cached news.")
-    return [
-        {"title": "Crypto Market Update", "summary": "Major cryptocurrencies showing mixed signals in today's trading session.", "url": "https://cryptocompare.com/news"},
-        {"title": "Blockchain Adoption Grows", "summary": "Enterprise blockchain adoption reaches new highs according to industry report.", "url": "https://cryptocompare.com/news"},
-        {"title": "Regulatory Developments", "summary": "Global regulators meet to discuss cryptocurrency framework standards.", "url": "https://cryptocompare.com/news"}
-    ]
 
-def format_news_items(items):
+def get_cached_news(coin_id=None, limit=5):
+    """Answer from memory. Returns (articles, age_seconds); age is None while the cache is cold.
+
+    Stale entries are still served while a background refresh revalidates them. Cold
+    entries are left for the caller (or the scheduled job) to fill.
+    """
+    category = news_category(coin_id)
+    now = time.time()
+    with _cache_lock:
+        entry = _news_cache.setdefault(category, {"articles": [], "fetched_at": None, "providers": {}})
+        entry["requested_at"] = now
+        articles = entry["articles"][:limit]
+        fetched_at = entry["fetched_at"]
+
+    if fetched_at is None:
+        CACHE_REQUESTS.inc(cache="news", result="miss")
+    elif now - fetched_at > NEWS_TTL:
+        CACHE_REQUESTS.inc(cache="news", result="stale")
+        refresh_news_in_background(category)
+    else:
+        CACHE_REQUESTS.inc(cache="news", result="hit")
+    return articles, (now - fetched_at) if fetched_at else None
+
+
+def get_crypto_news(coin_id=None):
+    """Fetch top crypto news, refreshing the cache first if it has never been filled"""
+    articles, age = get_cached_news(coin_id)
+    if age is None:
+        refresh_news(news_category(coin_id))
+        articles, _ = get_cached_news(coin_id)
+    return articles
+
+
+def _normalize_url(url):
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower().removeprefix("www."), parts.path.rstrip("/"), "", ""))
+
+
+def _title_hash(title):
+    normalized = re.sub(r"[^a-z0-9]+", " ", title.lower()).strip()
+    return hashlib.sha1(normalized.encode()).hexdigest()
+
+
+def article_keys(article):
+    """(normalized URL, title hash) identifying an article across providers."""
+    url_key = _normalize_url(article["url"]) if article.get("url") else None
+    title_key = _title_hash(article["title"]) if article.get("title") else None
+    return url_key, title_key
+
+
+def dedupe_articles(articles):
+    """Merge provider feeds, newest first, dropping repeats by URL or by title."""
+    seen_urls, seen_titles, unique = set(), set(), []
+    for article in sorted(articles, key=lambda a: a.get("published_on") or 0, reverse=True):
+        url_key, title_key = article_keys(article)
+        duplicate = (url_key and url_key in seen_urls) or (title_key and title_key in seen_titles)
+        # Remember both keys even for dropped copies so repeats chain across providers
+        if url_key:
+            seen_urls.add(url_key)
+        if title_key:
+            seen_titles.add(title_key)
+        if not duplicate:
+            unique.append(article)
+    return unique
+
+
+def format_news_items(items, provider=None):
     """Format news items consistently"""
     formatted = []
     for item in items:
@@ -56,15 +237,22 @@ def format_news_items(items):
         title = item.get("title") or item.get("title_en")
         summary = item.get("body") or item.get("description") or ""
         url = item.get("url") or item.get("link")
-        
+        published_on = item.get("published_on") or item.get("updated_at") or item.get("created_at") or 0
+        source = (item.get("source_info") or {}).get("name") or item.get("source") or item.get("news_site") or provider
+        raw_categories = item.get("categories") if isinstance(item.get("categories"), str) else ""
+        categories = [c.strip().upper() for c in raw_categories.split("|") if c.strip()]
+
         # Clean up summary text
         summary = summary.replace("&quot;", '"').replace("&#39;", "'")
         if len(summary) > 200:
             summary = summary[:197] + "..."
-            
+
         formatted.append({
             "title": title,
             "summary": summary,
-            "url": url
+            "url": url,
+            "source": source,
+            "published_on": published_on if isinstance(published_on, (int, float)) else 0,
+            "categories": categories,
         })
-    return formatted
\ No newline at end of file
+    return formatted
@@ -0,0 +1,183 @@
+# services/performance.py
+#
+# Portfolio performance for /performance: time-weighted and money-weighted returns,
+# drawdown and per-coin contribution over PERFORMANCE_WINDOWS, computed with pandas
+# over stored daily USD closes (the price_bars table, topped up incrementally from
+# CoinGecko) and the user's lot timeline. Lots and sales enter the portfolio at the
+# close of the first daily bar after they were recorded and are valued at that close,
+# so a back-dated /buy price doesn't show up as a one-day return; average-cost P/L stays
+# in /viewportfolio. Results are cached per user until their lots change or a new daily
+# bar closes.
+
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+import numpy as np
+import pandas as pd
+from utils.metrics import CACHE_REQUESTS
+
+PERFORMANCE_WINDOWS = (("7d", 7), ("30d", 30), ("1y", 365))
+HISTORY_DAYS = max(days for _, days in PERFORMANCE_WINDOWS)
+IRR_ITERATIONS = 100
+
+_cache = {}                 # user_id -> (cache key, results)
+_cache_lock = threading.Lock()
+
+
+def last_closed_day():
+    """UTC date of the latest closed daily bar (CoinGecko stamps a day's close at the next midnight)."""
+    return datetime.now(timezone.utc).date()
+
+
+def refresh_price_bars(coin_ids, today=None):
+    """Fetch the daily closes each coin is missing up to `today`. Returns how many coins were topped up."""
+    from database.database import latest_price_bar_day, save_price_bars
+    from services.crypto_service import get_historical_prices
+
+    today = today or last_closed_day()
+    refreshed = 0
+    for coin_id in coin_ids:
+        latest = latest_price_bar_day(coin_id)
+        if latest is not None and latest >= today.isoformat():
+            continue
+        missing = HISTORY_DAYS + 1 if latest is None else (today - datetime.fromisoformat(latest).date()).days + 1
+        points = get_historical_prices(coin_id, days=min(missing, HISTORY_DAYS + 1))
+        if not points:
+            logging.warning(f"No daily closes for {coin_id}; leaving it out of performance")
+            continue
+        bars = {}
+        for ms, close in points:
+            day = datetime.fromtimestamp(ms / 1000, timezone.utc).date()
+            if day <= today:
+                bars.setdefault(day.isoformat(), close)  # The midnight close, not the live last point
+        save_price_bars(coin_id, sorted(bars.items()))
+        refreshed += 1
+    return refreshed
+
+
+def _lot_days(lots):
+    """The bar each lot entered at: the first close after it was recorded; None for untimed lots."""
+    days = pd.to_datetime(lots["created_at"], utc=True).dt.tz_localize(None).dt.normalize()
+    return days + pd.Timedelta(days=1)
+
+
+def money_weighted_return(flows, days):
+    """Period return at the constant daily rate that zeroes the NPV of `flows` (+ out, - in) on day offsets `days`."""
+    flows = np.asarray(flows, dtype=float)
+    days = np.asarray(days, dtype=float)
+    if not np.any(flows > 0) or not np.any(flows < 0):
+        return None
+
+    def npv(rate):
+        return np.sum(flows / (1 + rate) ** days)
+
+    low, high = -0.5, 1.0   # Daily rates; wide enough for any real portfolio, narrow enough not to overflow
+    if npv(low) * npv(high) > 0:
+        return None
+    for _ in range(IRR_ITERATIONS):
+        mid = (low + high) / 2
+        if npv(low) * npv(mid) <= 0:
+            high = mid
+        else:
+            low = mid
+    return float((1 + (low + high) / 2) ** days.max() - 1)
+
+
+def window_performance(prices, holdings, flows):
+    """Metrics for one window.
+
+    `prices` and `holdings` are day x coin frames over the window's bars; `flows` is the
+    day x coin value of units added (negative for sales) at each bar's close, with the
+    first row holding nothing (opening holdings are already in `holdings`).
+    """
+    values = holdings * prices
+    total = values.sum(axis=1)
+    net_flows = flows.sum(axis=1)
+    start, end = total.iloc[0], total.iloc[-1]
+
+    # Time-weighted: chain daily returns with each day's flow taken out at the close
+    previous = total.shift(1)
+    daily = ((total - net_flows) / previous - 1).where(previous > 0, 0.0).fillna(0.0)
+    wealth = (1 + daily).cumprod()
+    drawdown = wealth / wealth.cummax() - 1
+
+    # Per-coin contribution: yesterday's weight times today's price return, scaled by the
+    # wealth compounded so far so the coins' contributions add up to the time-weighted return
+    weights = values.shift(1).div(previous.where(previous > 0), axis=0)
+    linked = weights.mul(wealth.shift(1).fillna(1.0), axis=0)
+    contribution = (linked * prices.pct_change(fill_method=None)).fillna(0.0).sum()
+
+    # Money-weighted: the opening value goes in, flows in and out, the closing value comes out
+    offsets = (total.index - total.index[0]).days.to_numpy()
+    cash = -net_flows.to_numpy()
+    cash[0] -= start
+    cash[-1] += end
+
+    return {
+        "start_value": float(start),
+        "end_value": float(end),
+        "net_flows": float(net_flows.sum()),
+        "twr": float(wealth.iloc[-1] - 1),
+        "mwr": money_weighted_return(cash, offsets),
+        "max_drawdown": float(drawdown.min()),
+        "drawdown": float(drawdown.iloc[-1]),
+        "contribution": {coin: float(c) for coin, c in contribution.items() if c},
+    }
+
+
+def compute_performance(lots, bars, today):
+    """{window label: metrics or None} from lots [(id, coin_id, amount, created_at)] and bars [(coin_id, day, close)]."""
+    lots = pd.DataFrame(lots, columns=["id", "coin_id", "amount", "created_at"])
+    closes = pd.DataFrame(bars, columns=["coin_id", "day", "close"])
+    closes["day"] = pd.to_datetime(closes["day"])
+    prices = closes.pivot(index="day", columns="coin_id", values="close").sort_index()
+    end = pd.Timestamp(today)
+    prices = prices.reindex(pd.date_range(end - pd.Timedelta(days=HISTORY_DAYS), end, freq="D")).ffill()
+
+    lots = lots[lots["coin_id"].isin(prices.columns)]
+    lots = lots.assign(day=_lot_days(lots).fillna(prices.index[0]).clip(lower=prices.index[0]))
+    added = lots.pivot_table(index="day", columns="coin_id", values="amount", aggfunc="sum")
+    added = added.reindex(index=prices.index, columns=prices.columns).fillna(0.0)
+    holdings = added.cumsum()
+
+    results = {}
+    for label, days in PERFORMANCE_WINDOWS:
+        window = prices.index[-(days + 1):]
+        window_prices = prices.loc[window]
+        window_holdings = holdings.loc[window]
+        flows = (added.loc[window] * window_prices).fillna(0.0)
+        flows.iloc[0] = 0.0
+        held = window_holdings.abs().sum(axis=1) > 0
+        if not held.any() or window_prices.isna().all().all():
+            results[label] = None
+            continue
+        results[label] = window_performance(window_prices, window_holdings, flows)
+    return results
+
+
+def portfolio_performance(user_id):
+    """Cached performance for `user_id`, or None if they hold nothing. Blocking: run in a thread."""
+    from database.database import load_portfolio_lots, load_price_bars
+
+    lots = load_portfolio_lots(user_id)
+    if not lots:
+        return None
+    today = last_closed_day()
+    key = (tuple(lots), today)
+    with _cache_lock:
+        cached = _cache.get(user_id)
+    if cached and cached[0] == key:
+        CACHE_REQUESTS.inc(cache="performance", result="hit")
+        return cached[1]
+    CACHE_REQUESTS.inc(cache="performance", result="miss")
+
+    coin_ids = sorted({lot[1] for lot in lots})
+    refresh_price_bars(coin_ids, today)
+    since = (today - timedelta(days=HISTORY_DAYS)).isoformat()
+    bars = load_price_bars(coin_ids, since)
+    if not bars:
+        return None
+    results = compute_performance(lots, bars, today)
+    with _cache_lock:
+        _cache[user_id] = (key, results)
+    return results
@@ -0,0 +1,198 @@
+# services/poll_scheduler.py
+#
+# Adaptive alert polling. Each watched coin is polled on its own interval, set from
+# how far the price is from the coin's nearest untriggered alert threshold measured in
+# expected moves at its recent volatility: a coin a fraction of a move away from a
+# threshold is polled every few seconds, one with only distant alerts every
+# POLL_MAX_INTERVAL. Due coins share one batched CoinGecko call per tick, within
+# POLL_BUDGET_SHARE of the process-wide upstream request budget (the rest is kept for
+# user commands), and the calls saved against fixed POLL_FIXED_INTERVAL polling are
+# counted. Alerts are cached between ticks and re-read only after a database commit.
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from config import (POLL_BUDGET_SHARE, POLL_FIXED_INTERVAL, POLL_MAX_INTERVAL, POLL_MIN_INTERVAL,
+                    UPSTREAM_BUDGET_PER_MINUTE)
+from utils.metrics import POLL_BASELINE_REQUESTS_TOTAL, POLL_DEFERRED_TOTAL, POLL_INTERVAL_SECONDS, POLL_REQUESTS_TOTAL
+
+TICK_SECONDS = 2
+SIGMA_MULTIPLE = 3                              # Poll before a 3-sigma move could cross a threshold unseen
+DEFAULT_VOLATILITY = 0.03 / math.sqrt(86400)    # 3% a day, per sqrt(second), until a coin has samples
+VOLATILITY_SAMPLES = 30
+BUDGET_RESERVE = UPSTREAM_BUDGET_PER_MINUTE * (1 - POLL_BUDGET_SHARE)
+
+
+def threshold_distance(alert, price):
+    """Relative move from `price` that would fire `alert`; None for alerts without a price threshold."""
+    if "price" in alert:
+        return None if alert["price"] is None else max(0.0, alert["price"] - price) / price
+    if "low" in alert and "high" in alert:
+        if alert["low"] is None or alert["high"] is None:
+            return None
+        if alert["low"] <= price <= alert["high"]:
+            return 0.0
+        edge = alert["low"] if price < alert["low"] else alert["high"]
+        return abs(edge - price) / price
+    return None
+
+
+def poll_interval(distance, volatility, min_interval=POLL_MIN_INTERVAL, max_interval=POLL_MAX_INTERVAL):
+    """Seconds until a SIGMA_MULTIPLE move at `volatility` (per sqrt second) could cover `distance`."""
+    if distance is None:
+        return max_interval
+    seconds = (distance / (SIGMA_MULTIPLE * volatility)) ** 2
+    return min(max_interval, max(min_interval, seconds))
+
+
+def volatility(samples):
+    """Per-sqrt-second volatility of log returns over [(monotonic, price)], time-normalised."""
+    if len(samples) < 3:
+        return DEFAULT_VOLATILITY
+    variance = 0.0
+    pairs = 0
+    for (t0, p0), (t1, p1) in zip(samples, list(samples)[1:]):
+        if t1 > t0 and p0 > 0 and p1 > 0:
+            variance += math.log(p1 / p0) ** 2 / (t1 - t0)
+            pairs += 1
+    if not pairs or variance == 0:
+        return DEFAULT_VOLATILITY
+    return math.sqrt(variance / pairs)
+
+
+class AdaptivePoller:
+    def __init__(self):
+        self.next_due = {}      # coin_id -> monotonic time of its next poll
+        self.intervals = {}     # coin_id -> (interval seconds, nearest threshold distance)
+        self.samples = {}       # coin_id -> deque[(monotonic, price)]
+        self.requests = 0
+        self.baseline = 0.0
+        self.started = time.monotonic()
+        self._last_tick = None
+        self._budget = None
+        self._alerts = None
+        self._alerts_version = None
+        self._version_conn = None
+
+    def budget_available(self, unbilled=0):
+        """Requests the poller may make now: within its own share (less `unbilled` requests already
+        made but not yet charged to it), and never into the interactive reserve."""
+        from services import http_client
+        if self._budget is None:
+            self._budget = http_client.RequestBudget(UPSTREAM_BUDGET_PER_MINUTE * POLL_BUDGET_SHARE)
+        return min(self._budget.available() - unbilled, http_client.budget.available(reserve=BUDGET_RESERVE))
+
+    def _load_alerts(self):
+        """Cached alerts, re-read only once some connection (any process) has committed since. Blocking."""
+        from database.database import connect, load_alerts
+        if self._version_conn is None:
+            self._version_conn = connect(check_same_thread=False)
+        version = self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+        if self._alerts is None or version != self._alerts_version:
+            self._alerts = load_alerts()
+            self._alerts_version = version
+        return self._alerts
+
+    def _schedule(self, coin_id, alerts, quote, now):
+        distance = None
+        for targets in alerts.values():
+            for alert in targets:
+                if alert["triggered"] or alert.get("coin_id", "bitcoin") != coin_id:
+                    continue
+                currency = alert.get("currency", "usd")
+                price = quote["price"] if currency == "usd" else quote["prices"].get(currency)
+                if price is None:
+                    continue
+                d = threshold_distance(alert, price)
+                if d is not None and (distance is None or d < distance):
+                    distance = d
+        interval = poll_interval(distance, volatility(self.samples[coin_id]))
+        self.next_due[coin_id] = now + interval
+        self.intervals[coin_id] = (interval, distance)
+        POLL_INTERVAL_SECONDS.observe(interval)
+
+    def _fetch(self, coin_ids):
+        """Batched quotes, then per-coin fallbacks while the budget lasts. Runs in a worker thread."""
+        from services import http_client
+        from services.coin_registry import coin_symbol
+        from services.crypto_service import get_crypto_price, get_crypto_prices
+
+        with http_client.counting_requests() as made:
+            quotes = get_crypto_prices(coin_ids)
+            for coin_id in coin_ids:
+                if coin_id in quotes or self.budget_available(unbilled=made[0]) < 1:
+                    continue
+                price = get_crypto_price(coin_id, coin_symbol(coin_id))
+                if price is not None:
+                    quotes[coin_id] = {"price": price}
+        self._budget.spend(made[0])
+        return quotes, made[0]
+
+    async def tick(self, app):
+        from handlers.job_handlers import check_quotes
+        from services.alert_engine import alert_coins, alert_currencies
+        from services.fx import with_currencies
+
+        now = time.monotonic()
+        started = time.perf_counter()
+        alerts = await asyncio.to_thread(self._load_alerts)
+        watched = alert_coins(alerts)
+
+        # Fixed polling would have fetched every watched coin once per POLL_FIXED_INTERVAL
+        if self._last_tick is not None:
+            owed = (now - self._last_tick) * len(watched) / POLL_FIXED_INTERVAL
+            self.baseline += owed
+            POLL_BASELINE_REQUESTS_TOTAL.inc(owed)
+        self._last_tick = now
+
+        for coin_id in list(self.next_due):
+            if coin_id not in watched:
+                self.next_due.pop(coin_id)
+                self.intervals.pop(coin_id, None)
+                self.samples.pop(coin_id, None)
+        due = sorted((c for c in watched if self.next_due.get(c, 0) <= now), key=lambda c: self.next_due.get(c, 0))
+        if not due:
+            return 0
+        if self.budget_available() < 1:
+            POLL_DEFERRED_TOTAL.inc(len(due))
+            return 0
+
+        quotes, made = await asyncio.to_thread(self._fetch, due)
+        self.requests += made
+        POLL_REQUESTS_TOTAL.inc(made)
+
+        now = time.monotonic()
+        with_currencies(quotes, alert_currencies(alerts))
+        for coin_id, quote in quotes.items():
+            self.samples.setdefault(coin_id, deque(maxlen=VOLATILITY_SAMPLES)).append((now, quote["price"]))
+            self._schedule(coin_id, alerts, quote, now)
+        missed = [coin_id for coin_id in due if coin_id not in quotes]
+        for coin_id in missed:
+            self.next_due[coin_id] = now + POLL_MIN_INTERVAL  # Retry soon, not on every tick
+        POLL_DEFERRED_TOTAL.inc(len(missed))
+
+        await check_quotes(app, alerts, quotes, started)
+        return len(quotes)
+
+    def summary(self):
+        """Requests made vs the fixed-interval baseline, plus the current per-coin intervals."""
+        return {
+            "requests": self.requests,
+            "baseline": round(self.baseline),
+            "saved": round(self.baseline - self.requests),
+            "seconds": time.monotonic() - self.started,
+            "intervals": dict(sorted(self.intervals.items(), key=lambda item: item[1][0])),
+        }
+
+
+poller = AdaptivePoller()
+
+
+async def adaptive_check(app):
+    """APScheduler job: poll whichever coins are due. Returns how many were polled."""
+    try:
+        return await poller.tick(app)
+    except Exception as e:
+        logging.error(f"Adaptive poll failed: {e}", exc_info=True)
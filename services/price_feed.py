@@ -0,0 +1,98 @@
+# services/price_feed.py
+#
+# The single price-feed producer for multi-process mode. Every PRICE_FEED_INTERVAL it
+# fetches one price per coin that any active alert watches and broadcasts the tick to
+# every connected alert worker over a Unix socket (multiprocessing.connection).
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+from config import COIN_MAP, PRICE_FEED_INTERVAL, PRICE_FEED_SOCKET, TELEGRAM_BOT_TOKEN
+
+
+def feed_authkey():
+    # Every process of the deployment knows the bot token; nothing else can join the feed
+    return hashlib.sha256(f"price-feed:{TELEGRAM_BOT_TOKEN}".encode()).digest()
+
+
+def watched_coins():
+    from database.database import connect
+    conn = connect()
+    rows = conn.execute("SELECT DISTINCT coin_id FROM alerts WHERE triggered = 0").fetchall()
+    conn.close()
+    return sorted({row[0] for row in rows} | set(COIN_MAP.values()))
+
+
+def fetch_tick(seq):
+    from services.coin_registry import coin_symbol
+    from services.crypto_service import get_crypto_price, get_crypto_prices
+    coins = watched_coins()
+    quotes = get_crypto_prices(coins)  # One request for every coin CoinGecko knows
+    for coin_id in coins:
+        if coin_id in quotes:
+            continue
+        price = get_crypto_price(coin_id, coin_symbol(coin_id))
+        if price is not None:
+            quotes[coin_id] = {"price": price}
+    return {"seq": seq, "ts": time.time(), "quotes": quotes}
+
+
+class PriceFeedServer:
+    def __init__(self, address=PRICE_FEED_SOCKET):
+        self.address = address
+        self._subscribers = []
+        self._lock = threading.Lock()
+        if os.path.exists(address):
+            os.unlink(address)  # Stale socket from a previous run
+        os.makedirs(os.path.dirname(address) or ".", exist_ok=True)
+        self._listener = Listener(address, family="AF_UNIX", authkey=feed_authkey())
+        threading.Thread(target=self._accept, name="price-feed-accept", daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn = self._listener.accept()
+            except Exception as e:
+                logging.warning(f"Price feed rejected a connection: {e}")
+                continue
+            with self._lock:
+                self._subscribers.append(conn)
+            logging.info(f"Alert worker joined the price feed ({len(self._subscribers)} connected)")
+
+    def publish(self, tick):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for conn in subscribers:
+            try:
+                conn.send(tick)
+            except (OSError, EOFError):
+                conn.close()
+                with self._lock:
+                    self._subscribers.remove(conn)
+        return len(subscribers)
+
+
+def run_price_feed(interval=PRICE_FEED_INTERVAL):
+    """Process entry point: fetch and broadcast ticks forever."""
+    logging.basicConfig(format='%(asctime)s - price-feed - %(levelname)s - %(message)s', level=logging.INFO)
+    server = PriceFeedServer()
+    seq = 0
+    while True:
+        started = time.monotonic()
+        seq += 1
+        tick = fetch_tick(seq)
+        subscribers = server.publish(tick)
+        logging.info(f"Tick {seq}: {len(tick['quotes'])} prices to {subscribers} workers")
+        time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+def connect_to_feed(address=PRICE_FEED_SOCKET, retry_delay=1.0):
+    """Block until the producer is reachable; returns a Connection whose recv() yields ticks."""
+    while True:
+        try:
+            return Client(address, family="AF_UNIX", authkey=feed_authkey())
+        except (FileNotFoundError, ConnectionRefusedError):
+            time.sleep(retry_delay)
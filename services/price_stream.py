@@ -0,0 +1,143 @@
+# services/price_stream.py
+#
+# Optional streaming prices from an exchange WebSocket ticker feed (Binance combined
+# stream format). Every ticker lands on the shared price board; price history and live
+# dashboard viewers get at most one point per coin every HISTORY_INTERVAL. The
+# connection is kept alive with protocol pings, dropped when no ticker arrives for
+# PRICE_STREAM_STALE seconds, and re-established with full-jitter exponential backoff.
+# get_crypto_price() answers from the stream while a coin's ticks are fresh and falls
+# back to the REST providers once they go stale.
+
+import asyncio
+import json
+import logging
+import random
+import time
+from config import PRICE_STREAM, PRICE_STREAM_STALE, PRICE_STREAM_URL
+from utils.metrics import STREAM_CONNECTED, STREAM_GAPS_TOTAL, STREAM_MESSAGES_TOTAL, STREAM_RECONNECTS_TOTAL
+
+QUOTE_ASSET = "USDT"
+PING_INTERVAL = 20
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+STABLE_AFTER = 60           # A connection that lived this long resets the backoff
+HISTORY_INTERVAL = 60
+GAP_SECONDS = 5             # Ticker streams push about once a second per symbol
+
+_last_seen = {}             # coin_id -> monotonic time of its last streamed tick
+_last_event = {}            # symbol -> exchange event time (ms) of its last tick
+_last_recorded = {}         # coin_id -> monotonic time it last went into price history
+
+
+def stream_symbols(coin_ids):
+    """{exchange symbol: coin_id} for coins the exchange quotes against USDT."""
+    from services.coin_registry import coin_symbol
+    symbols = {}
+    for coin_id in coin_ids:
+        symbol = coin_symbol(coin_id).upper()
+        if symbol and symbol != QUOTE_ASSET:
+            symbols[f"{symbol}{QUOTE_ASSET}"] = coin_id
+    return symbols
+
+
+def stream_url(symbols, base=PRICE_STREAM_URL):
+    return f"{base}?streams=" + "/".join(f"{symbol.lower()}@ticker" for symbol in sorted(symbols))
+
+
+def handle_message(raw, symbols):
+    """Apply one ticker message to the board (and, throttled, history). Returns its coin_id or None."""
+    from utils.price_board import price_board
+    from utils.price_utils import record_price
+
+    try:
+        message = json.loads(raw)
+        data = message.get("data", message)
+        symbol = data["s"]
+        event_ms = int(data["E"])
+        price = float(data["c"])
+        volume = float(data["q"])   # Quote-asset (USDT) volume, the closest to a USD figure
+    except (ValueError, KeyError, TypeError, AttributeError):
+        STREAM_MESSAGES_TOTAL.inc(result="malformed")
+        return None
+
+    coin_id = symbols.get(symbol)
+    if coin_id is None:
+        STREAM_MESSAGES_TOTAL.inc(result="unknown_symbol")
+        return None
+
+    last = _last_event.get(symbol)
+    if last is not None:
+        if event_ms <= last:
+            STREAM_MESSAGES_TOTAL.inc(result="out_of_order")
+            return None
+        if event_ms - last > GAP_SECONDS * 1000:
+            STREAM_GAPS_TOTAL.inc()
+            # Quiet symbols skip ticks all the time; the counter is what to watch, not the log
+            logging.debug(f"Price stream gap: no {symbol} ticker for {(event_ms - last) / 1000:.1f}s")
+    _last_event[symbol] = event_ms
+    STREAM_MESSAGES_TOTAL.inc(result="ok")
+
+    now = time.monotonic()
+    _last_seen[coin_id] = now
+    recorded = _last_recorded.get(coin_id)
+    if recorded is None or now - recorded >= HISTORY_INTERVAL:
+        _last_recorded[coin_id] = now
+        record_price(coin_id, price, volume)
+    else:
+        price_board().publish(coin_id, price, volume, event_ms / 1000)
+    return coin_id
+
+
+def fresh_price(coin_id):
+    """The streamed price if this coin ticked within PRICE_STREAM_STALE seconds, else None."""
+    if not PRICE_STREAM:
+        return None
+    seen = _last_seen.get(coin_id)
+    if seen is None or time.monotonic() - seen > PRICE_STREAM_STALE:
+        return None
+    from utils.price_board import price_board
+    quote = price_board().read(coin_id)
+    return quote.price if quote else None
+
+
+def _backoff(attempt):
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** min(attempt, 10)))
+
+
+async def run_price_stream(coin_ids=None, url=PRICE_STREAM_URL):
+    """Keep a ticker stream open forever. Coins default to COIN_MAP plus every alerted coin, re-read per connection."""
+    import websockets
+    from services.price_feed import watched_coins
+
+    attempt = 0
+    while True:
+        symbols = stream_symbols(coin_ids or await asyncio.to_thread(watched_coins))
+        connected_at = None
+        try:
+            async with websockets.connect(stream_url(symbols, url), ping_interval=PING_INTERVAL,
+                                          ping_timeout=PING_INTERVAL, close_timeout=5) as ws:
+                connected_at = time.monotonic()
+                STREAM_CONNECTED.set(1)
+                logging.info(f"Price stream connected: {len(symbols)} symbols")
+                while True:
+                    raw = await asyncio.wait_for(ws.recv(), PRICE_STREAM_STALE)
+                    handle_message(raw, symbols)
+                    if attempt and time.monotonic() - connected_at >= STABLE_AFTER:
+                        attempt = 0
+        except Exception as e:
+            if connected_at is None:
+                cause = "error"
+                logging.warning(f"Price stream connect failed: {e!r}")
+            elif isinstance(e, asyncio.TimeoutError):
+                cause = "stale"
+                logging.warning(f"Price stream silent for {PRICE_STREAM_STALE:.0f}s; reconnecting")
+            else:
+                cause = "closed"
+                logging.warning(f"Price stream closed: {e!r}")
+        finally:
+            STREAM_CONNECTED.set(0)
+
+        STREAM_RECONNECTS_TOTAL.inc(cause=cause)
+        delay = _backoff(attempt)
+        attempt += 1
+        await asyncio.sleep(delay)
@@ -0,0 +1,33 @@
+# services/telegram_request.py
+
+import time
+from telegram.request import HTTPXRequest
+from utils.metrics import TELEGRAM_LATENCY, TELEGRAM_RATE_LIMITED, TELEGRAM_REQUESTS
+from utils.tracing import add_span
+
+
+def _method_name(url):
+    # https://api.telegram.org/bot<token>/sendMessage -> sendMessage (never leaks the token)
+    return url.rsplit("/", 1)[-1] or "unknown"
+
+
+class InstrumentedRequest(HTTPXRequest):
+    """HTTPXRequest that records Bot API latency, status codes and 429s."""
+
+    async def do_request(self, url, method, *args, **kwargs):
+        api_method = _method_name(url)
+        start = time.perf_counter()
+        try:
+            code, payload = await super().do_request(url, method, *args, **kwargs)
+        except Exception as e:
+            TELEGRAM_REQUESTS.inc(method=api_method, status=type(e).__name__)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            TELEGRAM_LATENCY.observe(elapsed, method=api_method)
+            add_span("send", elapsed)
+
+        TELEGRAM_REQUESTS.inc(method=api_method, status=str(code))
+        if code == 429:
+            TELEGRAM_RATE_LIMITED.inc(method=api_method)
+        return code, payload
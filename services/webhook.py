@@ -0,0 +1,65 @@
+# services/webhook.py
+#
+# Webhook ingestion served by the health server's HTTP threads. Telegram POSTs each
+# update here; we check the secret token, then hand the update to the bot loop's
+# bounded update queue. A full queue answers 503 so Telegram backs off and redelivers.
+
+import asyncio
+import hmac
+import json
+import logging
+from utils.metrics import UPDATE_QUEUE_DEPTH, WEBHOOK_UPDATES_TOTAL
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+ADMIT_TIMEOUT = 5
+
+_loop = None
+_app = None
+_secret = None
+
+
+def bind(loop, app, secret):
+    global _loop, _app, _secret
+    _loop = loop
+    _app = app
+    _secret = secret
+
+
+async def _admit(data):
+    from telegram import Update
+    update = Update.de_json(data, _app.bot)
+    try:
+        _app.update_queue.put_nowait(update)
+    except asyncio.QueueFull:
+        return False
+    UPDATE_QUEUE_DEPTH.set(_app.update_queue.qsize())
+    return True
+
+
+def handle_update(headers, body):
+    """POST handler for the webhook path. Returns (status, content_type, body)."""
+    if _loop is None or not _loop.is_running():
+        return 503, "text/plain", "not ready"
+    if not hmac.compare_digest(headers.get(SECRET_HEADER, "").encode(), _secret.encode()):
+        WEBHOOK_UPDATES_TOTAL.inc(result="bad_secret")
+        return 403, "text/plain", "forbidden"
+    try:
+        data = json.loads(body)
+    except ValueError:
+        WEBHOOK_UPDATES_TOTAL.inc(result="bad_request")
+        return 400, "text/plain", "invalid json"
+
+    future = asyncio.run_coroutine_threadsafe(_admit(data), _loop)
+    try:
+        admitted = future.result(timeout=ADMIT_TIMEOUT)
+    except Exception as e:
+        future.cancel()
+        logging.error(f"Webhook update could not be queued: {e}")
+        WEBHOOK_UPDATES_TOTAL.inc(result="error")
+        return 503, "text/plain", "unavailable"
+
+    if not admitted:
+        WEBHOOK_UPDATES_TOTAL.inc(result="queue_full")
+        return 503, "text/plain", "busy"
+    WEBHOOK_UPDATES_TOTAL.inc(result="accepted")
+    return 200, "text/plain", "ok"
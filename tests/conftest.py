@@ -0,0 +1,25 @@
+# tests/conftest.py
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Point the bot at a scratch database before config is imported anywhere
+_DB_DIR = tempfile.mkdtemp(prefix="pricepilot-tests-")
+os.environ["DB_PATH"] = os.path.join(_DB_DIR, "alerts.db")
+os.environ.setdefault("PRICE_BOARD_NAME", f"pricepilot_tests_{os.getpid()}")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def db():
+    """A freshly initialised, empty database for one test."""
+    from config import DB_PATH
+    from database.database import init_db
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(DB_PATH + suffix):
+            os.remove(DB_PATH + suffix)
+    init_db()
+    return DB_PATH
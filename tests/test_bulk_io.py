@@ -0,0 +1,112 @@
+# tests/test_bulk_io.py
+
+import gzip
+import json
+import sqlite3
+import time
+
+import pytest
+
+from database.database import import_user_rows, iter_user_alerts, iter_user_lots
+from services import fx
+from services.bulk_io import (BulkImportError, export_alerts, export_portfolio, import_document,
+                              parse_document, validate_record)
+
+CSV = (b"kind,coin,amount,price,low,high,percent,currency,triggered,created_at\n"
+       b"lot,btc,0.5,60000,,,,usd,,2026-01-02 03:04:05\n"
+       b"price,eth,,4000,,,,,,\n"
+       b"range,sol,,,100,200,,,1,\n"
+       b"change,btc,,,,,5%,,,\n")
+
+
+@pytest.fixture
+def rates(monkeypatch):
+    """A fresh FX table, so rate() neither refreshes nor returns None."""
+    monkeypatch.setattr(fx, "_rates", {"usd": 1.0, "eur": 0.5})
+    monkeypatch.setattr(fx, "_fetched_at", time.time())
+
+
+def _records(data, filename=""):
+    return [record for _, record in parse_document(data, filename)]
+
+
+def test_validate_record_converts_lots_to_usd(rates):
+    kind, row = validate_record({"kind": "lot", "coin": "BTC", "amount": "2", "price": "30000",
+                                 "created_at": "2026-01-02T03:04:05Z"}, "eur")
+    assert kind == "lot"
+    assert row == ("bitcoin", 2.0, 60000.0, "2026-01-02 03:04:05")
+
+
+def test_validate_record_alerts(rates):
+    assert validate_record({"kind": "price", "coin": "eth", "price": "4000"}, "eur") == \
+        ("alert", ("ethereum", "price", 4000.0, None, None, 0, "eur"))
+    assert validate_record({"kind": "range", "coin": "sol", "low": 100, "high": 200, "triggered": "yes"}, "usd") == \
+        ("alert", ("solana", "range", None, 100.0, 200.0, 1, "usd"))
+    assert validate_record({"kind": "volume", "coin": "btc", "percent": "25%", "currency": "eur"}, "usd") == \
+        ("alert", ("bitcoin", "volume", 25.0, None, None, 0, "usd"))
+
+
+@pytest.mark.parametrize("record, reason", [
+    ({"kind": "price", "coin": "nosuchcoin", "price": 1}, "unknown coin"),
+    ({"kind": "price", "coin": "btc", "price": 1, "currency": "xyz"}, "unsupported currency"),
+    ({"kind": "bet", "coin": "btc"}, "unknown kind"),
+    ({"kind": "price", "coin": "btc"}, "missing price"),
+    ({"kind": "price", "coin": "btc", "price": "abc"}, "not a number"),
+    ({"kind": "price", "coin": "btc", "price": "nan"}, "not a finite number"),
+    ({"kind": "range", "coin": "btc", "low": "1", "high": "inf"}, "not a finite number"),
+    ({"kind": "range", "coin": "btc", "low": 200, "high": 100}, "low must be less than high"),
+    ({"kind": "change", "coin": "btc", "percent": "-5"}, "percent must be positive"),
+    ({"kind": "lot", "coin": "btc", "amount": 0, "price": 1}, "amount is zero"),
+    ({"kind": "lot", "coin": "btc", "amount": 1, "price": 1, "created_at": "yesterday"}, "not a date"),
+    ("price,btc", "not an object"),
+])
+def test_validate_record_rejects(rates, record, reason):
+    with pytest.raises(ValueError, match=reason):
+        validate_record(record, "usd")
+
+
+def test_parse_document_formats():
+    records = _records(CSV, "alerts.csv")
+    assert [r["kind"] for r in records] == ["lot", "price", "range", "change"]
+    assert records[0]["amount"] == "0.5"
+    assert _records(gzip.compress(CSV), "alerts.csv.gz") == records
+    assert _records(b"\xef\xbb\xbf" + CSV) == records  # BOM, no filename: sniffed as CSV
+
+    document = {"lots": [{"coin": "btc", "amount": 1, "price": 2}],
+                "alerts": [{"kind": "price", "coin": "eth", "price": 3}]}
+    parsed = _records(gzip.compress(json.dumps(document).encode()), "backup.json.gz")
+    assert parsed == [{"kind": "lot", "coin": "btc", "amount": 1, "price": 2}, document["alerts"][0]]
+    assert _records(json.dumps(document["alerts"]).encode()) == document["alerts"]
+    with pytest.raises(BulkImportError):
+        _records(b'"just a string"', "x.json")
+
+
+def test_import_is_all_or_nothing(db, rates):
+    bad = CSV + b"range,btc,,,300,100,,,,\n"
+    with pytest.raises(BulkImportError) as excinfo:
+        import_document("1", bad, "alerts.csv")
+    assert excinfo.value.errors == ["row 6: low must be less than high"]
+    assert list(iter_user_lots("1")) == [] and list(iter_user_alerts("1")) == []
+
+    assert import_document("1", CSV, "alerts.csv") == (1, 3)
+
+
+def test_import_user_rows_rolls_back_on_database_error(db):
+    lots = [("bitcoin", 1.0, 60000.0, "2026-01-02 03:04:05")]
+    broken_alerts = [("ethereum", "price", 4000.0, None, None, 0)]  # One column short
+    with pytest.raises(sqlite3.ProgrammingError):
+        import_user_rows("1", lots, broken_alerts)
+    assert list(iter_user_lots("1")) == []  # The lots went in first and were rolled back
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_export_round_trip(db, rates, compress):
+    import_document("1", CSV, "alerts.csv")
+    for export, name in ((export_alerts, "alerts.csv"), (export_portfolio, "portfolio.csv")):
+        spool, _ = export("1", compress)
+        import_document("2", spool.read(), name + (".gz" if compress else ""))
+    assert list(iter_user_alerts("2")) == list(iter_user_alerts("1"))
+    assert list(iter_user_lots("2")) == list(iter_user_lots("1"))
+
+    spool, count = export_alerts("1", compress)
+    assert count == 3
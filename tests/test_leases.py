@@ -0,0 +1,56 @@
+# tests/test_leases.py
+
+from database.database import connect, save_alert
+from database.leases import init_leases, rebalance, release_all
+from services.alert_engine import mark_triggered
+
+TTL = 30
+
+
+def _leases():
+    conn = connect()
+    rows = dict(conn.execute("SELECT partition, owner FROM partition_leases").fetchall())
+    conn.close()
+    return rows
+
+
+def test_single_worker_takes_every_partition(db):
+    init_leases(8)
+    assert rebalance("a", TTL) == list(range(8))
+
+
+def test_workers_split_fairly_and_never_overlap(db):
+    init_leases(8)
+    rebalance("a", TTL)
+    rebalance("b", TTL)          # a still holds everything, b gets nothing free yet
+    a = rebalance("a", TTL)      # a sees two live workers and gives back its extras
+    b = rebalance("b", TTL)
+    assert len(a) == len(b) == 4
+    assert not set(a) & set(b)
+    assert sorted(a + b) == list(range(8))
+
+
+def test_expired_leases_move_to_live_workers(db, monkeypatch):
+    import database.leases as leases
+    init_leases(4)
+    rebalance("a", TTL)
+    now = leases.time.time()
+    monkeypatch.setattr(leases.time, "time", lambda: now + 2 * TTL)  # a stopped renewing
+    assert rebalance("b", TTL) == list(range(4))
+    assert set(_leases().values()) == {"b"}
+
+
+def test_release_all_frees_partitions(db):
+    init_leases(4)
+    rebalance("a", TTL)
+    release_all("a")
+    assert set(_leases().values()) == {None}
+
+
+def test_mark_triggered_claims_each_alert_once(db):
+    save_alert("1", "bitcoin", "price", price=10)
+    fired = [("1", {"id": 1})]
+    conn = connect()
+    assert mark_triggered(conn, fired) == fired
+    assert mark_triggered(conn, fired) == []   # A second worker racing on the same alert
+    conn.close()
@@ -0,0 +1,46 @@
+# tests/test_legacy_alerts.py
+
+import json
+
+from database import legacy_alerts
+from database.database import load_alerts
+
+
+def _write(tmp_path, document, raw=None):
+    path = tmp_path / "alerts.json"
+    path.write_text(raw if raw is not None else json.dumps(document, indent=2))
+    return str(path)
+
+
+def test_migrates_and_reruns_idempotently(db, tmp_path):
+    path = _write(tmp_path, {
+        "1": [{"price": 100.0, "triggered": False}, {"price": 100.0}, {"low": 1, "high": 2, "triggered": True}],
+        "2": [{"bogus": True}],
+    })
+    first = legacy_alerts.migrate_legacy_alerts(path, chunk_size=2)
+    assert (first["inserted"], first["duplicates"], first["invalid"]) == (3, 0, 1)
+    second = legacy_alerts.migrate_legacy_alerts(path, chunk_size=2)
+    assert (second["inserted"], second["duplicates"]) == (0, 3)
+
+    alerts = load_alerts(include_triggered=True)["1"]
+    assert [a.get("price") for a in alerts] == [100.0, 100.0, None]
+    assert all(a["coin_id"] == "bitcoin" for a in alerts)
+    assert alerts[2]["triggered"]
+
+
+def test_non_finite_values_are_invalid(db, tmp_path):
+    path = _write(tmp_path, None, raw='{"1": [{"price": NaN}, {"low": -Infinity, "high": 1}, {"price": 5}]}')
+    for expected_inserted in (1, 0):
+        stats = legacy_alerts.migrate_legacy_alerts(path)
+        assert stats["invalid"] == 2
+        assert stats["inserted"] == expected_inserted
+    assert [a["price"] for a in load_alerts()["1"]] == [5.0]
+
+
+def test_reader_streams_across_chunk_boundaries(tmp_path, monkeypatch):
+    monkeypatch.setattr(legacy_alerts, "READ_SIZE", 7)
+    path = _write(tmp_path, {"a": [{"price": 1.5}] * 3, "b": [], "c": "not a list", "d": [{"low": 1, "high": 2}]})
+    with open(path) as f:
+        assert list(legacy_alerts.iter_legacy_alerts(f)) == [
+            ("a", {"price": 1.5}), ("a", {"price": 1.5}), ("a", {"price": 1.5}), ("d", {"low": 1, "high": 2}),
+        ]
@@ -0,0 +1,72 @@
+# tests/test_performance.py
+
+from datetime import date, timedelta
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from services.performance import compute_performance, money_weighted_return
+
+TODAY = date(2026, 10, 19)
+
+
+def _bars(coin_id, closes):
+    """Daily bars ending TODAY for `closes` (oldest first)."""
+    start = TODAY - timedelta(days=len(closes) - 1)
+    return [(coin_id, (start + timedelta(days=i)).isoformat(), close) for i, close in enumerate(closes)]
+
+
+def _flat_then(closes, days=400):
+    return [closes[0]] * (days - len(closes)) + list(closes)
+
+
+def test_single_coin_contribution_equals_twr():
+    # 100% BTC that doubles over the last 30 days
+    growth = [100 * 2 ** (i / 30) for i in range(31)]
+    results = compute_performance([(1, "bitcoin", 1.0, None)], _bars("bitcoin", _flat_then(growth)), TODAY)
+    for label in ("7d", "30d", "1y"):
+        stats = results[label]
+        assert stats["contribution"]["bitcoin"] == pytest.approx(stats["twr"], rel=1e-9)
+    assert results["30d"]["twr"] == pytest.approx(1.0)
+
+
+def test_contributions_sum_to_twr_with_flows():
+    btc = [100 * (1.01 ** i) for i in range(400)]
+    eth = [50 * (1 + 0.2 * ((i % 7) - 3) / 3) for i in range(400)]
+    lots = [
+        (1, "bitcoin", 1.0, None),
+        (2, "ethereum", 4.0, (TODAY - timedelta(days=20)).isoformat() + " 12:00:00"),
+        (3, "ethereum", -2.0, (TODAY - timedelta(days=5)).isoformat() + " 08:00:00"),
+    ]
+    results = compute_performance(lots, _bars("bitcoin", btc) + _bars("ethereum", eth), TODAY)
+    for label in ("7d", "30d", "1y"):
+        stats = results[label]
+        assert sum(stats["contribution"].values()) == pytest.approx(stats["twr"], rel=1e-9)
+
+
+def test_flows_are_not_returns():
+    # Flat prices: buying more must not show up as performance
+    lots = [(1, "bitcoin", 1.0, None), (2, "bitcoin", 3.0, (TODAY - timedelta(days=3)).isoformat() + " 00:00:00")]
+    stats = compute_performance(lots, _bars("bitcoin", [100.0] * 400), TODAY)["7d"]
+    assert stats["twr"] == pytest.approx(0.0)
+    assert stats["net_flows"] == pytest.approx(300.0)
+    assert stats["end_value"] == pytest.approx(400.0)
+    assert stats["max_drawdown"] == pytest.approx(0.0)
+
+
+def test_drawdown():
+    closes = _flat_then([100, 120, 60, 90])
+    stats = compute_performance([(1, "bitcoin", 1.0, None)], _bars("bitcoin", closes), TODAY)["7d"]
+    assert stats["max_drawdown"] == pytest.approx(-0.5)
+    assert stats["drawdown"] == pytest.approx(-0.25)
+
+
+def test_lots_added_today_have_no_history_yet():
+    lots = [(1, "bitcoin", 1.0, TODAY.isoformat() + " 09:00:00")]
+    assert compute_performance(lots, _bars("bitcoin", [100.0] * 400), TODAY)["7d"] is None
+
+
+def test_money_weighted_return():
+    assert money_weighted_return([-100, 110], [0, 10]) == pytest.approx(0.10)
+    assert money_weighted_return([-100, -100], [0, 10]) is None
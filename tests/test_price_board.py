@@ -0,0 +1,91 @@
+# tests/test_price_board.py
+
+import os
+
+import pytest
+
+from utils.price_board import SEQ, PriceBoard, open_board
+
+
+def _board(slots=4):
+    buf = bytearray(PriceBoard.size(slots))
+    PriceBoard.format(buf, slots)
+    return PriceBoard(buf)
+
+
+def test_publish_then_read():
+    board = _board()
+    assert board.read("bitcoin") is None
+    assert board.publish("bitcoin", 65000.0, volume=1.5e9, ts=100.0)
+    quote = board.read("bitcoin")
+    assert (quote.index, quote.price, quote.volume, quote.ts) == (0, 65000.0, 1.5e9, 100.0)
+    assert quote.seq % 2 == 0
+
+    board.publish("bitcoin", 66000.0, ts=101.0)  # Same slot, newer quote, no volume
+    quote = board.read("bitcoin")
+    assert (quote.index, quote.price, quote.volume, quote.ts) == (0, 66000.0, None, 101.0)
+
+
+def test_snapshot_and_second_view():
+    board = _board()
+    board.publish("bitcoin", 1.0, ts=1.0)
+    board.publish("ethereum", 2.0, ts=2.0)
+    assert {coin: quote.price for coin, quote in board.snapshot().items()} == {"bitcoin": 1.0, "ethereum": 2.0}
+
+    other = PriceBoard(board.buf)  # Another view over the same memory finds coins it never wrote
+    assert other.read("ethereum").price == 2.0
+    other.publish("ethereum", 3.0)
+    assert board.read("ethereum").price == 3.0
+
+
+def test_full_board_refuses_new_coins():
+    board = _board(slots=2)
+    assert board.publish("a", 1.0) and board.publish("b", 2.0)
+    assert board.publish("c", 3.0) is False
+    assert board.read("c") is None
+    assert board.publish("a", 4.0)  # Existing coins still update
+
+
+def test_clear_empties_the_board_for_every_view():
+    board = _board()
+    other = PriceBoard(board.buf)
+    board.publish("bitcoin", 1.0)
+    assert other.read("bitcoin") is not None  # other caches the slot
+    board.clear()
+    assert board.snapshot() == {}
+    assert other.read("bitcoin") is None
+    other.publish("solana", 5.0)
+    assert board.read("solana").index == 0
+
+
+def test_reader_skips_a_slot_left_mid_write(monkeypatch):
+    import utils.price_board as price_board
+    monkeypatch.setattr(price_board, "READ_RETRIES", 3)
+    monkeypatch.setattr(price_board, "SPIN_RETRIES", 1)
+    board = _board()
+    board.publish("bitcoin", 1.0)
+    offset = board._offset(0)
+    SEQ.pack_into(board.buf, offset, SEQ.unpack_from(board.buf, offset)[0] + 1)  # A writer died here
+    assert board.read("bitcoin") is None
+    assert board.publish("bitcoin", 2.0)  # The next publish repairs the slot
+    assert board.read("bitcoin").price == 2.0
+
+
+def test_shared_memory_board_is_seen_by_a_second_attach():
+    name = f"pricepilot_test_board_{os.getpid()}"
+    try:
+        board, shm, created = open_board(name, slots=4)
+    except OSError as e:
+        pytest.skip(f"shared memory unavailable: {e}")
+    try:
+        assert created
+        other, other_shm, other_created = open_board(name, slots=4)
+        assert not other_created
+        board.publish("bitcoin", 42.0)
+        assert other.read("bitcoin").price == 42.0
+        del other
+        other_shm.close()
+    finally:
+        del board
+        shm.close()
+        shm.unlink()
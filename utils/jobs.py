@@ -0,0 +1,113 @@
+# utils/jobs.py
+#
+# Scheduled jobs that never overlap and never fail silently. Every job is added with
+# max_instances=1 and coalesce=True, so a run still going when the next fire comes
+# around is skipped and a backlog of missed fires collapses into one run. Each run
+# records its start, duration and items processed (a job's int return value) plus
+# how late it started; runs longer than their interval log a warning.
+
+import asyncio
+import functools
+import logging
+import threading
+import time
+from utils.loop_watchdog import task_label
+from utils.metrics import (JOB_DRIFT, JOB_DURATION, JOB_ITEMS_TOTAL, JOB_LAST_RUN, JOB_OVERRUNS_TOTAL,
+                           JOB_SKIPPED_TOTAL)
+
+_runs = {}          # job name -> last run {"started", "duration", "items", "drift", "overruns", "skipped"}
+_runs_lock = threading.Lock()
+
+
+def _run_record(name):
+    return _runs.setdefault(name, {"started": None, "duration": None, "items": None, "drift": None,
+                                   "overruns": 0, "skipped": 0})
+
+
+def _finish(name, interval, started, duration, result):
+    items = result if isinstance(result, int) and not isinstance(result, bool) else None
+    JOB_DURATION.observe(duration, job=name)
+    if items is not None:
+        JOB_ITEMS_TOTAL.inc(items, job=name)
+    with _runs_lock:
+        run = _run_record(name)
+        run.update(started=started, duration=duration, items=items)
+        if duration > interval:
+            run["overruns"] += 1
+    if duration > interval:
+        JOB_OVERRUNS_TOTAL.inc(job=name)
+        logging.warning(f"Job {name} ran {duration:.1f}s, longer than its {interval:.0f}s interval")
+
+
+def tracked(name, func, interval):
+    """Wrap a job (sync or async) so every run is timed and checked against `interval`."""
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def run_async(*args, **kwargs):
+            started = time.time()
+            JOB_LAST_RUN.set(started, job=name)
+            clock = time.perf_counter()
+            result = None
+            try:
+                with task_label(f"job:{name}"):
+                    result = await func(*args, **kwargs)
+                return result
+            finally:
+                _finish(name, interval, started, time.perf_counter() - clock, result)
+        return run_async
+
+    @functools.wraps(func)
+    def run_sync(*args, **kwargs):
+        started = time.time()
+        JOB_LAST_RUN.set(started, job=name)
+        clock = time.perf_counter()
+        result = None
+        try:
+            result = func(*args, **kwargs)
+            return result
+        finally:
+            _finish(name, interval, started, time.perf_counter() - clock, result)
+    return run_sync
+
+
+def _on_job_event(event):
+    from apscheduler.events import EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED
+
+    if event.code in (EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED):
+        reason = "overlap" if event.code == EVENT_JOB_MAX_INSTANCES else "missed"
+        # Overlaps arrive as submission events, which carry a list of fire times
+        fired = getattr(event, "scheduled_run_time", None) or event.scheduled_run_times[-1]
+        JOB_SKIPPED_TOTAL.inc(job=event.job_id, reason=reason)
+        with _runs_lock:
+            _run_record(event.job_id)["skipped"] += 1
+        logging.warning(f"Job {event.job_id} fire at {fired} skipped ({reason})")
+        return
+
+    # Executed or raised: the wrapper has already recorded when this run started
+    with _runs_lock:
+        run = _runs.get(event.job_id)
+        if run is None or run["started"] is None:
+            return
+        drift = max(0.0, run["started"] - event.scheduled_run_time.timestamp())
+        run["drift"] = drift
+    JOB_DRIFT.observe(drift, job=event.job_id)
+
+
+def watch_jobs(scheduler):
+    """Feed the scheduler's skip, miss and completion events into job metrics."""
+    from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED
+    scheduler.add_listener(_on_job_event,
+                           EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MAX_INSTANCES | EVENT_JOB_MISSED)
+
+
+def add_interval_job(scheduler, func, seconds, args=(), name=None):
+    """Schedule `func` every `seconds` without overlap; missed fires within one interval run once, late."""
+    name = name or func.__name__
+    return scheduler.add_job(tracked(name, func, seconds), "interval", seconds=seconds, args=list(args), id=name,
+                             name=name, max_instances=1, coalesce=True, misfire_grace_time=int(seconds))
+
+
+def job_stats():
+    """{job name: last run record} for /stats."""
+    with _runs_lock:
+        return {name: dict(run) for name, run in _runs.items()}
@@ -0,0 +1,76 @@
+# utils/lanes.py
+#
+# Per-chat serial lanes for concurrent update processing. PTB runs up to
+# CONCURRENT_UPDATES handlers at once; each chat still sees its commands handled in
+# arrival order because they queue on the chat's lock (asyncio.Lock wakes waiters
+# FIFO). A per-user in-flight cap keeps one user from occupying every slot.
+
+import asyncio
+import functools
+import time
+from config import USER_INFLIGHT_CAP
+from utils.metrics import LANE_WAIT, LANES_ACTIVE, USER_CAP_REJECTIONS
+from utils.tracing import add_span
+
+
+class _Lane:
+    __slots__ = ("lock", "users", "max_wait", "handled")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0        # updates waiting or running in this lane
+        self.max_wait = 0.0
+        self.handled = 0
+
+
+_lanes = {}       # chat_id -> _Lane (dropped when idle)
+_inflight = {}    # user_id -> updates waiting or running
+
+
+def laned(callback):
+    """Wrap a PTB handler callback so it runs in its chat's lane, subject to the per-user cap."""
+    @functools.wraps(callback)
+    async def wrapper(update, context):
+        chat = update.effective_chat
+        user = update.effective_user
+        if chat is None:
+            return await callback(update, context)
+
+        user_id = user.id if user else chat.id
+        if _inflight.get(user_id, 0) >= USER_INFLIGHT_CAP:
+            USER_CAP_REJECTIONS.inc()
+            if update.effective_message:
+                await update.effective_message.reply_text("⏳ Still working on your previous commands, please wait.")
+            return None
+
+        lane = _lanes.get(chat.id)
+        if lane is None:
+            lane = _lanes[chat.id] = _Lane()
+            LANES_ACTIVE.set(len(_lanes))
+        lane.users += 1
+        _inflight[user_id] = _inflight.get(user_id, 0) + 1
+        queued = time.perf_counter()
+        try:
+            async with lane.lock:
+                wait = time.perf_counter() - queued
+                LANE_WAIT.observe(wait, chat_type=chat.type)
+                add_span("lane_wait", wait)
+                lane.max_wait = max(lane.max_wait, wait)
+                lane.handled += 1
+                return await callback(update, context)
+        finally:
+            lane.users -= 1
+            if lane.users == 0:
+                _lanes.pop(chat.id, None)
+                LANES_ACTIVE.set(len(_lanes))
+            _inflight[user_id] -= 1
+            if _inflight[user_id] == 0:
+                del _inflight[user_id]
+
+    return wrapper
+
+
+def busiest_lanes(limit=5):
+    """Active lanes with the most queued updates: [(chat_id, queued, max_wait_seconds)]."""
+    lanes = sorted(_lanes.items(), key=lambda item: (item[1].users, item[1].max_wait), reverse=True)
+    return [(chat_id, lane.users, lane.max_wait) for chat_id, lane in lanes[:limit]]
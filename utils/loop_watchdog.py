@@ -0,0 +1,126 @@
+# utils/loop_watchdog.py
+#
+# Two cheap probes on the bot's event loop:
+#   - monitor_loop_lag(): a coroutine that measures how late its own sleeps wake up.
+#   - LoopWatchdog: a loop-side heartbeat plus a watchdog thread. When the heartbeat
+#     stalls for longer than the threshold, the thread grabs the loop thread's stack
+#     while it is still blocked and logs it against the task that was running.
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+import weakref
+from contextlib import contextmanager
+from config import LOOP_BLOCK_MS
+from utils.metrics import LOOP_BLOCK_DURATION, LOOP_BLOCKS_TOTAL, LOOP_LAG, LOOP_LAG_CURRENT
+
+LAG_PROBE_INTERVAL = 0.5
+LAG_WARN_SECONDS = 1.0
+HEARTBEAT_INTERVAL = 0.05
+STACK_LIMIT = 30
+
+_task_labels = weakref.WeakKeyDictionary()  # asyncio.Task -> "command:price" / "job:hourly_check"
+
+
+async def monitor_loop_lag(interval=LAG_PROBE_INTERVAL):
+    """Sleep for `interval` over and over; any extra delay is time the loop spent blocked."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - start - interval)
+        LOOP_LAG.observe(lag)
+        LOOP_LAG_CURRENT.set(lag)
+        if lag > LAG_WARN_SECONDS:
+            logging.warning(f"Event loop blocked for {lag:.2f}s")
+
+
+@contextmanager
+def task_label(label):
+    """Attribute blocking detected inside this block to `label` (restores the previous label)."""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    if task is None:
+        yield
+        return
+    previous = _task_labels.get(task)
+    _task_labels[task] = label
+    try:
+        yield
+    finally:
+        if previous is None:
+            _task_labels.pop(task, None)
+        else:
+            _task_labels[task] = previous
+
+
+def _describe_task(task):
+    if task is None:
+        return "callback"
+    label = _task_labels.get(task)
+    if label:
+        return label
+    coro = task.get_coro()
+    return getattr(coro, "__qualname__", None) or task.get_name()
+
+
+class LoopWatchdog:
+    def __init__(self, loop, threshold_ms=LOOP_BLOCK_MS):
+        self.loop = loop
+        self.threshold = threshold_ms / 1000
+        self._last_beat = time.monotonic()
+        self._loop_thread = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        self.loop.call_soon_threadsafe(self._beat)
+        thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+
+    def _beat(self):
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        if not self._stopped.is_set():
+            self.loop.call_later(HEARTBEAT_INTERVAL, self._beat)
+
+    def _watch(self):
+        reported_beat = None
+        reported_label = None
+        while not self._stopped.wait(self.threshold / 4):
+            beat = self._last_beat
+            stalled = time.monotonic() - beat - HEARTBEAT_INTERVAL
+
+            if reported_beat is not None and beat != reported_beat:
+                # The loop recovered: record how long the block actually lasted
+                duration = beat - reported_beat - HEARTBEAT_INTERVAL
+                LOOP_BLOCK_DURATION.observe(duration)
+                logging.warning(f"Event loop unblocked after {duration * 1000:.0f}ms ({reported_label})")
+                reported_beat = None
+
+            if reported_beat is None and stalled > self.threshold:
+                reported_beat = beat
+                reported_label = self._report(stalled)
+
+    def _report(self, stalled):
+        frame = sys._current_frames().get(self._loop_thread)
+        try:
+            label = _describe_task(asyncio.current_task(self.loop))
+        except RuntimeError:
+            label = "unknown"
+        LOOP_BLOCKS_TOTAL.inc(task=label)
+        stack = "".join(traceback.format_stack(frame, limit=STACK_LIMIT)) if frame else "  <no frame>\n"
+        logging.warning(f"Event loop blocked for {stalled * 1000:.0f}ms+ in {label}; loop thread stack:\n{stack}")
+        return label
+
+
+def start_loop_watchdog(loop=None, threshold_ms=LOOP_BLOCK_MS):
+    return LoopWatchdog(loop or asyncio.get_running_loop(), threshold_ms).start()
@@ -0,0 +1,173 @@
+# utils/metrics.py
+#
+# Minimal Prometheus text-format metrics. Thread-safe; the bot loop, the scheduler's
+# worker threads and the HTTP server threads all record into the same registry.
+
+import bisect
+import math
+import threading
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry = []
+_lock = threading.Lock()
+
+
+def _label_key(labelnames, labels):
+    if set(labels) != set(labelnames):
+        raise ValueError(f"Expected labels {labelnames}, got {tuple(labels)}")
+    return tuple(str(labels[name]) for name in labelnames)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames, key, extra=()):
+    pairs = list(zip(labelnames, key)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        with _lock:
+            _registry.append(self)
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(_label_key(self.labelnames, labels), 0)
+
+    def render(self):
+        lines = self._header()
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with _lock:
+            self._values[key] = value
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with _lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels):
+        state = self._values.get(_label_key(self.labelnames, labels))
+        return state[2] if state else 0
+
+    def render(self):
+        lines = self._header()
+        for key, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+def render_metrics():
+    """All registered metrics in Prometheus text exposition format (version 0.0.4)."""
+    with _lock:
+        metrics = list(_registry)
+        rendered = [line for metric in metrics for line in metric.render()]
+    return "\n".join(rendered) + "\n"
+
+
+# -- Metrics shared across the bot -------------------------------------------
+
+PROVIDER_LATENCY = Histogram("provider_request_duration_seconds", "Upstream API request latency.", ["provider"])
+PROVIDER_ERRORS = Counter("provider_request_errors_total", "Failed upstream API requests.", ["provider", "reason"])
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups by outcome.", ["cache", "result"])
+ALERT_EVAL_DURATION = Histogram("alert_evaluation_duration_seconds", "Duration of one alert evaluation pass.")
+ALERTS_SCANNED = Gauge("alerts_scanned", "Alerts evaluated in the most recent pass.")
+ALERTS_SCANNED_TOTAL = Counter("alerts_scanned_total", "Alerts evaluated across all passes.")
+ALERTS_TRIGGERED_TOTAL = Counter("alerts_triggered_total", "Alerts that fired.")
+WEBHOOK_UPDATES_TOTAL = Counter("webhook_updates_total", "Webhook deliveries by admission result.", ["result"])
+UPDATE_QUEUE_DEPTH = Gauge("update_queue_depth", "Updates admitted and waiting for the application.")
+LANE_WAIT = Histogram("lane_wait_seconds", "Time an update waited for its chat's lane.", ["chat_type"],
+                      buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0))
+LANES_ACTIVE = Gauge("lanes_active", "Chats with updates waiting or running.")
+USER_CAP_REJECTIONS = Counter("user_inflight_rejections_total", "Updates turned away by the per-user in-flight cap.")
+SEND_QUEUE_DEPTH = Gauge("send_queue_depth", "Outgoing notifications waiting to be sent.")
+TELEGRAM_REQUESTS = Counter("telegram_requests_total", "Bot API calls by method and HTTP status.", ["method", "status"])
+TELEGRAM_LATENCY = Histogram("telegram_request_duration_seconds", "Bot API call latency.", ["method"])
+TELEGRAM_RATE_LIMITED = Counter("telegram_rate_limited_total", "Bot API calls rejected with HTTP 429.", ["method"])
+SQLITE_LATENCY = Histogram("sqlite_query_duration_seconds", "SQLite statement execution time.", ["operation"],
+                           buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0))
+LOOP_LAG = Histogram("event_loop_lag_seconds", "Event-loop scheduling lag.",
+                     buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0))
+COMMAND_LATENCY = Histogram("command_duration_seconds", "End-to-end handling time per bot command.", ["command"])
+LOOP_LAG_CURRENT = Gauge("event_loop_lag_current_seconds", "Most recent event-loop lag sample.")
+LOOP_BLOCKS_TOTAL = Counter("event_loop_blocks_total", "Times the loop was held past the blocking threshold.", ["task"])
+LOOP_BLOCK_DURATION = Histogram("event_loop_block_duration_seconds", "Duration of detected event-loop blocks.",
+                                buckets=(0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0))
+POLL_REQUESTS_TOTAL = Counter("poll_requests_total", "Upstream requests made by the adaptive alert poller.")
+POLL_BASELINE_REQUESTS_TOTAL = Counter("poll_fixed_baseline_requests_total",
+                                       "Requests fixed-interval alert polling would have made over the same time.")
+POLL_DEFERRED_TOTAL = Counter("poll_deferred_total", "Due coin polls postponed because the request budget was spent.")
+POLL_INTERVAL_SECONDS = Histogram("poll_interval_seconds", "Poll intervals chosen by the adaptive alert poller.",
+                                  buckets=(5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1200.0, 1800.0))
+JOB_DURATION = Histogram("job_duration_seconds", "Scheduled job run time.", ["job"],
+                         buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 300.0, 600.0, 1800.0))
+JOB_DRIFT = Histogram("job_schedule_drift_seconds", "How late a scheduled job started after its fire time.", ["job"],
+                      buckets=(0.01, 0.1, 0.5, 1.0, 5.0, 30.0, 60.0, 300.0))
+JOB_ITEMS_TOTAL = Counter("job_items_processed_total", "Items (alerts, coins, recipients...) processed by jobs.", ["job"])
+JOB_OVERRUNS_TOTAL = Counter("job_overruns_total", "Job runs that took longer than the job's interval.", ["job"])
+JOB_SKIPPED_TOTAL = Counter("job_skipped_total", "Job fires not run: overlapping a running instance or missed.",
+                            ["job", "reason"])
+JOB_LAST_RUN = Gauge("job_last_run_timestamp_seconds", "Unix time the job last started.", ["job"])
+STREAM_CONNECTED = Gauge("price_stream_connected", "1 while the exchange WebSocket price stream is connected.")
+STREAM_MESSAGES_TOTAL = Counter("price_stream_messages_total", "Streamed ticker messages by outcome.", ["result"])
+STREAM_GAPS_TOTAL = Counter("price_stream_gaps_total", "Silences in a symbol's ticker longer than the gap threshold.")
+STREAM_RECONNECTS_TOTAL = Counter("price_stream_reconnects_total", "Price stream reconnects, by cause.", ["cause"])
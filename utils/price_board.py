@@ -0,0 +1,228 @@
+# utils/price_board.py
+#
+# Latest price per coin in a multiprocessing.shared_memory block, so the bot, the
+# dashboard thread, the price feed and alert workers all see one board. Fixed layout:
+#
+#   header  magic(4s) capacity(u32) count(u32) reserved(u32)
+#   slot    seq(u64) index(u32) coin_id(44s) price(f64) volume(f64) ts(f64)
+#
+# Writers are serialised (thread lock + flock on a lock file) and bump a slot's seq to
+# odd before writing and back to even after. Readers take no lock: they read seq, the
+# fields, then seq again, and retry if it was odd or changed (a seqlock).
+
+import contextlib
+import fcntl
+import logging
+import math
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from multiprocessing import resource_tracker, shared_memory
+from config import PRICE_BOARD_NAME, PRICE_BOARD_SLOTS
+
+MAGIC = b"PPB1"
+HEADER = struct.Struct("<4sIII")
+SEQ = struct.Struct("<Q")
+BODY = struct.Struct("<I44sddd")
+SLOT_SIZE = SEQ.size + BODY.size
+NAME_BYTES = 44
+SPIN_RETRIES = 50
+READ_RETRIES = 1000
+
+Quote = namedtuple("Quote", "index price volume ts seq")
+
+
+class PriceBoard:
+    def __init__(self, buf, lock_path=None):
+        self.buf = buf
+        magic, self.capacity, _, _ = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError("not a price board")
+        self._slots = {}   # coin_id -> slot, this process's cache of the name table
+        self._thread_lock = threading.Lock()
+        self._lock_file = open(lock_path, "a") if lock_path else None
+
+    @staticmethod
+    def size(slots):
+        return HEADER.size + slots * SLOT_SIZE
+
+    @staticmethod
+    def format(buf, slots):
+        buf[:PriceBoard.size(slots)] = bytes(PriceBoard.size(slots))
+        HEADER.pack_into(buf, 0, MAGIC, slots, 0, 0)
+
+    def _offset(self, slot):
+        return HEADER.size + slot * SLOT_SIZE
+
+    def _count(self):
+        return HEADER.unpack_from(self.buf, 0)[2]
+
+    # --- readers (lock-free) -------------------------------------------------
+
+    def _read_slot(self, slot):
+        """(name, Quote) at `slot`, or None if a writer kept it busy for every retry."""
+        offset = self._offset(slot)
+        for attempt in range(READ_RETRIES):
+            if attempt >= SPIN_RETRIES:
+                time.sleep(0)  # The writer was preempted mid-write; let it finish
+            before = SEQ.unpack_from(self.buf, offset)[0]
+            if before & 1:
+                continue
+            index, name, price, volume, ts = BODY.unpack_from(self.buf, offset + SEQ.size)
+            if SEQ.unpack_from(self.buf, offset)[0] == before:
+                return name.rstrip(b"\0").decode(), Quote(index, price, None if math.isnan(volume) else volume, ts, before)
+        return None  # A writer died mid-write; the next publish repairs the slot
+
+    def _scan(self):
+        slots = {}
+        for slot in range(min(self._count(), self.capacity)):
+            entry = self._read_slot(slot)
+            if entry and entry[0]:
+                slots[entry[0]] = slot
+        self._slots = slots
+
+    def read(self, coin_id):
+        """Latest Quote for `coin_id`, or None if no process has published one."""
+        for attempt in range(2):
+            slot = self._slots.get(coin_id)
+            if slot is not None:
+                entry = self._read_slot(slot)
+                if entry and entry[0] == coin_id:
+                    return entry[1]
+            if attempt == 0:
+                self._scan()  # New coin, or the board was cleared since we cached its slot
+        return None
+
+    def snapshot(self):
+        """{coin_id: Quote} for every coin on the board."""
+        quotes = {}
+        for slot in range(min(self._count(), self.capacity)):
+            entry = self._read_slot(slot)
+            if entry and entry[0]:
+                quotes[entry[0]] = entry[1]
+        return quotes
+
+    # --- writers (serialised) ------------------------------------------------
+
+    @contextlib.contextmanager
+    def _locked(self):
+        with self._thread_lock:
+            if self._lock_file is None:
+                yield
+                return
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _write_slot(self, slot, name, price, volume, ts):
+        offset = self._offset(slot)
+        seq = (SEQ.unpack_from(self.buf, offset)[0] + 1) | 1  # Odd; already odd if a writer died here
+        SEQ.pack_into(self.buf, offset, seq)
+        BODY.pack_into(self.buf, offset + SEQ.size, slot, name, price, volume, ts)
+        SEQ.pack_into(self.buf, offset, seq + 1)
+
+    def _slot_name(self, slot):
+        # Only called with the write lock held, when no other writer can change it
+        return BODY.unpack_from(self.buf, self._offset(slot) + SEQ.size)[1].rstrip(b"\0").decode()
+
+    def publish(self, coin_id, price, volume=None, ts=None):
+        """Write the latest quote for `coin_id`; False if the board is full."""
+        name = coin_id.encode("ascii", "ignore")[:NAME_BYTES]
+        coin_id = name.decode()
+        volume = math.nan if volume is None else float(volume)
+        ts = time.time() if ts is None else ts
+        with self._locked():
+            slot = self._slots.get(coin_id)
+            if slot is None or slot >= self._count() or self._slot_name(slot) != coin_id:
+                self._scan()
+                slot = self._slots.get(coin_id)
+            if slot is None:
+                count = self._count()
+                if count >= self.capacity:
+                    logging.warning(f"Price board is full ({self.capacity} coins); not publishing {coin_id}")
+                    return False
+                slot = count
+                self._write_slot(slot, name, price, volume, ts)
+                HEADER.pack_into(self.buf, 0, MAGIC, self.capacity, count + 1, 0)
+                self._slots[coin_id] = slot
+            else:
+                self._write_slot(slot, name, price, volume, ts)
+        return True
+
+    def clear(self):
+        with self._locked():
+            for slot in range(min(self._count(), self.capacity)):
+                self._write_slot(slot, b"", 0.0, math.nan, 0.0)
+            HEADER.pack_into(self.buf, 0, MAGIC, self.capacity, 0, 0)
+            self._slots = {}
+
+
+def _lock_path(name):
+    return os.path.join(tempfile.gettempdir(), f"{name}.lock")
+
+
+def _attach(name):
+    # Before 3.13 attaching also registers the block with the resource tracker, which
+    # unlinks it when the attaching process exits; only the creator should do that
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args: None
+    try:
+        return shared_memory.SharedMemory(name)
+    finally:
+        resource_tracker.register = register
+
+
+def open_board(name=PRICE_BOARD_NAME, slots=PRICE_BOARD_SLOTS):
+    """Attach to the host's board, creating it if this is the first process. Returns (board, shm, created)."""
+    try:
+        shm = shared_memory.SharedMemory(name, create=True, size=PriceBoard.size(slots))
+        PriceBoard.format(shm.buf, slots)
+        created = True
+    except FileExistsError:
+        shm = _attach(name)
+        created = False
+        deadline = time.monotonic() + 1.0
+        while bytes(shm.buf[:4]) != MAGIC and time.monotonic() < deadline:
+            time.sleep(0.01)  # The creator hasn't written the header yet
+    return PriceBoard(shm.buf, _lock_path(name)), shm, created
+
+
+_board = None
+_board_lock = threading.Lock()
+
+
+def price_board():
+    """This process's view of the shared board (a private one if shared memory is unavailable)."""
+    global _board
+    if _board is None:
+        with _board_lock:
+            if _board is None:
+                try:
+                    board, shm, created = open_board()
+                    if created:
+                        import atexit
+                        atexit.register(shm.unlink)
+                    board._shm = shm  # Keep the mapping alive for the life of the process
+                except (OSError, ValueError) as e:
+                    logging.error(f"Shared price board unavailable, using a private one: {e}")
+                    buf = bytearray(PriceBoard.size(PRICE_BOARD_SLOTS))
+                    PriceBoard.format(buf, PRICE_BOARD_SLOTS)
+                    board = PriceBoard(buf)
+                _board = board
+    return _board
+
+
+def last_price(coin_id):
+    """(price, "YYYY-MM-DD HH:MM:SS" local time) of the latest published quote, or None."""
+    quote = price_board().read(coin_id)
+    if quote is None:
+        return None
+    return quote.price, time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(quote.ts))
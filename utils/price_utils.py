@@ -5,7 +5,22 @@ from datetime import datetime, timedelta
 import time
 import logging
 
-# Global cached prices dictionary
-last_known_prices = {}  # {"bitcoin": (price, timestamp)}
 price_history = {coin_id: [] for coin_id in COIN_MAP.values()}
-MAX_HISTORY_ITEMS = 20
\ No newline at end of file
+MAX_HISTORY_ITEMS = 20
+
+
+def record_price(coin_id, price, volume=None):
+    """Publish a fresh price to the shared price board and history, and announce it to live viewers."""
+    from utils.price_board import price_board
+    now = time.time()
+    timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now))
+    price_board().publish(coin_id, price, volume, now)
+
+    if coin_id not in price_history:
+        price_history[coin_id] = []
+    price_history[coin_id].append((price, timestamp))
+    if len(price_history[coin_id]) > MAX_HISTORY_ITEMS:
+        price_history[coin_id].pop(0)
+
+    from services.event_bus import event_bus
+    event_bus.publish("price", {"coin_id": coin_id, "price": price, "timestamp": timestamp})
@@ -0,0 +1,88 @@
+# utils/profiler.py
+#
+# In-process sampling profiler. A background thread snapshots every thread's stack
+# with sys._current_frames() at a fixed interval and folds them into the
+# "collapsed stack" format read by flamegraph.pl, speedscope and inferno.
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+DEFAULT_INTERVAL = 0.01   # 100 Hz
+MAX_PROFILE_SECONDS = 120
+MAX_STACK_DEPTH = 128
+
+_profile_lock = threading.Lock()
+
+
+class ProfilerBusy(RuntimeError):
+    """Raised when a profile is requested while another one is still running."""
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    filename = code.co_filename
+    try:
+        relative = os.path.relpath(filename)
+        if not relative.startswith(".."):
+            filename = relative  # Keep project paths short; library paths stay absolute
+    except ValueError:
+        pass  # Different drive on Windows
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def _collapse(frame):
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels)
+
+
+def is_running():
+    return _profile_lock.locked()
+
+
+def profile(seconds, interval=DEFAULT_INTERVAL):
+    """Sample every other thread for `seconds` (blocking). Only one profile runs at a time.
+
+    Returns a dict with the collapsed stacks ("collapsed"), the number of samples taken
+    and the sampler's own CPU cost as a percentage of one core ("overhead_pct").
+    """
+    seconds = max(1.0, min(float(seconds), MAX_PROFILE_SECONDS))
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already running")
+    try:
+        me = threading.get_ident()
+        stacks = Counter()
+        samples = 0
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        deadline = wall_start + seconds
+
+        while time.perf_counter() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                thread_name = names.get(ident, f"thread-{ident}")
+                stacks[f"{thread_name};{_collapse(frame)}"] += 1
+            samples += 1
+            time.sleep(interval)
+
+        wall = time.perf_counter() - wall_start
+        cpu = time.thread_time() - cpu_start
+    finally:
+        _profile_lock.release()
+
+    collapsed = "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
+    return {
+        "collapsed": collapsed + "\n",
+        "samples": samples,
+        "seconds": wall,
+        "interval": interval,
+        "overhead_pct": 100.0 * cpu / wall if wall else 0.0,
+    }
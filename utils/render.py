@@ -0,0 +1,94 @@
+# utils/render.py
+
+from utils.tracing import span
+
+# Every character Telegram's MarkdownV2 treats as markup, plus the escape character itself
+_MD_V2_RESERVED = "\\_*[]()~`>#+-=|{}.!"
+_MD_V2_TABLE = str.maketrans({char: "\\" + char for char in _MD_V2_RESERVED})
+# Backslash comes first so later replacements are not escaped twice
+_MD_V2_PAIRS = tuple((char, "\\" + char) for char in _MD_V2_RESERVED)
+_SHORT_TEXT = 32
+_SEPARATOR = "\0"
+
+
+def escape_md(text):
+    """Escape text for use anywhere in a MarkdownV2 message."""
+    if not isinstance(text, str):
+        text = str(text)
+    if len(text) <= _SHORT_TEXT:
+        return text.translate(_MD_V2_TABLE)
+    # translate() takes CPython's slow path for one-to-many mappings, so longer
+    # text is cheaper to scan once per reserved character with replace()
+    for char, escaped in _MD_V2_PAIRS:
+        if char in text:
+            text = text.replace(char, escaped)
+    return text
+
+
+def escape_md_pre(text):
+    """Escape text placed inside a MarkdownV2 code block."""
+    return text.replace("\\", "\\\\").replace("`", "\\`")
+
+
+def escape_md_url(url):
+    """Escape the URL part of a MarkdownV2 inline link."""
+    return url.replace("\\", "\\\\").replace(")", "\\)")
+
+
+class TableTemplate:
+    """Fixed-width text table. Header, separator and row format are built once and reused."""
+
+    def __init__(self, columns):
+        # columns: [(title, width, align)] with align one of "<", ">"
+        self.row_format = "| " + " | ".join(f"{{:{align}{width}}}" for _, width, align in columns) + " |"
+        self.header = self.row_format.format(*(title for title, _, _ in columns))
+        self.separator = "|" + "|".join("-" * (width + 2) for _, width, _ in columns) + "|"
+
+    def render(self, rows):
+        lines = [self.header, self.separator]
+        lines.extend(self.row_format.format(*row) for row in rows)
+        return "\n".join(lines)
+
+
+COIN_TABLE = TableTemplate([
+    ("Symbol", 6, "<"),
+    ("Price (USD)", 14, ">"),
+    ("24h Change", 12, "<"),
+    ("7D Range", 23, "<"),
+])
+
+
+@span("render")
+def table_message(title, template, rows):
+    """Build (markdown_v2, plain) versions of a titled table from a single rendering pass."""
+    table = template.render(rows)
+    markdown = f"*{escape_md(title)}*\n\n```\n{escape_md_pre(table)}\n```"
+    plain = f"{title}\n\n{table}"
+    return markdown, plain
+
+
+@span("render")
+def link_list_message(title, items):
+    """Build (markdown_v2, plain) versions of a numbered list of {title, summary, url} items."""
+    items = [(item.get("title") or "Untitled Article", item.get("summary") or "", item.get("url") or "")
+             for item in items]
+    # Escape the title and every item's title and summary in one escape_md() pass over
+    # their joined text; NUL isn't reserved, so the result splits back into the same pieces
+    texts = [title] + [text for item_title, summary, _ in items for text in (item_title, summary)]
+    escaped = escape_md(_SEPARATOR.join(texts)).split(_SEPARATOR)
+    if len(escaped) != len(texts):
+        escaped = [escape_md(text) for text in texts]  # Some text contained the separator itself
+    markdown = [f"*{escaped[0]}*\n"]
+    plain = [f"{title}\n"]
+    for i, (item_title, summary, url) in enumerate(items, start=1):
+        markdown.append(f"*{i}\\. {escaped[2 * i - 1]}*")
+        plain.append(f"{i}. {item_title}")
+        if summary:
+            markdown.append(f"_{escaped[2 * i]}_")
+            plain.append(f"   {summary}")
+        if url:
+            markdown.append(f"[Read more ↗]({escape_md_url(url)})")
+            plain.append(f"   {url}")
+        markdown.append("")
+        plain.append("")
+    return "\n".join(markdown), "\n".join(plain)
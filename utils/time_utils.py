@@ -15,4 +15,14 @@ def format_time_ago(timestamp_str):
         else:
             return f"at {then.strftime('%I:%M %p')}"
     except Exception:
-        return "N/A"
\ No newline at end of file
+        return "N/A"
+
+def format_age(seconds):
+    if seconds is None:
+        return "N/A"
+    if seconds < 60:
+        return "just now"
+    elif seconds < 3600:
+        return f"{int(seconds // 60)} mins ago"
+    else:
+        return f"{int(seconds // 3600)}h ago"
@@ -0,0 +1,145 @@
+# utils/tracing.py
+#
+# Lightweight per-update tracing. Each wrapped command owns a Trace held in a
+# context variable; the DB cursor, the upstream HTTP client, the Bot API request
+# and the render helpers add their time to it as named spans.
+
+import contextvars
+import functools
+import json
+import logging
+import threading
+import time
+from collections import deque
+from config import SLOW_COMMAND_MS
+from utils.loop_watchdog import task_label
+from utils.metrics import COMMAND_LATENCY
+
+SPAN_NAMES = ("lane_wait", "parse", "db", "upstream", "render", "send")
+RESERVOIR_SIZE = 1024
+
+_current = contextvars.ContextVar("trace", default=None)
+_samples = {}       # command -> deque of recent durations (seconds)
+_counts = {}        # command -> total updates handled
+_samples_lock = threading.Lock()
+
+
+class Trace:
+    def __init__(self, command, user_id=None):
+        self.command = command
+        self.user_id = user_id
+        self.started = time.perf_counter()
+        self.spans = {}
+        self._lock = threading.Lock()  # upstream calls may run in worker threads
+
+    def add(self, name, seconds):
+        with self._lock:
+            self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def breakdown_ms(self, total):
+        spans = {name: round(seconds * 1000, 1) for name, seconds in self.spans.items()}
+        spans["other"] = round(max(0.0, total - sum(self.spans.values())) * 1000, 1)
+        return spans
+
+
+def add_span(name, seconds):
+    """Charge time to the current update's trace; a no-op outside traced handlers."""
+    trace = _current.get()
+    if trace is not None:
+        trace.add(name, seconds)
+
+
+class span:
+    """Charge the time spent in a `with` block, or in every call of a decorated function, to `name`."""
+
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        add_span(self.name, time.perf_counter() - self.start)
+        return False
+
+    def __call__(self, func):
+        name = self.name
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            trace = _current.get()
+            if trace is None:
+                return func(*args, **kwargs)  # Untraced callers (jobs, benchmarks) skip the timing
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                trace.add(name, time.perf_counter() - start)
+        return wrapper
+
+
+def _record(trace, total):
+    COMMAND_LATENCY.observe(total, command=trace.command)
+    with _samples_lock:
+        _samples.setdefault(trace.command, deque(maxlen=RESERVOIR_SIZE)).append(total)
+        _counts[trace.command] = _counts.get(trace.command, 0) + 1
+
+    if total * 1000 >= SLOW_COMMAND_MS:
+        record = {
+            "command": trace.command,
+            "user_id": trace.user_id,
+            "total_ms": round(total * 1000, 1),
+            "spans_ms": trace.breakdown_ms(total),
+        }
+        logging.warning(f"slow_command {json.dumps(record)}")
+
+
+def traced(command, callback):
+    """Wrap a PTB handler callback so each update is timed and its spans collected."""
+    @functools.wraps(callback)
+    async def wrapper(update, context):
+        user = getattr(update, "effective_user", None)
+        trace = Trace(command, str(user.id) if user else None)
+        token = _current.set(trace)
+        try:
+            with task_label(f"command:{command}"):
+                return await callback(update, context)
+        finally:
+            _current.reset(token)
+            _record(trace, time.perf_counter() - trace.started)
+
+    wrapper.__traced__ = True
+    return wrapper
+
+
+def trace_command_handlers(app, group=0):
+    """Wrap every CommandHandler registered so far in `group` in its chat lane and a trace (idempotent)."""
+    from telegram.ext import CommandHandler
+    from utils.lanes import laned
+    for handler in app.handlers.get(group, []):
+        if isinstance(handler, CommandHandler) and not getattr(handler.callback, "__traced__", False):
+            handler.callback = traced(sorted(handler.commands)[0], laned(handler.callback))
+
+
+def _percentile(sorted_values, q):
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def command_stats():
+    """{command: {"count", "p50", "p95", "p99"}} with latencies in milliseconds over recent updates."""
+    with _samples_lock:
+        snapshot = {command: sorted(samples) for command, samples in _samples.items()}
+        counts = dict(_counts)
+    return {
+        command: {
+            "count": counts[command],
+            "p50": _percentile(values, 0.50) * 1000,
+            "p95": _percentile(values, 0.95) * 1000,
+            "p99": _percentile(values, 0.99) * 1000,
+        }
+        for command, values in snapshot.items()
+    }